@@ -1,3 +1,7 @@
+import asyncio
+import contextlib
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from http import HTTPStatus
 
 from asgi_correlation_id import CorrelationIdMiddleware
@@ -11,7 +15,12 @@ from ratelimit.auths.ip import client_ip
 from starlette.exceptions import HTTPException
 
 from app.config import settings
+from app.lib.authentication_token_cache import (
+    get_authentication_token_cache,
+    listen_for_authentication_token_invalidations,
+)
 from app.lib.constants import APP_NAME, SUPPORT_EMAIL
+from app.lib.database.engine import dispose_database_engine
 from app.lib.error_handlers import (
     handle_http_exception,
     handle_invalid_input_error,
@@ -26,10 +35,19 @@ from app.lib.errors import (
     UnauthenticatedError,
     UnexpectedError,
 )
+from app.lib.geo_ip import close_geoip_database, watch_geoip_database
 from app.lib.openapi import generate_operation_id
 from app.lib.rate_limit import rate_limit_backend, rate_limit_config
+from app.lib.redis_client import get_redis_client
+from app.lib.task_buffer import get_task_buffer
+from app.lib.user_session_revocations import (
+    get_revoked_user_sessions,
+    listen_for_user_session_revocations,
+)
+from app.lib.webauthn_verification import shutdown_webauthn_executor
 from app.routes.auth import auth_router
 from app.routes.health import health_router
+from app.routes.internal import internal_router
 from app.routes.user import users_router
 from app.schemas.errors import (
     UnexpectedErrorResult,
@@ -42,6 +60,7 @@ def add_routes(app: FastAPI) -> None:
     app.include_router(health_router)
     app.include_router(users_router)
     app.include_router(auth_router)
+    app.include_router(internal_router)
 
 
 def add_middleware(app: FastAPI) -> None:
@@ -67,12 +86,54 @@ def add_middleware(app: FastAPI) -> None:
     )
 
 
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    """Run background tasks and clean up resources for the lifetime of the app."""
+    listeners = [
+        asyncio.create_task(
+            listen_for_authentication_token_invalidations(
+                redis_client=get_redis_client(),
+                cache=get_authentication_token_cache(),
+            ),
+        ),
+        asyncio.create_task(watch_geoip_database()),
+    ]
+    if settings.access_tokens_enabled:
+        listeners.append(
+            asyncio.create_task(
+                listen_for_user_session_revocations(
+                    redis_client=get_redis_client(),
+                    revoked_user_sessions=get_revoked_user_sessions(),
+                ),
+            ),
+        )
+    task_buffer_flusher = asyncio.create_task(get_task_buffer().run())
+
+    yield
+
+    for listener in listeners:
+        listener.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await listener
+
+    # enqueue the tasks buffered by the last requests
+    task_buffer_flusher.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task_buffer_flusher
+    await get_task_buffer().drain()
+
+    shutdown_webauthn_executor()
+    close_geoip_database()
+    await dispose_database_engine()
+
+
 def create_app() -> FastAPI:
     """Initialize an app instance."""
     app = FastAPI(
         version="0.0.1",
         root_path=settings.root_path,
         debug=settings.debug,
+        lifespan=lifespan,
         default_response_class=ORJSONResponse,
         openapi_url=settings.openapi_url,
         title=f"{APP_NAME} HTTP API",
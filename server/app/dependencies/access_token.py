@@ -0,0 +1,14 @@
+from functools import lru_cache
+
+from app.lib.redis_client import get_redis_client
+from app.lib.user_session_revocations import get_revoked_user_sessions
+from app.repositories.access_token import AccessTokenRepo
+
+
+@lru_cache
+def get_access_token_repo() -> AccessTokenRepo:
+    """Get the access token repo (shared by the whole process)."""
+    return AccessTokenRepo(
+        redis_client=get_redis_client(),
+        revoked_user_sessions=get_revoked_user_sessions(),
+    )
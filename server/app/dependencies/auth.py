@@ -1,109 +1,131 @@
 from typing import Annotated
 
-from fastapi import Depends, Security
+from fastapi import Depends, Response, Security
 from fastapi.security import APIKeyCookie
-from geoip2.database import Reader
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
+from app.dependencies.access_token import get_access_token_repo
 from app.dependencies.authentication_token import get_authentication_token_repo
-from app.dependencies.email_verification_code import get_email_verification_code_repo
+from app.dependencies.database_session import get_database_session
+from app.dependencies.outgoing_verification_code import (
+    get_outgoing_verification_code_repo,
+)
 from app.dependencies.register_flow import get_register_flow_repo
-from app.dependencies.user import get_user_repo
-from app.dependencies.user_session import get_user_session_repo
 from app.dependencies.webauthn_challenge import get_webauthn_challenge_repo
-from app.dependencies.webauthn_credential import get_webauthn_credential_repo
-from app.lib.constants import AUTHENTICATION_TOKEN_COOKIE
-from app.lib.geo_ip import get_geoip_reader
-from app.repositories.authentication_token import AuthenticationTokenRepo
+from app.lib.constants import ACCESS_TOKEN_COOKIE, AUTHENTICATION_TOKEN_COOKIE
+from app.lib.database.unit_of_work import UnitOfWork
+from app.lib.errors import UnauthenticatedError
+from app.lib.task_buffer import get_task_buffer
 from app.repositories.email_verification_code import EmailVerificationCodeRepo
-from app.repositories.register_flow import RegisterFlowRepo
+from app.repositories.outbox_message import OutboxMessageRepo
 from app.repositories.user import UserRepo
 from app.repositories.user_session import UserSessionRepo
-from app.repositories.webauthn_challenge import WebAuthnChallengeRepo
 from app.repositories.webauthn_credential import WebAuthnCredentialRepo
 from app.services.auth import AuthService
 from app.types.auth import UserInfo
 
 authentication_token_cookie = APIKeyCookie(name=AUTHENTICATION_TOKEN_COOKIE)
 
+access_token_cookie = APIKeyCookie(name=ACCESS_TOKEN_COOKIE, auto_error=False)
 
-def get_auth_service(
-    user_session_repo: Annotated[
-        UserSessionRepo,
-        Depends(
-            dependency=get_user_session_repo,
-        ),
-    ],
-    webauthn_credential_repo: Annotated[
-        WebAuthnCredentialRepo,
-        Depends(
-            dependency=get_webauthn_credential_repo,
-        ),
-    ],
-    webauthn_challenge_repo: Annotated[
-        WebAuthnChallengeRepo,
-        Depends(
-            dependency=get_webauthn_challenge_repo,
-        ),
-    ],
-    authentication_token_repo: Annotated[
-        AuthenticationTokenRepo,
-        Depends(
-            dependency=get_authentication_token_repo,
-        ),
-    ],
-    register_flow_repo: Annotated[
-        RegisterFlowRepo,
-        Depends(
-            dependency=get_register_flow_repo,
-        ),
-    ],
-    user_repo: Annotated[
-        UserRepo,
-        Depends(
-            dependency=get_user_repo,
-        ),
-    ],
-    email_verification_token_repo: Annotated[
-        EmailVerificationCodeRepo,
-        Depends(
-            dependency=get_email_verification_code_repo,
-        ),
-    ],
-    geoip_reader: Annotated[
-        Reader,
+
+async def get_auth_service(
+    session: Annotated[
+        AsyncSession,
         Depends(
-            dependency=get_geoip_reader,
+            dependency=get_database_session,
         ),
     ],
 ) -> AuthService:
-    """Get the auth service."""
+    """
+    Get the auth service.
+
+    Session-bound repos are built here rather than resolved as separate
+    dependencies, and process-wide repos are shared singletons.
+    """
     return AuthService(
-        user_session_repo=user_session_repo,
-        webauthn_credential_repo=webauthn_credential_repo,
-        webauthn_challenge_repo=webauthn_challenge_repo,
-        authentication_token_repo=authentication_token_repo,
-        register_flow_repo=register_flow_repo,
-        user_repo=user_repo,
-        email_verification_code_repo=email_verification_token_repo,
-        geoip_reader=geoip_reader,
+        unit_of_work=UnitOfWork(session=session),
+        user_session_repo=UserSessionRepo(session=session),
+        webauthn_credential_repo=WebAuthnCredentialRepo(session=session),
+        webauthn_challenge_repo=get_webauthn_challenge_repo(),
+        authentication_token_repo=get_authentication_token_repo(),
+        access_token_repo=get_access_token_repo(),
+        register_flow_repo=get_register_flow_repo(session=session),
+        user_repo=UserRepo(session=session),
+        email_verification_code_repo=EmailVerificationCodeRepo(session=session),
+        outbox_message_repo=OutboxMessageRepo(session=session),
+        outgoing_verification_code_repo=get_outgoing_verification_code_repo(),
+        task_buffer=get_task_buffer(),
+    )
+
+
+async def verify_authentication_token(authentication_token: str) -> UserInfo:
+    """Verify the given authentication token and return the corresponding user info."""
+    user_info = await get_authentication_token_repo().get_user_info(
+        authentication_token=authentication_token,
     )
 
+    if not user_info or get_access_token_repo().is_revoked(
+        user_session_id=user_info.user_session_id,
+    ):
+        raise UnauthenticatedError(
+            message="Invalid authentication token provided.",
+        )
+    return user_info
+
 
 async def get_viewer_info(
-    auth_service: Annotated[
-        AuthService,
-        Depends(
-            dependency=get_auth_service,
-        ),
-    ],
     authentication_token: Annotated[
         str,
         Security(
             authentication_token_cookie,
         ),
     ],
+    access_token: Annotated[
+        str | None,
+        Security(
+            access_token_cookie,
+        ),
+    ],
+    response: Response,
 ) -> UserInfo:
-    """Get the viewer (current user) info from the authentication token."""
-    return await auth_service.get_user_info_for_authentication_token(
+    """
+    Get the viewer (current user) info from the authentication token.
+
+    When access tokens are enabled, a valid access token is used instead,
+    and a new access token is issued whenever it is missing or invalid.
+    Only the process-wide token repos are used, so no database
+    session is set up for it.
+    """
+    if not settings.access_tokens_enabled:
+        return await verify_authentication_token(
+            authentication_token=authentication_token,
+        )
+
+    access_token_repo = get_access_token_repo()
+
+    if access_token is not None:
+        user_info = access_token_repo.get_user_info(
+            access_token=access_token,
+        )
+        if user_info is not None:
+            return user_info
+
+    user_info = await verify_authentication_token(
         authentication_token=authentication_token,
     )
+
+    # set access token in a cookie
+    response.set_cookie(
+        key=ACCESS_TOKEN_COOKIE,
+        value=access_token_repo.create(
+            user_id=user_info.user_id,
+            user_session_id=user_info.user_session_id,
+        ),
+        max_age=settings.access_token_expires_in,
+        secure=settings.is_production(),
+        httponly=True,
+    )
+
+    return user_info
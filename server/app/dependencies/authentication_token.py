@@ -1,21 +1,14 @@
-from typing import Annotated
-
-from fastapi import Depends
-from redis.asyncio import Redis
+from functools import lru_cache
 
+from app.lib.authentication_token_cache import get_authentication_token_cache
 from app.lib.redis_client import get_redis_client
 from app.repositories.authentication_token import AuthenticationTokenRepo
 
 
-def get_authentication_token_repo(
-    redis_client: Annotated[
-        Redis,
-        Depends(
-            dependency=get_redis_client,
-        ),
-    ],
-) -> AuthenticationTokenRepo:
-    """Get the authentication token repo."""
+@lru_cache
+def get_authentication_token_repo() -> AuthenticationTokenRepo:
+    """Get the authentication token repo (shared by the whole process)."""
     return AuthenticationTokenRepo(
-        redis_client=redis_client,
+        redis_client=get_redis_client(),
+        cache=get_authentication_token_cache(),
     )
@@ -0,0 +1,28 @@
+from secrets import compare_digest
+from typing import Annotated
+
+from fastapi import Security
+from fastapi.security import APIKeyHeader
+
+from app.config import settings
+from app.lib.errors import UnauthenticatedError
+
+internal_api_key_header = APIKeyHeader(name="X-Internal-API-Key")
+
+
+async def verify_internal_api_key(
+    internal_api_key: Annotated[
+        str,
+        Security(
+            internal_api_key_header,
+        ),
+    ],
+) -> None:
+    """Verify the internal API key for internal services."""
+    if settings.internal_api_key is None or not compare_digest(
+        internal_api_key.encode(),
+        settings.internal_api_key.get_secret_value().encode(),
+    ):
+        raise UnauthenticatedError(
+            message="Invalid internal API key provided.",
+        )
@@ -0,0 +1,12 @@
+from functools import lru_cache
+
+from app.lib.redis_client import get_redis_client
+from app.repositories.outgoing_verification_code import OutgoingVerificationCodeRepo
+
+
+@lru_cache
+def get_outgoing_verification_code_repo() -> OutgoingVerificationCodeRepo:
+    """Get the outgoing verification code repo (shared by the whole process)."""
+    return OutgoingVerificationCodeRepo(
+        redis_client=get_redis_client(),
+    )
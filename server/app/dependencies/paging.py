@@ -6,11 +6,12 @@ from app.lib.constants import DEFAULT_PAGINATION_LIMIT, MAX_PAGINATION_LIMIT
 from app.types.paging import PagingInfo
 
 
-def get_paging_info(
+async def get_paging_info(
     limit: Annotated[
         int,
         Query(
             description="The amount of entities to fetch.",
+            gt=0,
             le=MAX_PAGINATION_LIMIT,
         ),
     ] = DEFAULT_PAGINATION_LIMIT,
@@ -20,6 +21,6 @@ def get_paging_info(
             description="The cursor after which entities should be fetched.",
         ),
     ] = None,
-) -> PagingInfo:
+) -> PagingInfo[str]:
     """Get paging info from query parameters."""
     return PagingInfo(limit=limit, after=after)
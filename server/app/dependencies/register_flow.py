@@ -1,19 +1,24 @@
-from typing import Annotated
+from functools import lru_cache
 
-from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.dependencies.database_session import get_database_session
-from app.repositories.register_flow import RegisterFlowRepo
+from app.config import RegisterFlowBackend, settings
+from app.lib.redis_client import get_redis_client
+from app.repositories.register_flow import (
+    DatabaseRegisterFlowRepo,
+    RedisRegisterFlowRepo,
+    RegisterFlowRepo,
+)
 
 
-def get_register_flow_repo(
-    session: Annotated[
-        AsyncSession,
-        Depends(
-            dependency=get_database_session,
-        ),
-    ],
-) -> RegisterFlowRepo:
-    """Get the register flow repo."""
-    return RegisterFlowRepo(session=session)
+@lru_cache
+def get_redis_register_flow_repo() -> RedisRegisterFlowRepo:
+    """Get the redis register flow repo (shared by the whole process)."""
+    return RedisRegisterFlowRepo(redis_client=get_redis_client())
+
+
+def get_register_flow_repo(session: AsyncSession) -> RegisterFlowRepo:
+    """Get the register flow repo for the configured backend."""
+    if settings.register_flow_backend == RegisterFlowBackend.redis:
+        return get_redis_register_flow_repo()
+    return DatabaseRegisterFlowRepo(session=session)
@@ -1,70 +1,43 @@
 from typing import Annotated
 
 from fastapi import Depends
-from geoip2.database import Reader
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.dependencies.authentication_token import get_authentication_token_repo
 from app.dependencies.database_session import get_database_session
-from app.dependencies.email_verification_code import get_email_verification_code_repo
-from app.dependencies.user_session import get_user_session_repo
-from app.lib.geo_ip import get_geoip_reader
-from app.repositories.authentication_token import AuthenticationTokenRepo
+from app.dependencies.outgoing_verification_code import (
+    get_outgoing_verification_code_repo,
+)
+from app.lib.database.unit_of_work import UnitOfWork
+from app.lib.task_buffer import get_task_buffer
 from app.repositories.email_verification_code import EmailVerificationCodeRepo
+from app.repositories.outbox_message import OutboxMessageRepo
 from app.repositories.user import UserRepo
 from app.repositories.user_session import UserSessionRepo
 from app.services.user import UserService
 
 
-def get_user_repo(
+async def get_user_service(
     session: Annotated[
         AsyncSession,
         Depends(
             dependency=get_database_session,
         ),
     ],
-) -> UserRepo:
-    """Get the user repo."""
-    return UserRepo(session=session)
-
-
-def get_user_service(
-    user_session_repo: Annotated[
-        UserSessionRepo,
-        Depends(
-            dependency=get_user_session_repo,
-        ),
-    ],
-    authentication_token_repo: Annotated[
-        AuthenticationTokenRepo,
-        Depends(
-            dependency=get_authentication_token_repo,
-        ),
-    ],
-    user_repo: Annotated[
-        UserRepo,
-        Depends(
-            dependency=get_user_repo,
-        ),
-    ],
-    email_verification_code_repo: Annotated[
-        EmailVerificationCodeRepo,
-        Depends(
-            dependency=get_email_verification_code_repo,
-        ),
-    ],
-    geoip_reader: Annotated[
-        Reader,
-        Depends(
-            dependency=get_geoip_reader,
-        ),
-    ],
 ) -> UserService:
-    """Get the user service."""
+    """
+    Get the user service.
+
+    Session-bound repos are built here rather than resolved as separate
+    dependencies, and process-wide repos are shared singletons.
+    """
     return UserService(
-        user_repo=user_repo,
-        email_verification_code_repo=email_verification_code_repo,
-        user_session_repo=user_session_repo,
-        authentication_token_repo=authentication_token_repo,
-        geoip_reader=geoip_reader,
+        unit_of_work=UnitOfWork(session=session),
+        user_repo=UserRepo(session=session),
+        email_verification_code_repo=EmailVerificationCodeRepo(session=session),
+        user_session_repo=UserSessionRepo(session=session),
+        authentication_token_repo=get_authentication_token_repo(),
+        outbox_message_repo=OutboxMessageRepo(session=session),
+        outgoing_verification_code_repo=get_outgoing_verification_code_repo(),
+        task_buffer=get_task_buffer(),
     )
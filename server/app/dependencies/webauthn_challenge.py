@@ -1,21 +1,12 @@
-from typing import Annotated
-
-from fastapi import Depends
-from redis.asyncio import Redis
+from functools import lru_cache
 
 from app.lib.redis_client import get_redis_client
 from app.repositories.webauthn_challenge import WebAuthnChallengeRepo
 
 
-def get_webauthn_challenge_repo(
-    redis_client: Annotated[
-        Redis,
-        Depends(
-            dependency=get_redis_client,
-        ),
-    ],
-) -> WebAuthnChallengeRepo:
-    """Get the WebAuthn challenge repo."""
+@lru_cache
+def get_webauthn_challenge_repo() -> WebAuthnChallengeRepo:
+    """Get the WebAuthn challenge repo (shared by the whole process)."""
     return WebAuthnChallengeRepo(
-        redis_client=redis_client,
+        redis_client=get_redis_client(),
     )
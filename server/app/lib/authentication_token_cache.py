@@ -0,0 +1,64 @@
+import asyncio
+import logging
+from functools import lru_cache
+
+from redis.asyncio import Redis
+from redis.asyncio.client import PubSub
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.config import settings
+from app.lib.cache import LRUCache, register_cache
+from app.lib.constants import AUTHENTICATION_TOKEN_INVALIDATIONS_CHANNEL
+from app.types.auth import UserInfo
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache
+def get_authentication_token_cache() -> LRUCache[str, UserInfo]:
+    """Get the authentication token cache (keyed by authentication token hash)."""
+    return register_cache(
+        LRUCache(
+            name="authentication_tokens",
+            max_size=settings.authentication_token_cache_size,
+            ttl=settings.authentication_token_cache_ttl,
+        ),
+    )
+
+
+async def evict_published_invalidations(
+    *,
+    pubsub: PubSub,
+    cache: LRUCache[str, UserInfo],
+) -> None:
+    """Evict the authentication token hashes published to the given subscription."""
+    async for message in pubsub.listen():
+        if message["type"] != "message":
+            continue
+        for authentication_token_hash in message["data"].split():
+            cache.delete(authentication_token_hash.decode())
+
+
+async def listen_for_authentication_token_invalidations(
+    *,
+    redis_client: Redis,
+    cache: LRUCache[str, UserInfo],
+) -> None:
+    """Evict revoked authentication tokens from the cache as they are published."""
+    while True:
+        try:
+            async with redis_client.pubsub() as pubsub:
+                await pubsub.subscribe(AUTHENTICATION_TOKEN_INVALIDATIONS_CHANNEL)
+                # invalidations may have been published while we
+                # weren't subscribed, so start over with an empty cache
+                cache.clear()
+                await evict_published_invalidations(pubsub=pubsub, cache=cache)
+        except RedisConnectionError:
+            cache.clear()
+            await asyncio.sleep(1)
+        except Exception:
+            # a malformed message or unexpected reply must not stop the
+            # listener, as the cache would never be invalidated again
+            logger.exception("Authentication token invalidation listener failed.")
+            cache.clear()
+            await asyncio.sleep(1)
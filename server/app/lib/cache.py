@@ -0,0 +1,114 @@
+import time
+from collections import OrderedDict
+from typing import Generic, NamedTuple, TypeVar
+
+KeyT = TypeVar("KeyT")
+
+ValueT = TypeVar("ValueT")
+
+
+class CacheStats(NamedTuple):
+    """Usage statistics for an in-process cache."""
+
+    name: str
+    size: int
+    max_size: int
+    hits: int
+    misses: int
+    hit_ratio: float
+
+
+class LRUCache(Generic[KeyT, ValueT]):
+    """
+    A bounded, in-process LRU cache.
+
+    Entries are optionally expired after the given TTL (in seconds).
+
+    Every eviction bumps the cache's generation, so that a value looked up
+    before an eviction can be kept from being cached after it.
+    """
+
+    def __init__(self, *, name: str, max_size: int, ttl: float | None = None) -> None:
+        self._name = name
+        self._max_size = max_size
+        self._ttl = ttl
+        self._entries: OrderedDict[KeyT, tuple[ValueT, float | None]] = OrderedDict()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: KeyT) -> ValueT | None:
+        """Get the cached value for the given key."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(
+        self,
+        key: KeyT,
+        value: ValueT,
+        *,
+        generation: int | None = None,
+    ) -> None:
+        """
+        Cache the given value for the given key.
+
+        When a generation is given, the value is only cached if
+        nothing has been evicted since that generation.
+        """
+        if self._max_size <= 0:
+            return
+        if generation is not None and generation != self.generation:
+            return
+        expires_at = None
+        if self._ttl is not None:
+            expires_at = time.monotonic() + self._ttl
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: KeyT) -> None:
+        """Evict the given key from the cache."""
+        self.generation += 1
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Evict all entries from the cache."""
+        self.generation += 1
+        self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        """Get usage statistics for the cache."""
+        lookups = self.hits + self.misses
+        return CacheStats(
+            name=self._name,
+            size=len(self._entries),
+            max_size=self._max_size,
+            hits=self.hits,
+            misses=self.misses,
+            hit_ratio=self.hits / lookups if lookups else 0.0,
+        )
+
+
+_caches: list[LRUCache] = []  # type: ignore[type-arg]
+
+
+def register_cache(cache: LRUCache[KeyT, ValueT]) -> LRUCache[KeyT, ValueT]:
+    """Register the given cache so that its stats are exported."""
+    _caches.append(cache)
+    return cache
+
+
+def get_cache_stats() -> list[CacheStats]:
+    """Get usage statistics for all registered caches."""
+    return [cache.stats() for cache in _caches]
@@ -26,6 +26,27 @@ REGISTER_FLOW_ID_COOKIE = "register_flow_id"
 
 AUTHENTICATION_TOKEN_COOKIE = "authentication_token"  # noqa: S105
 
+ACCESS_TOKEN_COOKIE = "access_token"  # noqa: S105
+
+# authentication tokens
+
+AUTHENTICATION_TOKEN_INVALIDATIONS_CHANNEL = "auth-token-invalidations"  # noqa: S105
+
+# tokens are refreshed at most this often, and at least twice per idle expiry
+AUTHENTICATION_TOKEN_MAX_REFRESH_INTERVAL = 3600  # 1 hour
+
+AUTHENTICATION_TOKEN_OWNERS_PRUNE_BATCH_SIZE = 100
+
+AUTHENTICATION_TOKEN_OWNERS_PRUNE_MAX_BATCHES = 50
+
+MAX_AUTHENTICATION_TOKEN_INTROSPECTION_BATCH_SIZE = 1000
+
+# user session revocations
+
+USER_SESSION_REVOCATIONS_CHANNEL = "user-session-revocations"
+
+REVOKED_USER_SESSIONS_KEY = "revoked-user-sessions"
+
 # email verification codes
 
 EMAIL_VERIFICATION_CODE_EXPIRES_IN = 300  # 5 minutes
@@ -41,3 +62,41 @@ WEBAUTHN_CHALLENGE_TTL = 300  # 5 minutes
 # rate limiting
 
 PRIMARY_RATE_LIMIT = "5000/hour"
+
+# outbox messages
+
+OUTBOX_RELAY_BATCH_SIZE = 100
+
+OUTBOX_RELAY_INTERVAL = 1  # 1 second
+
+OUTBOX_RELAY_GRACE_PERIOD = 10  # 10 seconds
+
+# task buffer
+
+TASK_BUFFER_BATCH_SIZE = 100
+
+TASK_BUFFER_FLUSH_INTERVAL = 0.005  # 5 milliseconds
+
+# reaper
+
+REAPER_BATCH_SIZE = 1000
+
+REAPER_MAX_BATCHES = 1000
+
+REAPER_BATCH_PAUSE = 0.05  # 50 milliseconds
+
+# user data exports
+
+USER_DATA_EXPORT_BATCH_SIZE = 500
+
+# GeoIP database
+
+GEOIP_DATABASE_CHECK_INTERVAL = 60  # 1 minute
+
+GEOIP_READER_DRAIN_DELAY = 60  # 1 minute
+
+# user session locations
+
+USER_SESSION_LOCATION_BATCH_SIZE = 500
+
+USER_SESSION_LOCATION_MAX_BATCHES = 20
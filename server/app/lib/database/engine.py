@@ -1,13 +1,51 @@
-from sqlalchemy.ext.asyncio import (
-    create_async_engine,
-)
+from functools import lru_cache
+
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 
 from app.config import settings
 
-database_engine = create_async_engine(
-    url=str(settings.database_url),
-    echo=settings.debug,
-    pool_size=settings.database_pool_size,
-    pool_use_lifo=True,
-    pool_pre_ping=True,
-)
+
+def create_database_engine(url: str) -> AsyncEngine:
+    """Create a database engine, sized by the connection settings."""
+    return create_async_engine(
+        url=url,
+        echo=settings.debug,
+        pool_size=settings.database_pool_size,
+        max_overflow=settings.database_max_overflow,
+        pool_timeout=settings.database_pool_timeout,
+        pool_recycle=settings.database_pool_recycle,
+        pool_use_lifo=True,
+        pool_pre_ping=True,
+        connect_args={
+            "prepared_statement_cache_size": settings.database_statement_cache_size,
+        },
+    )
+
+
+@lru_cache
+def get_database_engine() -> AsyncEngine:
+    """
+    Get the primary database engine.
+
+    This is the only engine for the primary in the process, so the
+    process never holds more connections than its connection budget.
+    """
+    return create_database_engine(str(settings.database_url))
+
+
+@lru_cache
+def get_database_replica_engine() -> AsyncEngine | None:
+    """Get the replica database engine, if a replica is configured."""
+    if settings.database_replica_url is None:
+        return None
+    return create_database_engine(str(settings.database_replica_url))
+
+
+async def dispose_database_engine() -> None:
+    """Close the database engines' pooled connections, if they were created."""
+    if get_database_engine.cache_info().currsize:
+        await get_database_engine().dispose()
+    if get_database_replica_engine.cache_info().currsize:
+        replica_engine = get_database_replica_engine()
+        if replica_engine is not None:
+            await replica_engine.dispose()
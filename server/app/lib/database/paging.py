@@ -1,32 +1,156 @@
-from sqlalchemy import Select
+import hmac
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections.abc import Sequence
+from functools import lru_cache
+from hashlib import sha256
+from typing import Any, TypeAlias
+
+from pydantic import TypeAdapter, ValidationError
+from pydantic_core import to_json
+from sqlalchemy import ColumnElement, Select, and_, or_
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import UnaryExpression
+
+from app.config import settings
+from app.lib.errors import InvalidInputError
+from app.types.paging import EntityT, Page, PageInfo, PagingInfo
+
+# separates cursor signatures from other signatures made with the secret key
+CURSOR_SIGNATURE_CONTEXT = b"paging-cursor:"
+
+# the sort key values encoded in a cursor
+CursorValues: TypeAlias = tuple[Any, ...]
+
+
+def sign_cursor(payload: bytes) -> bytes:
+    """Sign the given cursor payload."""
+    return hmac.new(
+        key=settings.secret_key.get_secret_value().encode(),
+        msg=CURSOR_SIGNATURE_CONTEXT + payload,
+        digestmod=sha256,
+    ).digest()
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the given sort key values as an opaque, signed cursor."""
+    payload = to_json(list(values))
+    return ".".join(
+        urlsafe_b64encode(data).rstrip(b"=").decode()
+        for data in (payload, sign_cursor(payload))
+    )
 
-from app.types.paging import CursorT, EntityT, Page, PageInfo, PagingInfo
+
+@lru_cache
+def get_cursor_values_adapter(
+    value_types: tuple[type, ...],
+) -> TypeAdapter[CursorValues]:
+    """Get the adapter validating cursor values of the given types."""
+    # the tuple type is only known at runtime, from the sort keys
+    return TypeAdapter(tuple[value_types])  # type: ignore[valid-type]
+
+
+def decode_cursor(cursor: str, value_types: Sequence[type]) -> CursorValues:
+    """
+    Decode the sort key values from the given cursor.
+
+    Raises `InvalidInputError` for malformed or tampered cursors.
+    """
+    try:
+        payload, signature = (
+            urlsafe_b64decode(data + "=" * (-len(data) % 4))
+            for data in cursor.split(".")
+        )
+    except ValueError as exception:
+        raise InvalidInputError(message="Invalid cursor provided.") from exception
+    if not hmac.compare_digest(signature, sign_cursor(payload)):
+        raise InvalidInputError(message="Invalid cursor provided.")
+    try:
+        return get_cursor_values_adapter(tuple(value_types)).validate_json(payload)
+    except ValidationError as exception:
+        raise InvalidInputError(message="Invalid cursor provided.") from exception
+
+
+def after_cursor(
+    paginate_by: Sequence[UnaryExpression[Any]],
+    values: Sequence[Any],
+) -> ColumnElement[bool]:
+    """
+    Build a predicate matching the rows that sort after the given values.
+
+    Mixed sort directions rule out a row value comparison, so the
+    predicate is expanded column by column instead. The expanded
+    predicate is an `OR`, which gives the database no index bound,
+    so it is combined with a redundant bound on the leading column.
+    """
+    clauses = []
+    for index, order in enumerate(paginate_by):
+        column = order.element
+        if order.modifier is operators.desc_op:
+            comparison = column < values[index]
+        else:
+            comparison = column > values[index]
+        clauses.append(
+            and_(
+                *(
+                    previous_order.element == previous_value
+                    for previous_order, previous_value in zip(
+                        paginate_by[:index],
+                        values[:index],
+                        strict=True,
+                    )
+                ),
+                comparison,
+            ),
+        )
+    if len(paginate_by) == 1:
+        return or_(*clauses)
+    leading_order, leading_value = paginate_by[0], values[0]
+    if leading_order.modifier is operators.desc_op:
+        leading_bound = leading_order.element <= leading_value
+    else:
+        leading_bound = leading_order.element >= leading_value
+    return and_(leading_bound, or_(*clauses))
 
 
 async def paginate(
     *,
     session: AsyncSession,
     statement: Select[tuple[EntityT]],
-    paginate_by: Mapped[CursorT],
-    paging_info: PagingInfo[CursorT],
-) -> Page[EntityT, CursorT]:
-    """Paginate the given statement."""
+    paginate_by: Sequence[UnaryExpression[Any]],
+    paging_info: PagingInfo[str],
+) -> Page[EntityT, str]:
+    """
+    Paginate the given statement, using keyset pagination.
+
+    Entities are ordered by the given sort keys, which must
+    end with a unique column. Cursors encode the sort key
+    values of the last entity on a page.
+    """
+    columns: list[InstrumentedAttribute[Any]] = [
+        order.element for order in paginate_by  # type: ignore[misc]
+    ]
     if paging_info.after is not None:
-        statement.filter(paginate_by > paging_info.after)
+        values = decode_cursor(
+            paging_info.after,
+            value_types=[column.type.python_type for column in columns],
+        )
+        statement = statement.where(after_cursor(paginate_by, values))
 
-    statement.limit(paging_info.limit + 1)
+    statement = statement.order_by(*paginate_by).limit(paging_info.limit + 1)
 
     result = await session.scalars(statement)
 
     entities = list(result)
 
-    next_cursor: CursorT | None = None
+    next_cursor: str | None = None
 
     if len(entities) > paging_info.limit:
-        next_entity = entities.pop()
-        next_cursor = next_entity.__getattribute__(str(paginate_by))
+        entities.pop()
+        next_cursor = encode_cursor(
+            [getattr(entities[-1], column.key) for column in columns],
+        )
 
     return Page(
         entities=entities,
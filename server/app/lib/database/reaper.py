@@ -0,0 +1,89 @@
+import asyncio
+import logging
+import time
+from typing import Any
+
+from sqlalchemy import ColumnClause, Table, delete, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.sql.functions import now
+
+from app.lib.constants import (
+    REAPER_BATCH_PAUSE,
+    REAPER_BATCH_SIZE,
+    REAPER_MAX_BATCHES,
+)
+from app.lib.database.unit_of_work import UnitOfWork
+from app.models.email_verification_code import EmailVerificationCode
+from app.models.register_flow import RegisterFlow
+
+logger = logging.getLogger(__name__)
+
+# tables with rows that expire at their `expires_at` column
+EXPIRING_TABLES: list[Table] = [
+    EmailVerificationCode.__table__,  # type: ignore[list-item]
+    RegisterFlow.__table__,  # type: ignore[list-item]
+]
+
+
+async def reap_expired_batch(
+    *,
+    session: AsyncSession,
+    table: Table,
+    batch_size: int,
+) -> int:
+    """
+    Delete a batch of expired rows from the given table.
+
+    Rows are deleted by their physical location, so the batch is bounded
+    without sorting. Rows locked by other transactions are skipped.
+    Returns the amount of deleted rows.
+    """
+    ctid: ColumnClause[Any] = literal_column("ctid")
+    result = await session.execute(
+        delete(table).where(
+            ctid.in_(
+                select(ctid)
+                .select_from(table)
+                .where(table.c.expires_at <= now())
+                .limit(batch_size)
+                .with_for_update(skip_locked=True),
+            ),
+        ),
+    )
+    return result.rowcount
+
+
+async def reap_expired_table(
+    *,
+    session_factory: async_sessionmaker[AsyncSession],
+    table: Table,
+    batch_size: int = REAPER_BATCH_SIZE,
+    max_batches: int = REAPER_MAX_BATCHES,
+) -> int:
+    """
+    Delete expired rows from the given table, one batch per transaction.
+
+    Pauses between batches to let other work through, and stops after
+    the given amount of batches. Returns the amount of deleted rows.
+    """
+    start = time.perf_counter()
+    reaped_count = 0
+    for _ in range(max_batches):
+        async with session_factory() as session, UnitOfWork(session=session):
+            batch_count = await reap_expired_batch(
+                session=session,
+                table=table,
+                batch_size=batch_size,
+            )
+        reaped_count += batch_count
+        if batch_count < batch_size:
+            break
+        await asyncio.sleep(REAPER_BATCH_PAUSE)
+    elapsed = time.perf_counter() - start
+    logger.info(
+        "Reaped %d expired rows from %s (%.0f rows/s).",
+        reaped_count,
+        table.name,
+        reaped_count / elapsed if elapsed else 0,
+    )
+    return reaped_count
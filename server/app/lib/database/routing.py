@@ -0,0 +1,76 @@
+from collections.abc import Awaitable, Callable
+from contextvars import ContextVar
+from functools import wraps
+from typing import ParamSpec, TypeVar
+
+from sqlalchemy import ClauseElement, Connection, Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.orm._typing import _O
+from sqlalchemy.orm.session import _EntityBindKey, _SessionBind
+
+ParamT = ParamSpec("ParamT")
+
+ReturnT = TypeVar("ReturnT")
+
+# the qualified name of the running read-only repository method, if any
+_read_only_method: ContextVar[str | None] = ContextVar(
+    "read_only_method",
+    default=None,
+)
+
+
+def read_only(
+    method: Callable[ParamT, Awaitable[ReturnT]],
+) -> Callable[ParamT, Awaitable[ReturnT]]:
+    """Mark the given repository method as read-only, so it may use a replica."""
+
+    @wraps(method)
+    async def wrapper(*args: ParamT.args, **kwargs: ParamT.kwargs) -> ReturnT:
+        token = _read_only_method.set(method.__qualname__)
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            _read_only_method.reset(token)
+
+    return wrapper
+
+
+class RoutingSession(Session):
+    """
+    A session that routes read-only repository methods to a replica.
+
+    The replica engine is given as the `replica_bind` key of the
+    session info. Once the session writes, all its statements go
+    to the primary, so a request always reads its own writes.
+    """
+
+    _has_written = False
+
+    def get_bind(
+        self,
+        mapper: _EntityBindKey[_O] | None = None,
+        *,
+        clause: ClauseElement | None = None,
+        bind: _SessionBind | None = None,
+        _sa_skip_events: bool | None = None,
+        _sa_skip_for_implicit_returning: bool = False,
+        **kw: object,
+    ) -> Engine | Connection:
+        """Get the engine for the given statement."""
+        if self._flushing or (clause is not None and clause.is_dml):
+            self._has_written = True
+        replica_bind: Engine | None = self.info.get("replica_bind")
+        if (
+            replica_bind is not None
+            and _read_only_method.get() is not None
+            and not self._has_written
+        ):
+            return replica_bind
+        return super().get_bind(
+            mapper,
+            clause=clause,
+            bind=bind,
+            _sa_skip_events=_sa_skip_events,
+            _sa_skip_for_implicit_returning=_sa_skip_for_implicit_returning,
+            **kw,
+        )
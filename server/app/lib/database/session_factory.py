@@ -1,8 +1,25 @@
-from sqlalchemy.ext.asyncio import async_sessionmaker
+from functools import lru_cache
 
-from app.lib.database.engine import database_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-async_session_factory = async_sessionmaker(
-    bind=database_engine,
-    expire_on_commit=False,
-)
+from app.lib.database.engine import get_database_engine, get_database_replica_engine
+from app.lib.database.routing import RoutingSession
+
+
+@lru_cache
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """
+    Get the database session factory.
+
+    Sessions route read-only repository methods
+    to the replica, if one is configured.
+    """
+    replica_engine = get_database_replica_engine()
+    return async_sessionmaker(
+        bind=get_database_engine(),
+        sync_session_class=RoutingSession,
+        info={
+            "replica_bind": replica_engine.sync_engine if replica_engine else None,
+        },
+        expire_on_commit=False,
+    )
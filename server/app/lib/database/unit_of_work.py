@@ -0,0 +1,41 @@
+from types import TracebackType
+from typing import Self
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class UnitOfWork:
+    """
+    A single database transaction, spanning a whole use case.
+
+    Repositories only flush their changes; the unit of work commits them
+    once on exit, or rolls them back if an exception was raised. Nested
+    units of work join the outermost one.
+
+    Sessions only check out a connection on their first statement, and
+    return it when the transaction ends. Read-only use cases run in a
+    unit of work too, so their connection isn't held until the request
+    finishes.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+        self._depth = 0
+
+    async def __aenter__(self) -> Self:
+        self._depth += 1
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self._depth -= 1
+        if self._depth > 0:
+            return
+        if exc_type is None:
+            await self._session.commit()
+        else:
+            await self._session.rollback()
@@ -1,10 +1,20 @@
+import asyncio
+import logging
 from functools import lru_cache
+from pathlib import Path
 
-from geoip2.database import Reader
+from geoip2.database import MODE_MMAP, Reader
 from geoip2.errors import AddressNotFoundError
 from geoip2.models import City
 
 from app.config import settings
+from app.lib.cache import LRUCache, register_cache
+from app.lib.constants import (
+    GEOIP_DATABASE_CHECK_INTERVAL,
+    GEOIP_READER_DRAIN_DELAY,
+)
+
+logger = logging.getLogger(__name__)
 
 
 def format_geoip_city(city: City) -> str:
@@ -13,11 +23,18 @@ def format_geoip_city(city: City) -> str:
 
 
 def get_geoip_city(ip_address: str, geoip_reader: Reader) -> City | None:
-    """Get the GeoIP city from the given IP address."""
+    """
+    Get the GeoIP city from the given IP address.
+
+    Malformed IP addresses have no city, rather than failing the lookup.
+    """
     try:
         return geoip_reader.city(ip_address)
     except AddressNotFoundError:
         return None
+    except ValueError:
+        logger.warning("Couldn't look up malformed IP address %r.", ip_address)
+        return None
 
 
 def get_city_location(city: City | None) -> str:
@@ -27,7 +44,117 @@ def get_city_location(city: City | None) -> str:
     return format_geoip_city(city)
 
 
+class GeoIPDatabase:
+    """
+    A memory-mapped GeoIP database, reloaded when its file is replaced.
+
+    Memory-mapped pages are shared between the processes that open
+    the same file. Reloads swap in a new reader with a single
+    assignment, so lookups never wait on them.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._version = self._stat()
+        self.reader = Reader(path, mode=MODE_MMAP)
+
+    def _stat(self) -> tuple[int, int]:
+        """Get the inode and modification time of the database file."""
+        stat = Path(self._path).stat()
+        return stat.st_ino, stat.st_mtime_ns
+
+    async def reload_if_changed(self) -> bool:
+        """
+        Swap in a new reader if the database file has changed.
+
+        The old reader is closed once lookups still using it had
+        time to finish. Returns whether the database was reloaded.
+        """
+        version = await asyncio.to_thread(self._stat)
+        if version == self._version:
+            return False
+        reader = await asyncio.to_thread(Reader, self._path, mode=MODE_MMAP)
+        previous_reader, self.reader = self.reader, reader
+        self._version = version
+        # cached locations may be stale now
+        get_ip_location_cache().clear()
+        asyncio.get_running_loop().call_later(
+            GEOIP_READER_DRAIN_DELAY,
+            previous_reader.close,
+        )
+        return True
+
+    def close(self) -> None:
+        """Close the current reader."""
+        self.reader.close()
+
+
 @lru_cache
+def get_geoip_database() -> GeoIPDatabase:
+    """Get the GeoIP database."""
+    return GeoIPDatabase(settings.geolite2_database_path)
+
+
 def get_geoip_reader() -> Reader:
-    """Get the GeoIP database reader."""
-    return Reader(settings.geolite2_database_path)
+    """Get the current GeoIP database reader."""
+    return get_geoip_database().reader
+
+
+def close_geoip_database() -> None:
+    """Close the GeoIP database, if it was opened."""
+    if get_geoip_database.cache_info().currsize:
+        get_geoip_database().close()
+        get_geoip_database.cache_clear()
+
+
+async def watch_geoip_database() -> None:
+    """Reload the GeoIP database whenever its file is updated."""
+    while True:
+        await asyncio.sleep(GEOIP_DATABASE_CHECK_INTERVAL)
+        # the database is opened on the first lookup
+        if not get_geoip_database.cache_info().currsize:
+            continue
+        try:
+            if await get_geoip_database().reload_if_changed():
+                logger.info("Reloaded the GeoIP database.")
+        except (OSError, ValueError):
+            # the file may be mid-update, so try again later
+            logger.exception("Couldn't reload the GeoIP database.")
+
+
+@lru_cache
+def get_ip_location_cache() -> LRUCache[str, str]:
+    """Get the IP location cache (keyed by IP address)."""
+    return register_cache(
+        LRUCache(
+            name="ip_locations",
+            max_size=settings.ip_location_cache_size,
+            ttl=settings.ip_location_cache_ttl,
+        ),
+    )
+
+
+def resolve_ip_location(ip_address: str) -> str:
+    """Get the location string for the given IP address."""
+    cache = get_ip_location_cache()
+    location = cache.get(ip_address)
+    if location is None:
+        location = get_city_location(
+            city=get_geoip_city(
+                ip_address=ip_address,
+                geoip_reader=get_geoip_reader(),
+            ),
+        )
+        cache.set(ip_address, location)
+    return location
+
+
+def resolve_ip_location_unless_deferred(ip_address: str) -> str | None:
+    """
+    Get the location string for the given IP address.
+
+    Returns `None` when GeoIP enrichment is deferred to the worker.
+    """
+    if settings.geoip_enrichment_deferred:
+        return None
+    return resolve_ip_location(ip_address)
@@ -0,0 +1,94 @@
+import asyncio
+import logging
+from datetime import timedelta
+
+from asgi_correlation_id import correlation_id
+from saq import Queue
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.lib.constants import (
+    OUTBOX_RELAY_BATCH_SIZE,
+    OUTBOX_RELAY_GRACE_PERIOD,
+    OUTBOX_RELAY_INTERVAL,
+)
+from app.lib.database.unit_of_work import UnitOfWork
+from app.models.outbox_message import OutboxMessage
+from app.repositories.outbox_message import OutboxMessageRepo
+
+logger = logging.getLogger(__name__)
+
+
+async def enqueue_outbox_message(
+    *,
+    queue: Queue,
+    outbox_message: OutboxMessage,
+) -> None:
+    """
+    Enqueue the task for the given outbox message.
+
+    The outbox message ID is used as the job key, so enqueueing the
+    same message again while its job is pending doesn't run it twice.
+    """
+    correlation_id.set(outbox_message.request_id)
+    await queue.enqueue(
+        outbox_message.task_name,
+        key=str(outbox_message.id),
+        **outbox_message.task_kwargs,
+    )
+
+
+async def relay_outbox_messages(
+    *,
+    session_factory: async_sessionmaker[AsyncSession],
+    queue: Queue,
+) -> int:
+    """
+    Relay a batch of outbox messages to the task queue.
+
+    Returns the amount of relayed outbox messages.
+    """
+    async with session_factory() as session, UnitOfWork(session=session):
+        outbox_message_repo = OutboxMessageRepo(session=session)
+        outbox_messages = await outbox_message_repo.claim_batch(
+            limit=OUTBOX_RELAY_BATCH_SIZE,
+            # recent messages are usually enqueued by the task buffer
+            older_than=timedelta(seconds=OUTBOX_RELAY_GRACE_PERIOD),
+        )
+        if not outbox_messages:
+            return 0
+        # enqueue the whole batch concurrently, each in its own context
+        await asyncio.gather(
+            *(
+                enqueue_outbox_message(
+                    queue=queue,
+                    outbox_message=outbox_message,
+                )
+                for outbox_message in outbox_messages
+            ),
+        )
+        await outbox_message_repo.delete_all(
+            outbox_message_ids=[
+                outbox_message.id for outbox_message in outbox_messages
+            ],
+        )
+    return len(outbox_messages)
+
+
+async def run_outbox_relay(
+    *,
+    session_factory: async_sessionmaker[AsyncSession],
+    queue: Queue,
+) -> None:
+    """Keep relaying outbox messages to the task queue."""
+    while True:
+        try:
+            relayed_count = await relay_outbox_messages(
+                session_factory=session_factory,
+                queue=queue,
+            )
+        except Exception:
+            logger.exception("Couldn't relay outbox messages.")
+            relayed_count = 0
+        # keep draining while there's a backlog
+        if relayed_count < OUTBOX_RELAY_BATCH_SIZE:
+            await asyncio.sleep(OUTBOX_RELAY_INTERVAL)
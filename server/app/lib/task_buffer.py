@@ -0,0 +1,125 @@
+import asyncio
+import contextlib
+import logging
+from collections import deque
+from functools import lru_cache
+from uuid import UUID
+
+from saq import Queue
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.lib.constants import TASK_BUFFER_BATCH_SIZE, TASK_BUFFER_FLUSH_INTERVAL
+from app.lib.database.session_factory import get_session_factory
+from app.lib.database.unit_of_work import UnitOfWork
+from app.lib.outbox_relay import enqueue_outbox_message
+from app.models.outbox_message import OutboxMessage
+from app.repositories.outbox_message import OutboxMessageRepo
+from app.worker import task_queue
+
+logger = logging.getLogger(__name__)
+
+
+class TaskBuffer:
+    """
+    An in-process buffer of committed outbox messages.
+
+    Requests push outbox messages without waiting on the task queue, and
+    a background task enqueues them in batches, deleting the enqueued
+    messages from the outbox. Messages that are lost or fail to enqueue
+    are still delivered by the outbox relay.
+    """
+
+    def __init__(
+        self,
+        queue: Queue,
+        session_factory: async_sessionmaker[AsyncSession],
+    ) -> None:
+        self._queue = queue
+        self._session_factory = session_factory
+        self._outbox_messages: deque[OutboxMessage] = deque()
+        self._batch_ready = asyncio.Event()
+
+    def push(self, outbox_message: OutboxMessage) -> None:
+        """Buffer the given committed outbox message for enqueueing."""
+        self._outbox_messages.append(outbox_message)
+        if len(self._outbox_messages) >= TASK_BUFFER_BATCH_SIZE:
+            self._batch_ready.set()
+
+    async def flush(self) -> int:
+        """
+        Enqueue a batch of buffered outbox messages.
+
+        Returns the amount of flushed outbox messages.
+        """
+        self._batch_ready.clear()
+        outbox_messages = [
+            self._outbox_messages.popleft()
+            for _ in range(min(len(self._outbox_messages), TASK_BUFFER_BATCH_SIZE))
+        ]
+        results = await asyncio.gather(
+            *(
+                enqueue_outbox_message(
+                    queue=self._queue,
+                    outbox_message=outbox_message,
+                )
+                for outbox_message in outbox_messages
+            ),
+            return_exceptions=True,
+        )
+        enqueued_ids = []
+        for outbox_message, result in zip(outbox_messages, results, strict=True):
+            if isinstance(result, Exception):
+                # the outbox relay retries the message later
+                logger.warning(
+                    "Couldn't enqueue outbox message %s.",
+                    outbox_message.id,
+                    exc_info=result,
+                )
+            else:
+                enqueued_ids.append(outbox_message.id)
+        if enqueued_ids:
+            await self._delete_enqueued(outbox_message_ids=enqueued_ids)
+        return len(outbox_messages)
+
+    async def _delete_enqueued(self, *, outbox_message_ids: list[UUID]) -> None:
+        """
+        Delete the given enqueued outbox messages.
+
+        The job key only deduplicates jobs until they complete, so messages
+        left behind would be enqueued (and run) again by the outbox relay.
+        """
+        try:
+            async with self._session_factory() as session, UnitOfWork(session=session):
+                await OutboxMessageRepo(session=session).delete_all(
+                    outbox_message_ids=outbox_message_ids,
+                )
+        except Exception:
+            logger.exception(
+                "Couldn't delete %d enqueued outbox messages.",
+                len(outbox_message_ids),
+            )
+
+    async def drain(self) -> None:
+        """Enqueue all buffered outbox messages."""
+        while self._outbox_messages:
+            await self.flush()
+
+    async def run(self) -> None:
+        """Keep enqueueing buffered outbox messages in batches."""
+        while True:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(
+                    self._batch_ready.wait(),
+                    timeout=TASK_BUFFER_FLUSH_INTERVAL,
+                )
+            if self._outbox_messages:
+                await self.flush()
+
+    def __len__(self) -> int:
+        return len(self._outbox_messages)
+
+
+@lru_cache
+def get_task_buffer() -> TaskBuffer:
+    """Get the task buffer for this process."""
+    return TaskBuffer(queue=task_queue, session_factory=get_session_factory())
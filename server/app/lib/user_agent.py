@@ -0,0 +1,33 @@
+from functools import lru_cache
+
+import user_agents
+from user_agents.parsers import UserAgent
+
+from app.config import settings
+from app.lib.cache import LRUCache, register_cache
+
+
+@lru_cache
+def get_user_agent_cache() -> LRUCache[str, UserAgent]:
+    """Get the parsed user agent cache (keyed by user agent string)."""
+    return register_cache(
+        LRUCache(
+            name="user_agents",
+            max_size=settings.user_agent_cache_size,
+        ),
+    )
+
+
+def parse_user_agent(user_agent: str) -> UserAgent:
+    """
+    Parse the given user agent string.
+
+    Parsing runs a large regex cascade, while clients keep sending
+    the same handful of user agents, so parsed user agents are cached.
+    """
+    cache = get_user_agent_cache()
+    parsed_user_agent = cache.get(user_agent)
+    if parsed_user_agent is None:
+        parsed_user_agent = user_agents.parse(user_agent)
+        cache.set(user_agent, parsed_user_agent)
+    return parsed_user_agent
@@ -0,0 +1,59 @@
+from collections.abc import AsyncIterator
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.lib.constants import USER_DATA_EXPORT_BATCH_SIZE
+from app.repositories.user_session import UserSessionRepo
+from app.repositories.webauthn_credential import WebAuthnCredentialRepo
+from app.schemas.base import BaseSchema
+from app.schemas.user_session import UserSessionSchema
+from app.schemas.webauthn_credential import WebAuthnCredentialSchema
+
+
+def format_export_line(kind: str, schema: BaseSchema) -> bytes:
+    """Format the given schema as an NDJSON export line."""
+    return b'{"type":"%s","data":%s}\n' % (
+        kind.encode(),
+        schema.model_dump_json(by_alias=True).encode(),
+    )
+
+
+async def export_user_data(
+    *,
+    session_factory: async_sessionmaker[AsyncSession],
+    user_id: UUID,
+) -> AsyncIterator[bytes]:
+    """
+    Export the user's sessions and WebAuthn credentials as NDJSON.
+
+    Rows are read through a server-side cursor and serialized one batch
+    at a time, so memory use doesn't grow with the amount of rows. The
+    export outlives the request's dependencies, so it uses its own session.
+    """
+    async with session_factory() as session:
+        user_session_repo = UserSessionRepo(session=session)
+        async for user_sessions in user_session_repo.stream_all(
+            user_id=user_id,
+            batch_size=USER_DATA_EXPORT_BATCH_SIZE,
+        ):
+            yield b"".join(
+                format_export_line(
+                    "user_session",
+                    UserSessionSchema.model_validate(user_session),
+                )
+                for user_session in user_sessions
+            )
+
+        webauthn_credential_repo = WebAuthnCredentialRepo(session=session)
+        async for webauthn_credentials in webauthn_credential_repo.stream_all(
+            user_id=user_id,
+            batch_size=USER_DATA_EXPORT_BATCH_SIZE,
+        ):
+            yield b"".join(
+                format_export_line(
+                    "webauthn_credential",
+                    WebAuthnCredentialSchema.model_validate(webauthn_credential),
+                )
+                for webauthn_credential in webauthn_credentials
+            )
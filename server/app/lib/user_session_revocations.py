@@ -0,0 +1,140 @@
+import asyncio
+import logging
+import time
+from functools import lru_cache
+from uuid import UUID
+
+from redis.asyncio import Redis
+from redis.asyncio.client import PubSub
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.lib.constants import (
+    REVOKED_USER_SESSIONS_KEY,
+    USER_SESSION_REVOCATIONS_CHANNEL,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class RevokedUserSessions:
+    """
+    An in-process set of recently revoked user session IDs.
+
+    Entries only need to outlive the access tokens issued for the
+    revoked user session, so they are dropped once they expire.
+    """
+
+    def __init__(self) -> None:
+        self._expires_at: dict[UUID, float] = {}
+        # whether the set is known to be in sync with redis
+        self.is_synced = False
+
+    def add(self, user_session_id: UUID, expires_at: float) -> None:
+        """Mark the given user session as revoked until the given time."""
+        self._prune()
+        self._expires_at[user_session_id] = max(
+            expires_at,
+            self._expires_at.get(user_session_id, expires_at),
+        )
+
+    def replace(self, revocations: dict[UUID, float]) -> None:
+        """Replace all revocations with the given revocations."""
+        self._expires_at = revocations
+        self._prune()
+
+    def is_revoked(self, user_session_id: UUID) -> bool:
+        """Check whether the given user session has been revoked."""
+        expires_at = self._expires_at.get(user_session_id)
+        return expires_at is not None and expires_at > time.time()
+
+    def _prune(self) -> None:
+        """Drop expired revocations."""
+        now = time.time()
+        for user_session_id, expires_at in list(self._expires_at.items()):
+            if expires_at <= now:
+                del self._expires_at[user_session_id]
+
+    def __len__(self) -> int:
+        return len(self._expires_at)
+
+
+@lru_cache
+def get_revoked_user_sessions() -> RevokedUserSessions:
+    """Get the revoked user sessions for this process."""
+    return RevokedUserSessions()
+
+
+def format_user_session_revocations(
+    revocations: dict[UUID, float],
+) -> str:
+    """Format the given user session revocations for publishing."""
+    return " ".join(
+        f"{user_session_id}:{expires_at}"
+        for user_session_id, expires_at in revocations.items()
+    )
+
+
+def parse_user_session_revocations(data: bytes) -> dict[UUID, float]:
+    """Parse published user session revocations."""
+    revocations = {}
+    for revocation in data.decode().split():
+        user_session_id, expires_at = revocation.split(":")
+        revocations[UUID(user_session_id)] = float(expires_at)
+    return revocations
+
+
+async def add_published_revocations(
+    *,
+    pubsub: PubSub,
+    revoked_user_sessions: RevokedUserSessions,
+) -> None:
+    """Add the revocations published to the given subscription."""
+    async for message in pubsub.listen():
+        if message["type"] != "message":
+            continue
+        for user_session_id, expires_at in parse_user_session_revocations(
+            message["data"],
+        ).items():
+            revoked_user_sessions.add(user_session_id, expires_at)
+
+
+async def listen_for_user_session_revocations(
+    *,
+    redis_client: Redis,
+    revoked_user_sessions: RevokedUserSessions,
+) -> None:
+    """Keep the revoked user sessions in sync as revocations are published."""
+    while True:
+        try:
+            async with redis_client.pubsub() as pubsub:
+                await pubsub.subscribe(USER_SESSION_REVOCATIONS_CHANNEL)
+                # revocations may have been published while we weren't
+                # subscribed, so reload them before trusting the set again
+                revocations = await redis_client.zrangebyscore(
+                    REVOKED_USER_SESSIONS_KEY,
+                    min=time.time(),
+                    max="+inf",
+                    withscores=True,
+                )
+                revoked_user_sessions.replace(
+                    {
+                        UUID(bytes=user_session_id): expires_at
+                        for user_session_id, expires_at in revocations
+                    },
+                )
+                revoked_user_sessions.is_synced = True
+                await add_published_revocations(
+                    pubsub=pubsub,
+                    revoked_user_sessions=revoked_user_sessions,
+                )
+        except RedisConnectionError:
+            revoked_user_sessions.is_synced = False
+            await asyncio.sleep(1)
+        except Exception:
+            # a malformed message must not stop the listener for good
+            logger.exception("User session revocation listener failed.")
+            revoked_user_sessions.is_synced = False
+            await asyncio.sleep(1)
+        except BaseException:
+            revoked_user_sessions.is_synced = False
+            raise
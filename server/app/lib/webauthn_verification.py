@@ -0,0 +1,251 @@
+import asyncio
+import multiprocessing
+import threading
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache, partial
+from hashlib import sha256
+from typing import NamedTuple, ParamSpec, TypeVar
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives.asymmetric.types import PublicKeyTypes
+from webauthn.authentication.verify_authentication_response import (
+    VerifiedAuthentication,
+)
+from webauthn.helpers import (
+    bytes_to_base64url,
+    byteslike_to_bytes,
+    decode_credential_public_key,
+    decoded_public_key_to_cryptography,
+    parse_authenticator_data,
+    parse_backup_flags,
+    parse_client_data_json,
+    verify_signature,
+)
+from webauthn.helpers.cose import COSEAlgorithmIdentifier
+from webauthn.helpers.exceptions import InvalidAuthenticationResponse
+from webauthn.helpers.structs import (
+    AuthenticationCredential,
+    AuthenticatorData,
+    ClientDataType,
+    TokenBindingStatus,
+)
+
+from app.config import ExecutorKind, settings
+from app.lib.cache import LRUCache, register_cache
+
+P = ParamSpec("P")
+
+T = TypeVar("T")
+
+
+class CredentialPublicKey(NamedTuple):
+    """A credential public key, loaded for signature verification."""
+
+    alg: COSEAlgorithmIdentifier
+    public_key: PublicKeyTypes
+
+
+# the public key cache is shared between executor threads
+_public_key_cache_lock = threading.Lock()
+
+
+@lru_cache
+def get_webauthn_executor() -> Executor:
+    """Get the executor for CPU-bound WebAuthn verification."""
+    if settings.webauthn_executor_kind == ExecutorKind.process:
+        return ProcessPoolExecutor(
+            max_workers=settings.webauthn_executor_max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return ThreadPoolExecutor(
+        max_workers=settings.webauthn_executor_max_workers,
+        thread_name_prefix="webauthn",
+    )
+
+
+def shutdown_webauthn_executor() -> None:
+    """Shut down the WebAuthn verification executor, if it was started."""
+    if get_webauthn_executor.cache_info().currsize:
+        get_webauthn_executor().shutdown(wait=True, cancel_futures=True)
+        get_webauthn_executor.cache_clear()
+
+
+async def run_in_webauthn_executor(
+    func: Callable[P, T],
+    *args: P.args,
+    **kwargs: P.kwargs,
+) -> T:
+    """Run the given CPU-bound function without blocking the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(
+        get_webauthn_executor(),
+        partial(func, *args, **kwargs),
+    )
+
+
+@lru_cache
+def get_public_key_cache() -> LRUCache[tuple[bytes, bytes], CredentialPublicKey]:
+    """
+    Get the credential public key cache.
+
+    Keyed by credential ID and public key hash, so that a credential
+    whose public key changes never reuses its old public key.
+    """
+    return register_cache(
+        LRUCache(
+            name="webauthn_public_keys",
+            max_size=settings.webauthn_public_key_cache_size,
+        ),
+    )
+
+
+def load_credential_public_key(
+    *,
+    credential_id: bytes,
+    credential_public_key: bytes,
+) -> CredentialPublicKey:
+    """
+    Load the given COSE encoded credential public key.
+
+    Decoding and loading the public key is repeated on every login
+    with the same credential, so loaded public keys are cached.
+    """
+    cache = get_public_key_cache()
+    key = (credential_id, sha256(credential_public_key).digest())
+    with _public_key_cache_lock:
+        loaded_public_key = cache.get(key)
+    if loaded_public_key is None:
+        decoded_public_key = decode_credential_public_key(credential_public_key)
+        loaded_public_key = CredentialPublicKey(
+            alg=decoded_public_key.alg,
+            public_key=decoded_public_key_to_cryptography(decoded_public_key),
+        )
+        with _public_key_cache_lock:
+            cache.set(key, loaded_public_key)
+    return loaded_public_key
+
+
+def verify_client_data(
+    client_data_bytes: bytes,
+    *,
+    expected_challenge: bytes,
+    expected_origin: str,
+) -> None:
+    """Verify the client data of an authentication response."""
+    try:
+        client_data = parse_client_data_json(client_data_bytes)
+    # like py_webauthn, treat any parsing error as a malformed response
+    except Exception as exception:  # noqa: BLE001
+        msg = "clientDataJSON was malformed."
+        raise InvalidAuthenticationResponse(msg) from exception
+    if client_data.type != ClientDataType.WEBAUTHN_GET:
+        msg = f'Unexpected client data type "{client_data.type}".'
+        raise InvalidAuthenticationResponse(msg)
+    if client_data.challenge != expected_challenge:
+        msg = "Client data challenge was not expected challenge."
+        raise InvalidAuthenticationResponse(msg)
+    if client_data.origin != expected_origin:
+        msg = f'Unexpected client data origin "{client_data.origin}".'
+        raise InvalidAuthenticationResponse(msg)
+    if client_data.token_binding and client_data.token_binding.status not in (
+        TokenBindingStatus.SUPPORTED,
+        TokenBindingStatus.PRESENT,
+    ):
+        msg = f'Unexpected token binding status "{client_data.token_binding.status}".'
+        raise InvalidAuthenticationResponse(msg)
+
+
+def verify_authenticator_data(
+    authenticator_data_bytes: bytes,
+    *,
+    expected_rp_id: str,
+    credential_current_sign_count: int,
+    require_user_verification: bool,
+) -> AuthenticatorData:
+    """Verify the authenticator data of an authentication response."""
+    try:
+        authenticator_data = parse_authenticator_data(authenticator_data_bytes)
+    except Exception as exception:  # noqa: BLE001
+        msg = "authenticatorData was malformed."
+        raise InvalidAuthenticationResponse(msg) from exception
+    if authenticator_data.rp_id_hash != sha256(expected_rp_id.encode()).digest():
+        msg = "Unexpected RP ID hash."
+        raise InvalidAuthenticationResponse(msg)
+    if not authenticator_data.flags.up:
+        msg = "User was not present during authentication."
+        raise InvalidAuthenticationResponse(msg)
+    if require_user_verification and not authenticator_data.flags.uv:
+        msg = "User verification is required but user was not verified."
+        raise InvalidAuthenticationResponse(msg)
+    # the sign count must increase over the last one, or this may be a replay
+    if (
+        authenticator_data.sign_count > 0 or credential_current_sign_count > 0
+    ) and authenticator_data.sign_count <= credential_current_sign_count:
+        msg = (
+            f"Response sign count of {authenticator_data.sign_count} was not "
+            f"greater than current count of {credential_current_sign_count}."
+        )
+        raise InvalidAuthenticationResponse(msg)
+    return authenticator_data
+
+
+def verify_authentication_response(
+    *,
+    credential: AuthenticationCredential,
+    expected_challenge: bytes,
+    expected_rp_id: str,
+    expected_origin: str,
+    credential_public_key: bytes,
+    credential_current_sign_count: int,
+    require_user_verification: bool = False,
+) -> VerifiedAuthentication:
+    """
+    Verify the authenticator's response for authentication.
+
+    Mirrors py_webauthn's `verify_authentication_response`, which has no
+    way to accept a loaded public key, verifying the signature with the
+    cached public key once the response's other checks pass.
+    """
+    if bytes_to_base64url(credential.raw_id) != credential.id:
+        msg = "id and raw_id were not equivalent."
+        raise InvalidAuthenticationResponse(msg)
+
+    client_data_bytes = byteslike_to_bytes(credential.response.client_data_json)
+    authenticator_data_bytes = byteslike_to_bytes(
+        credential.response.authenticator_data,
+    )
+    verify_client_data(
+        client_data_bytes,
+        expected_challenge=expected_challenge,
+        expected_origin=expected_origin,
+    )
+    authenticator_data = verify_authenticator_data(
+        authenticator_data_bytes,
+        expected_rp_id=expected_rp_id,
+        credential_current_sign_count=credential_current_sign_count,
+        require_user_verification=require_user_verification,
+    )
+
+    loaded_public_key = load_credential_public_key(
+        credential_id=credential.raw_id,
+        credential_public_key=credential_public_key,
+    )
+    try:
+        verify_signature(
+            public_key=loaded_public_key.public_key,
+            signature_alg=loaded_public_key.alg,
+            signature=byteslike_to_bytes(credential.response.signature),
+            data=authenticator_data_bytes + sha256(client_data_bytes).digest(),
+        )
+    except InvalidSignature as exception:
+        msg = "Could not verify authentication signature."
+        raise InvalidAuthenticationResponse(msg) from exception
+
+    backup_flags = parse_backup_flags(authenticator_data.flags)
+    return VerifiedAuthentication(
+        credential_id=credential.raw_id,
+        new_sign_count=authenticator_data.sign_count,
+        credential_device_type=backup_flags.credential_device_type,
+        credential_backed_up=backup_flags.credential_backed_up,
+        user_verified=authenticator_data.flags.uv,
+    )
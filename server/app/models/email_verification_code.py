@@ -37,4 +37,6 @@ class EmailVerificationCode(Base):
         index=True,
     )
 
-    expires_at: Mapped[datetime]
+    expires_at: Mapped[datetime] = mapped_column(
+        index=True,
+    )
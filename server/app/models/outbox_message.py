@@ -0,0 +1,38 @@
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import String, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql.functions import now
+
+from app.lib.database.base import Base
+
+
+class OutboxMessage(Base):
+    __tablename__ = "outbox_messages"
+
+    id: Mapped[UUID] = mapped_column(
+        primary_key=True,
+        server_default=text(
+            "gen_random_uuid()",
+        ),
+    )
+
+    task_name: Mapped[str] = mapped_column(
+        String(255),
+    )
+
+    task_kwargs: Mapped[dict[str, Any]] = mapped_column(
+        JSONB,
+    )
+
+    request_id: Mapped[str | None] = mapped_column(
+        String(255),
+    )
+
+    created_at: Mapped[datetime] = mapped_column(
+        server_default=now(),
+        index=True,
+    )
@@ -42,4 +42,6 @@ class RegisterFlow(Base):
 
     user_agent: Mapped[str]
 
-    expires_at: Mapped[datetime]
+    expires_at: Mapped[datetime] = mapped_column(
+        index=True,
+    )
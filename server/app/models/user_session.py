@@ -2,7 +2,7 @@ from datetime import datetime
 from typing import TYPE_CHECKING
 from uuid import UUID
 
-from sqlalchemy import ForeignKey, String, text
+from sqlalchemy import ForeignKey, Index, String, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql.functions import now
 
@@ -25,7 +25,6 @@ class UserSession(Base):
 
     user_id: Mapped[UUID] = mapped_column(
         ForeignKey("users.id"),
-        index=True,
     )
 
     webauthn_credential_id: Mapped[UUID] = mapped_column(
@@ -36,7 +35,8 @@ class UserSession(Base):
         String(40),
     )
 
-    location: Mapped[str] = mapped_column(
+    # resolved in the background when GeoIP enrichment is deferred
+    location: Mapped[str | None] = mapped_column(
         String(256),
     )
 
@@ -55,3 +55,18 @@ class UserSession(Base):
     webauthn_credential: Mapped["WebAuthnCredential"] = relationship(
         back_populates="user_sessions",
     )
+
+
+# serves keyset pagination of a user's sessions, newest first
+Index(
+    "user_sessions_user_id_created_at_id_idx",
+    UserSession.user_id,
+    UserSession.created_at.desc(),
+    UserSession.id,
+)
+
+Index(
+    "user_sessions_pending_location_idx",
+    UserSession.id,
+    postgresql_where=UserSession.location.is_(None),
+)
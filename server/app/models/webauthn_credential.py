@@ -2,7 +2,7 @@ from datetime import datetime
 from typing import TYPE_CHECKING
 from uuid import UUID
 
-from sqlalchemy import ForeignKey, text
+from sqlalchemy import ForeignKey, Index, text
 from sqlalchemy.dialects.postgresql import ARRAY, ENUM
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql.functions import now
@@ -18,6 +18,14 @@ if TYPE_CHECKING:
 class WebAuthnCredential(Base):
     __tablename__ = "webauthn_credentials"
 
+    __table_args__ = (
+        Index(
+            "webauthn_credentials_credential_id_user_id_idx",
+            "credential_id",
+            "user_id",
+        ),
+    )
+
     id: Mapped[UUID] = mapped_column(
         primary_key=True,
         server_default=text(
@@ -25,7 +33,7 @@ class WebAuthnCredential(Base):
         ),
     )
 
-    credential_id: Mapped[bytes] = mapped_column(index=True)
+    credential_id: Mapped[bytes]
 
     user_id: Mapped[UUID] = mapped_column(
         ForeignKey("users.id"),
@@ -0,0 +1,137 @@
+import hmac
+import time
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from hashlib import sha256
+from uuid import UUID
+
+from redis.asyncio import Redis
+
+from app.config import settings
+from app.lib.constants import (
+    REVOKED_USER_SESSIONS_KEY,
+    USER_SESSION_REVOCATIONS_CHANNEL,
+)
+from app.lib.user_session_revocations import (
+    RevokedUserSessions,
+    format_user_session_revocations,
+)
+from app.types.auth import UserInfo
+
+# user ID (16 bytes) + user session ID (16 bytes) + expires at (8 bytes)
+ACCESS_TOKEN_PAYLOAD_SIZE = 40
+
+
+class AccessTokenRepo:
+    """
+    Short-lived access tokens, signed with the secret key.
+
+    Access tokens are verified without any network round trips.
+    Revoked user sessions are tracked in-process, and kept in
+    sync with other processes through redis.
+    """
+
+    def __init__(
+        self,
+        redis_client: Redis,
+        revoked_user_sessions: RevokedUserSessions,
+    ) -> None:
+        self._redis_client = redis_client
+        self._revoked_user_sessions = revoked_user_sessions
+
+    def create(
+        self,
+        *,
+        user_id: UUID,
+        user_session_id: UUID,
+    ) -> str:
+        """Create a new access token."""
+        expires_at = int(time.time()) + settings.access_token_expires_in
+        payload = user_id.bytes + user_session_id.bytes + expires_at.to_bytes(8, "big")
+        return ".".join(
+            [
+                self._encode(payload),
+                self._encode(self.sign(payload)),
+            ],
+        )
+
+    @staticmethod
+    def sign(payload: bytes) -> bytes:
+        """Sign the given access token payload."""
+        return hmac.new(
+            key=settings.secret_key.get_secret_value().encode(),
+            msg=payload,
+            digestmod=sha256,
+        ).digest()
+
+    @staticmethod
+    def _encode(data: bytes) -> str:
+        """Encode the given data as unpadded base64url."""
+        return urlsafe_b64encode(data).rstrip(b"=").decode()
+
+    @staticmethod
+    def _decode(data: str) -> bytes:
+        """Decode the given unpadded base64url data."""
+        return urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+    def get_user_info(self, *, access_token: str) -> UserInfo | None:
+        """
+        Get the user ID and user session ID for the access token.
+
+        Returns `None` for invalid, expired or revoked access tokens, and
+        whenever revocations might be missing from this process.
+        """
+        if not self._revoked_user_sessions.is_synced:
+            return None
+        try:
+            encoded_payload, encoded_signature = access_token.split(".")
+            payload = self._decode(encoded_payload)
+            signature = self._decode(encoded_signature)
+        except ValueError:
+            return None
+        if len(payload) != ACCESS_TOKEN_PAYLOAD_SIZE or not hmac.compare_digest(
+            signature,
+            self.sign(payload),
+        ):
+            return None
+        if int.from_bytes(payload[32:], "big") <= time.time():
+            return None
+        user_session_id = UUID(bytes=payload[16:32])
+        if self._revoked_user_sessions.is_revoked(user_session_id):
+            return None
+        return UserInfo(
+            user_id=UUID(bytes=payload[:16]),
+            user_session_id=user_session_id,
+        )
+
+    def is_revoked(self, *, user_session_id: UUID) -> bool:
+        """Check whether the given user session has been revoked recently."""
+        return self._revoked_user_sessions.is_revoked(user_session_id)
+
+    async def revoke(self, *, user_session_ids: list[UUID]) -> None:
+        """Revoke all access tokens for the given user sessions."""
+        if not user_session_ids:
+            return
+        now = time.time()
+        # revocations only need to outlive the access tokens issued so far
+        expires_at = now + settings.access_token_expires_in
+        revocations = dict.fromkeys(user_session_ids, expires_at)
+        for user_session_id in user_session_ids:
+            self._revoked_user_sessions.add(user_session_id, expires_at)
+        async with self._redis_client.pipeline(transaction=True) as pipeline:
+            pipeline.zadd(
+                REVOKED_USER_SESSIONS_KEY,
+                mapping={
+                    user_session_id.bytes: expires_at
+                    for user_session_id in user_session_ids
+                },
+            )
+            pipeline.zremrangebyscore(
+                REVOKED_USER_SESSIONS_KEY,
+                min="-inf",
+                max=now,
+            )
+            pipeline.publish(
+                USER_SESSION_REVOCATIONS_CHANNEL,
+                format_user_session_revocations(revocations),
+            )
+            await pipeline.execute()
@@ -1,15 +1,104 @@
+import time
 from hashlib import sha256
 from secrets import token_hex
 from uuid import UUID
 
 from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
 
+from app.config import settings
+from app.lib.cache import LRUCache
+from app.lib.constants import (
+    AUTHENTICATION_TOKEN_INVALIDATIONS_CHANNEL,
+    AUTHENTICATION_TOKEN_MAX_REFRESH_INTERVAL,
+    AUTHENTICATION_TOKEN_OWNERS_PRUNE_BATCH_SIZE,
+    AUTHENTICATION_TOKEN_OWNERS_PRUNE_MAX_BATCHES,
+)
 from app.types.auth import UserInfo
 
+# KEYS[1] - the token key
+# ARGV[1] - the current time (UNIX timestamp)
+# ARGV[2] - the idle expiry (in seconds)
+# ARGV[3] - the refresh interval (in seconds)
+# ARGV[4] - the absolute expiry (in seconds)
+GET_USER_INFO_SCRIPT = """
+local token = redis.call(
+    'HMGET', KEYS[1], 'user_id', 'user_session_id', 'expires_at', 'refreshed_at'
+)
+if not token[1] then
+    return nil
+end
+local now = tonumber(ARGV[1])
+if not token[3] or not token[4] then
+    -- tokens created before expiries were tracked are treated as created now
+    token[3] = now + tonumber(ARGV[4])
+    token[4] = now
+    redis.call('HSET', KEYS[1], 'expires_at', token[3], 'refreshed_at', token[4])
+    redis.call('EXPIRE', KEYS[1], math.min(tonumber(ARGV[2]), tonumber(ARGV[4])))
+end
+if now - tonumber(token[4]) >= tonumber(ARGV[3]) then
+    local ttl = math.min(tonumber(ARGV[2]), tonumber(token[3]) - now)
+    if ttl <= 0 then
+        redis.call('DEL', KEYS[1])
+        return nil
+    end
+    redis.call('EXPIRE', KEYS[1], ttl)
+    redis.call('HSET', KEYS[1], 'refreshed_at', now)
+end
+return {token[1], token[2]}
+"""
+
+# KEYS[1] - the token owner key
+# ARGV[1] - the token key prefix
+# ARGV[2] - the invalidations channel
+DELETE_ALL_SCRIPT = """
+local token_hashes = redis.call('SMEMBERS', KEYS[1])
+for _, token_hash in ipairs(token_hashes) do
+    redis.call('DEL', ARGV[1] .. token_hash)
+end
+redis.call('DEL', KEYS[1])
+if #token_hashes > 0 then
+    redis.call('PUBLISH', ARGV[2], table.concat(token_hashes, ' '))
+end
+return token_hashes
+"""
+
+# KEYS[1] - the token owner key
+# ARGV[1] - the token key prefix
+# ARGV[2] - the invalidations channel
+# ARGV[3] - the user session ID
+DELETE_ALL_FOR_USER_SESSION_SCRIPT = """
+local deleted_hashes = {}
+for _, token_hash in ipairs(redis.call('SMEMBERS', KEYS[1])) do
+    local token_key = ARGV[1] .. token_hash
+    if redis.call('HGET', token_key, 'user_session_id') == ARGV[3] then
+        redis.call('DEL', token_key)
+        redis.call('SREM', KEYS[1], token_hash)
+        table.insert(deleted_hashes, token_hash)
+    end
+end
+if #deleted_hashes > 0 then
+    redis.call('PUBLISH', ARGV[2], table.concat(deleted_hashes, ' '))
+end
+return deleted_hashes
+"""
+
 
 class AuthenticationTokenRepo:
-    def __init__(self, redis_client: Redis) -> None:
+    def __init__(
+        self,
+        redis_client: Redis,
+        cache: LRUCache[str, UserInfo] | None = None,
+    ) -> None:
         self._redis_client = redis_client
+        self._cache = cache
+        self._get_user_info_script = redis_client.register_script(
+            GET_USER_INFO_SCRIPT,
+        )
+        self._delete_all_script = redis_client.register_script(DELETE_ALL_SCRIPT)
+        self._delete_all_for_user_session_script = redis_client.register_script(
+            DELETE_ALL_FOR_USER_SESSION_SCRIPT,
+        )
 
     async def create(
         self,
@@ -23,21 +112,40 @@ class AuthenticationTokenRepo:
         authentication_token_hash = self.hash_token(
             authentication_token=authentication_token,
         )
-        await self._redis_client.hset(
-            name=self.generate_token_key(
-                authentication_token_hash=authentication_token_hash,
-            ),
-            mapping={
-                "user_id": user_id.bytes,
-                "user_session_id": user_session_id.bytes,
-            },
-        )  # type: ignore[misc]
-        await self._redis_client.sadd(
-            self.generate_token_owner_key(
-                user_id=user_id,
-            ),
-            authentication_token_hash,
-        )  # type: ignore[misc]
+        authentication_token_key = self.generate_token_key(
+            authentication_token_hash=authentication_token_hash,
+        )
+        authentication_token_owner_key = self.generate_token_owner_key(
+            user_id=user_id,
+        )
+        now = int(time.time())
+        async with self._redis_client.pipeline(transaction=True) as pipeline:
+            pipeline.hset(
+                name=authentication_token_key,
+                mapping={
+                    "user_id": user_id.bytes,
+                    "user_session_id": user_session_id.bytes,
+                    "expires_at": now + settings.authentication_token_expires_in,
+                    "refreshed_at": now,
+                },
+            )
+            pipeline.expire(
+                authentication_token_key,
+                min(
+                    settings.authentication_token_idle_expires_in,
+                    settings.authentication_token_expires_in,
+                ),
+            )
+            pipeline.sadd(
+                authentication_token_owner_key,
+                authentication_token_hash,
+            )
+            # the owner set never needs to outlive the newest token
+            pipeline.expire(
+                authentication_token_owner_key,
+                settings.authentication_token_expires_in,
+            )
+            await pipeline.execute()
         return authentication_token
 
     @staticmethod
@@ -55,6 +163,29 @@ class AuthenticationTokenRepo:
         """Generate a token owner key for the user ID."""
         return f"auth-token-owners:${user_id}"
 
+    @staticmethod
+    def generate_token_owner_key_pattern() -> str:
+        """Generate a pattern matching all token owner keys."""
+        return "auth-token-owners:$*"
+
+    @staticmethod
+    def generate_prune_cursor_key() -> str:
+        """Generate the key for the token owner pruning cursor."""
+        return "auth-token-owners-prune-cursor"
+
+    @staticmethod
+    def get_refresh_interval() -> int:
+        """
+        Get the interval (in seconds) between refreshes of a token's expiry.
+
+        Tokens are refreshed at least twice per idle expiry, so that
+        a token in active use never idles out between refreshes.
+        """
+        return min(
+            AUTHENTICATION_TOKEN_MAX_REFRESH_INTERVAL,
+            settings.authentication_token_idle_expires_in // 2,
+        )
+
     @staticmethod
     def hash_token(authentication_token: str) -> str:
         """Hash the given authentication token."""
@@ -65,24 +196,167 @@ class AuthenticationTokenRepo:
         *,
         authentication_token: str,
     ) -> UserInfo | None:
-        """Get the user ID and user session ID for the authentication token."""
-        user_info = await self._redis_client.hgetall(
-            name=self.generate_token_key(
-                authentication_token_hash=self.hash_token(
-                    authentication_token=authentication_token,
+        """
+        Get the user ID and user session ID for the authentication token.
+
+        Extends the token's idle expiry, at most once per refresh interval.
+        """
+        authentication_token_hash = self.hash_token(
+            authentication_token=authentication_token,
+        )
+        generation = None
+        if self._cache is not None:
+            cached_user_info = self._cache.get(authentication_token_hash)
+            if cached_user_info is not None:
+                return cached_user_info
+            # an eviction during the lookup must win over caching its result
+            generation = self._cache.generation
+        user_info = await self._get_user_info_script(
+            keys=[
+                self.generate_token_key(
+                    authentication_token_hash=authentication_token_hash,
                 ),
+            ],
+            args=[
+                int(time.time()),
+                settings.authentication_token_idle_expires_in,
+                self.get_refresh_interval(),
+                settings.authentication_token_expires_in,
+            ],
+        )
+        return self._to_user_info(
+            authentication_token_hash=authentication_token_hash,
+            user_info=user_info,
+            generation=generation,
+        )
+
+    async def get_user_info_many(
+        self,
+        *,
+        authentication_tokens: list[str],
+    ) -> list[UserInfo | None]:
+        """
+        Get the user info for each of the given authentication tokens.
+
+        Tokens missing from the cache are resolved in a single pipeline.
+        """
+        authentication_token_hashes = [
+            self.hash_token(authentication_token=authentication_token)
+            for authentication_token in authentication_tokens
+        ]
+        results: list[UserInfo | None] = [None] * len(authentication_token_hashes)
+        missing_indexes = []
+        for index, authentication_token_hash in enumerate(
+            authentication_token_hashes,
+        ):
+            if self._cache is not None:
+                results[index] = self._cache.get(authentication_token_hash)
+            if results[index] is None:
+                missing_indexes.append(index)
+        if missing_indexes:
+            user_infos = await self._get_uncached_user_info_many(
+                authentication_token_hashes=[
+                    authentication_token_hashes[index] for index in missing_indexes
+                ],
+            )
+            for index, user_info in zip(missing_indexes, user_infos, strict=True):
+                results[index] = user_info
+        return results
+
+    async def _get_uncached_user_info_many(
+        self,
+        *,
+        authentication_token_hashes: list[str],
+    ) -> list[UserInfo | None]:
+        """
+        Get the user info for each of the given authentication token hashes.
+
+        Lookups that fail are reported as missing, rather than
+        failing the lookups of the other tokens in the batch.
+        """
+        generation = self._cache.generation if self._cache is not None else None
+        now = int(time.time())
+        async with self._redis_client.pipeline(transaction=False) as pipeline:
+            for authentication_token_hash in authentication_token_hashes:
+                await self._get_user_info_script(
+                    keys=[
+                        self.generate_token_key(
+                            authentication_token_hash=authentication_token_hash,
+                        ),
+                    ],
+                    args=[
+                        now,
+                        settings.authentication_token_idle_expires_in,
+                        self.get_refresh_interval(),
+                        settings.authentication_token_expires_in,
+                    ],
+                    client=pipeline,
+                )
+            user_infos = await pipeline.execute(raise_on_error=False)
+        return [
+            (
+                None
+                if isinstance(user_info, Exception)
+                else self._to_user_info(
+                    authentication_token_hash=authentication_token_hash,
+                    user_info=user_info,
+                    generation=generation,
+                )
+            )
+            for authentication_token_hash, user_info in zip(
+                authentication_token_hashes,
+                user_infos,
+                strict=True,
+            )
+        ]
+
+    def _to_user_info(
+        self,
+        *,
+        authentication_token_hash: str,
+        user_info: list[bytes] | None,
+        generation: int | None,
+    ) -> UserInfo | None:
+        """
+        Convert the stored user info, caching it locally.
+
+        The user info isn't cached if the cache has evicted
+        entries since the given generation.
+        """
+        if user_info is None:
+            return None
+        user_id, user_session_id = user_info
+        result = UserInfo(
+            user_id=UUID(
+                bytes=user_id,
             ),
-        )  # type: ignore[misc]
-        if user_info is not None:
-            return UserInfo(
-                user_id=UUID(
-                    bytes=user_info.get(b"user_id"),
-                ),
-                user_session_id=UUID(
-                    bytes=user_info.get(b"user_session_id"),
-                ),
+            user_session_id=UUID(
+                bytes=user_session_id,
+            ),
+        )
+        if self._cache is not None:
+            self._cache.set(authentication_token_hash, result, generation=generation)
+        return result
+
+    def _invalidate(
+        self,
+        authentication_token_hashes: list[str],
+        pipeline: Pipeline | None = None,
+    ) -> None:
+        """
+        Evict the given authentication token hashes from the local cache.
+
+        When a pipeline is given, the eviction is also published
+        to the caches of all other processes.
+        """
+        if self._cache is not None:
+            for authentication_token_hash in authentication_token_hashes:
+                self._cache.delete(authentication_token_hash)
+        if pipeline is not None and authentication_token_hashes:
+            pipeline.publish(
+                AUTHENTICATION_TOKEN_INVALIDATIONS_CHANNEL,
+                " ".join(authentication_token_hashes),
             )
-        return None
 
     async def delete(
         self,
@@ -94,13 +368,20 @@ class AuthenticationTokenRepo:
         authentication_token_hash = self.hash_token(
             authentication_token=authentication_token,
         )
-        await self._redis_client.delete(authentication_token_hash)
-        await self._redis_client.srem(
-            self.generate_token_owner_key(
-                user_id=user_id,
-            ),
-            authentication_token_hash,
-        )  # type: ignore[misc]
+        async with self._redis_client.pipeline(transaction=True) as pipeline:
+            pipeline.delete(
+                self.generate_token_key(
+                    authentication_token_hash=authentication_token_hash,
+                ),
+            )
+            pipeline.srem(
+                self.generate_token_owner_key(
+                    user_id=user_id,
+                ),
+                authentication_token_hash,
+            )
+            self._invalidate([authentication_token_hash], pipeline=pipeline)
+            await pipeline.execute()
 
     async def delete_all(
         self,
@@ -108,22 +389,110 @@ class AuthenticationTokenRepo:
         user_id: UUID,
     ) -> None:
         """Delete all authentication tokens for the given user ID."""
-        authentication_token_hashes = await self._redis_client.smembers(
-            name=self.generate_token_owner_key(
-                user_id=user_id,
-            ),
-        )  # type: ignore[misc]
-        if authentication_token_hashes:
-            await self._redis_client.delete(
-                *[
-                    self.generate_token_key(
-                        authentication_token_hash=authentication_token_hash,
+        authentication_token_hashes = await self._delete_all_script(
+            keys=[
+                self.generate_token_owner_key(
+                    user_id=user_id,
+                ),
+            ],
+            args=[
+                self.generate_token_key(authentication_token_hash=""),
+                AUTHENTICATION_TOKEN_INVALIDATIONS_CHANNEL,
+            ],
+        )
+        # the script publishes the eviction to other processes itself
+        self._invalidate(
+            [
+                authentication_token_hash.decode()
+                for authentication_token_hash in authentication_token_hashes
+            ],
+        )
+
+    async def delete_all_for_user_session(
+        self,
+        *,
+        user_id: UUID,
+        user_session_id: UUID,
+    ) -> None:
+        """Delete all authentication tokens for the given user session."""
+        authentication_token_hashes = await self._delete_all_for_user_session_script(
+            keys=[
+                self.generate_token_owner_key(
+                    user_id=user_id,
+                ),
+            ],
+            args=[
+                self.generate_token_key(authentication_token_hash=""),
+                AUTHENTICATION_TOKEN_INVALIDATIONS_CHANNEL,
+                user_session_id.bytes,
+            ],
+        )
+        # the script publishes the eviction to other processes itself
+        self._invalidate(
+            [
+                authentication_token_hash.decode()
+                for authentication_token_hash in authentication_token_hashes
+            ],
+        )
+
+    async def prune_token_owners(self) -> int:
+        """
+        Remove expired authentication token hashes from the token owner sets.
+
+        Scans a bounded amount of owner sets per call, resuming where
+        the previous call left off. Returns the amount of pruned hashes.
+        """
+        cursor = int(
+            await self._redis_client.get(self.generate_prune_cursor_key()) or 0,
+        )
+        pruned_count = 0
+        for _ in range(AUTHENTICATION_TOKEN_OWNERS_PRUNE_MAX_BATCHES):
+            cursor, owner_keys = await self._redis_client.scan(
+                cursor=cursor,
+                match=self.generate_token_owner_key_pattern(),
+                count=AUTHENTICATION_TOKEN_OWNERS_PRUNE_BATCH_SIZE,
+            )
+            for owner_key in owner_keys:
+                pruned_count += await self._prune_token_owner(
+                    owner_key=owner_key.decode(),
+                )
+            if cursor == 0:
+                break
+        await self._redis_client.set(self.generate_prune_cursor_key(), cursor)
+        return pruned_count
+
+    async def _prune_token_owner(self, *, owner_key: str) -> int:
+        """Remove expired authentication token hashes from the given owner set."""
+        pruned_count = 0
+        cursor = 0
+        while True:
+            cursor, authentication_token_hashes = await self._redis_client.sscan(
+                name=owner_key,
+                cursor=cursor,
+                count=AUTHENTICATION_TOKEN_OWNERS_PRUNE_BATCH_SIZE,
+            )
+            if authentication_token_hashes:
+                async with self._redis_client.pipeline(
+                    transaction=False,
+                ) as pipeline:
+                    for authentication_token_hash in authentication_token_hashes:
+                        pipeline.exists(
+                            self.generate_token_key(
+                                authentication_token_hash=authentication_token_hash.decode(),
+                            ),
+                        )
+                    exists = await pipeline.execute()
+                dangling_hashes = [
+                    authentication_token_hash.decode()
+                    for authentication_token_hash, token_exists in zip(
+                        authentication_token_hashes,
+                        exists,
+                        strict=True,
                     )
-                    for authentication_token_hash in authentication_token_hashes
+                    if not token_exists
                 ]
-            )
-        await self._redis_client.delete(
-            self.generate_token_owner_key(
-                user_id=user_id,
-            ),
-        )
+                if dangling_hashes:
+                    await self._redis_client.srem(owner_key, *dangling_hashes)  # type: ignore[misc]
+                    pruned_count += len(dangling_hashes)
+            if cursor == 0:
+                return pruned_count
@@ -7,7 +7,6 @@ import backoff
 from sqlalchemy import delete, select, text
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.sql.functions import now
 
 from app.lib.constants import EMAIL_VERIFICATION_CODE_EXPIRES_IN
 from app.models.email_verification_code import EmailVerificationCode
@@ -48,8 +47,9 @@ class EmailVerificationCodeRepo:
                 email_verification_code=verification_code,
             ),
         )
-        self._session.add(email_verification_code)
-        await self._session.commit()
+        # use a savepoint, so that the transaction survives retries
+        async with self._session.begin_nested():
+            self._session.add(email_verification_code)
         return verification_code, email_verification_code
 
     async def get(
@@ -61,11 +61,11 @@ class EmailVerificationCodeRepo:
         """Get an email verification code by ID and verification code."""
         return await self._session.scalar(
             select(EmailVerificationCode).where(
-                EmailVerificationCode.id == email_verification_code_id
-                and EmailVerificationCode.code_hash
+                EmailVerificationCode.id == email_verification_code_id,
+                EmailVerificationCode.code_hash
                 == self.hash_code(
                     email_verification_code=verification_code,
-                )
+                ),
             ),
         )
 
@@ -76,13 +76,3 @@ class EmailVerificationCodeRepo:
                 EmailVerificationCode.email == email,
             ),
         )
-        await self._session.commit()
-
-    async def delete_expired(self) -> None:
-        """Delete all email verification codes which have expired."""
-        await self._session.execute(
-            delete(EmailVerificationCode).where(
-                EmailVerificationCode.expires_at <= now(),
-            ),
-        )
-        await self._session.commit()
@@ -0,0 +1,63 @@
+from datetime import timedelta
+from typing import Any
+from uuid import UUID
+
+from asgi_correlation_id import correlation_id
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.functions import now
+
+from app.models.outbox_message import OutboxMessage
+
+
+class OutboxMessageRepo:
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
+    def create(
+        self,
+        *,
+        task_name: str,
+        task_kwargs: dict[str, Any],
+    ) -> OutboxMessage:
+        """
+        Create a new outbox message for the given task.
+
+        The message is written along with the current unit of work.
+        """
+        outbox_message = OutboxMessage(
+            task_name=task_name,
+            task_kwargs=task_kwargs,
+            request_id=correlation_id.get(),
+        )
+        self._session.add(outbox_message)
+        return outbox_message
+
+    async def claim_batch(
+        self,
+        *,
+        limit: int,
+        older_than: timedelta,
+    ) -> list[OutboxMessage]:
+        """
+        Claim a batch of the oldest outbox messages.
+
+        Claimed messages stay locked until the transaction ends,
+        so that concurrent relays skip them.
+        """
+        outbox_messages = await self._session.scalars(
+            select(OutboxMessage)
+            .where(OutboxMessage.created_at < now() - older_than)
+            .order_by(OutboxMessage.created_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True),
+        )
+        return list(outbox_messages)
+
+    async def delete_all(self, *, outbox_message_ids: list[UUID]) -> None:
+        """Delete the outbox messages with the given IDs."""
+        await self._session.execute(
+            delete(OutboxMessage).where(
+                OutboxMessage.id.in_(outbox_message_ids),
+            ),
+        )
@@ -0,0 +1,66 @@
+from uuid import UUID
+
+from redis.asyncio import Redis
+
+from app.lib.constants import EMAIL_VERIFICATION_CODE_EXPIRES_IN
+
+
+class OutgoingVerificationCodeRepo:
+    """
+    Verification codes waiting to be emailed.
+
+    Only hashes of verification codes are stored in the database, so the
+    plaintext codes are handed to the email tasks through short-lived
+    redis keys, instead of through the outbox.
+
+    Email tasks are delivered at least once, so a verification code is
+    deleted once it has been sent, and tasks run again skip sending it.
+    """
+
+    def __init__(self, redis_client: Redis) -> None:
+        self._redis_client = redis_client
+
+    @staticmethod
+    def generate_verification_code_key(verification_code_id: UUID) -> str:
+        """Generate a verification code key for the verification code ID."""
+        return f"outgoing-verification-codes:{verification_code_id}"
+
+    async def create(
+        self,
+        *,
+        verification_code_id: UUID,
+        verification_code: str,
+    ) -> None:
+        """
+        Store the given verification code until it expires.
+
+        Called once the outbox message referencing the verification code
+        ID has been committed, so that a rolled back use case never leaves
+        a verification code behind.
+        """
+        await self._redis_client.set(
+            name=self.generate_verification_code_key(
+                verification_code_id=verification_code_id,
+            ),
+            value=verification_code,
+            ex=EMAIL_VERIFICATION_CODE_EXPIRES_IN,
+        )
+
+    async def get(self, *, verification_code_id: UUID) -> str | None:
+        """Get the verification code with the given ID, unless it expired."""
+        verification_code = await self._redis_client.get(
+            name=self.generate_verification_code_key(
+                verification_code_id=verification_code_id,
+            ),
+        )
+        if verification_code is not None:
+            return verification_code.decode()
+        return None
+
+    async def delete(self, *, verification_code_id: UUID) -> None:
+        """Delete the verification code with the given ID."""
+        await self._redis_client.delete(
+            self.generate_verification_code_key(
+                verification_code_id=verification_code_id,
+            ),
+        )
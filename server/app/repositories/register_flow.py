@@ -1,8 +1,12 @@
 import secrets
 import string
+import time
+from abc import ABC, abstractmethod
+from datetime import UTC, datetime
 from hashlib import sha256
-from uuid import UUID
+from uuid import UUID, uuid4
 
+from redis.asyncio import Redis
 from sqlalchemy import delete, select, text, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql.functions import now
@@ -15,9 +19,13 @@ from app.lib.enums import RegisterFlowStep
 from app.models.register_flow import RegisterFlow
 
 
-class RegisterFlowRepo:
-    def __init__(self, session: AsyncSession) -> None:
-        self._session = session
+class RegisterFlowRepo(ABC):
+    """
+    Storage for register flows.
+
+    Starting a register flow supersedes any earlier
+    register flow for the same email.
+    """
 
     @staticmethod
     def generate_verification_code() -> str:
@@ -29,6 +37,52 @@ class RegisterFlowRepo:
         """Hash the given email verification code."""
         return sha256(email_verification_code.encode()).hexdigest()
 
+    @abstractmethod
+    async def create(
+        self,
+        *,
+        email: str,
+        ip_address: str,
+        user_agent: str,
+    ) -> tuple[str, RegisterFlow]:
+        """Create a new register flow."""
+
+    @abstractmethod
+    async def recreate_verification_code(
+        self,
+        *,
+        flow_id: UUID,
+    ) -> str:
+        """Recreate the verification code for the register flow."""
+
+    @abstractmethod
+    async def get(
+        self, *, flow_id: UUID, step: RegisterFlowStep | None = None
+    ) -> RegisterFlow | None:
+        """
+        Get a register flow by ID and/ or step.
+
+        Filters expired register flows.
+        """
+
+    @abstractmethod
+    async def update(
+        self,
+        *,
+        register_flow: RegisterFlow,
+        current_step: RegisterFlowStep | None = None,
+    ) -> None:
+        """Update the given register flow."""
+
+    @abstractmethod
+    async def delete(self, *, flow_id: UUID) -> None:
+        """Delete a register flow by ID."""
+
+
+class DatabaseRegisterFlowRepo(RegisterFlowRepo):
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
     async def create(
         self,
         *,
@@ -47,6 +101,11 @@ class RegisterFlowRepo:
 
         verification_code = self.generate_verification_code()
 
+        # supersede earlier register flows for the email
+        await self._session.execute(
+            delete(RegisterFlow).where(RegisterFlow.email == email),
+        )
+
         register_flow = RegisterFlow(
             email=email,
             ip_address=ip_address,
@@ -60,7 +119,7 @@ class RegisterFlowRepo:
         )
 
         self._session.add(register_flow)
-        await self._session.commit()
+        await self._session.flush()
         return verification_code, register_flow
 
     async def recreate_verification_code(
@@ -85,7 +144,6 @@ class RegisterFlowRepo:
                 ),
             ),
         )
-        await self._session.commit()
 
         return verification_code
 
@@ -100,14 +158,15 @@ class RegisterFlowRepo:
         if step is not None:
             return await self._session.scalar(
                 select(RegisterFlow).where(
-                    RegisterFlow.id == flow_id
-                    and RegisterFlow.current_step == step
-                    and RegisterFlow.expires_at >= now()
+                    RegisterFlow.id == flow_id,
+                    RegisterFlow.current_step == step,
+                    RegisterFlow.expires_at >= now(),
                 ),
             )
         return await self._session.scalar(
             select(RegisterFlow).where(
-                RegisterFlow.id == flow_id and RegisterFlow.expires_at >= now()
+                RegisterFlow.id == flow_id,
+                RegisterFlow.expires_at >= now(),
             ),
         )
 
@@ -122,11 +181,227 @@ class RegisterFlowRepo:
             register_flow.current_step = current_step
 
         self._session.add(register_flow)
-        await self._session.commit()
+        await self._session.flush()
 
     async def delete(self, *, flow_id: UUID) -> None:
         """Delete a register flow by ID."""
         await self._session.execute(
             delete(RegisterFlow).where(RegisterFlow.id == flow_id),
         )
-        await self._session.commit()
+
+
+# KEYS[1] - the register flow key
+# KEYS[2] - the register flow email key
+# ARGV[1] - the register flow key prefix
+# ARGV[2] - the register flow expiry (in seconds)
+# ARGV[3] - the register flow ID
+# ARGV[4...] - the register flow fields and values
+CREATE_SCRIPT = """
+local previous_flow_id = redis.call('GET', KEYS[2])
+if previous_flow_id then
+    redis.call('DEL', ARGV[1] .. previous_flow_id)
+end
+redis.call('HSET', KEYS[1], unpack(ARGV, 4))
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+redis.call('SET', KEYS[2], ARGV[3], 'EX', ARGV[2])
+"""
+
+# KEYS[1] - the register flow key
+# ARGV[1...] - the register flow fields and values
+UPDATE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('HSET', KEYS[1], unpack(ARGV))
+end
+"""
+
+# KEYS[1] - the register flow key
+# ARGV[1] - the register flow email key prefix
+# ARGV[2] - the register flow ID
+DELETE_SCRIPT = """
+local email = redis.call('HGET', KEYS[1], 'email')
+redis.call('DEL', KEYS[1])
+if email then
+    local email_key = ARGV[1] .. string.lower(email)
+    if redis.call('GET', email_key) == ARGV[2] then
+        redis.call('DEL', email_key)
+    end
+end
+"""
+
+
+class RedisRegisterFlowRepo(RegisterFlowRepo):
+    """
+    Register flows stored as redis hashes.
+
+    Register flows expire natively, and an index from email to the
+    latest register flow ID lets new register flows supersede old ones.
+    """
+
+    def __init__(self, redis_client: Redis) -> None:
+        self._redis_client = redis_client
+        self._create_script = redis_client.register_script(CREATE_SCRIPT)
+        self._update_script = redis_client.register_script(UPDATE_SCRIPT)
+        self._delete_script = redis_client.register_script(DELETE_SCRIPT)
+
+    @staticmethod
+    def generate_flow_key(flow_id: UUID | str) -> str:
+        """Generate a register flow key for the flow ID."""
+        return f"register-flows:{flow_id}"
+
+    @staticmethod
+    def generate_email_key(email: str) -> str:
+        """Generate a register flow email key for the email."""
+        # emails are matched case insensitively
+        return f"register-flow-emails:{email.lower()}"
+
+    async def create(
+        self,
+        *,
+        email: str,
+        ip_address: str,
+        user_agent: str,
+    ) -> tuple[str, RegisterFlow]:
+        """Create a new register flow."""
+        verification_code = self.generate_verification_code()
+        current_time = time.time()
+        register_flow = RegisterFlow(
+            id=uuid4(),
+            current_step=RegisterFlowStep.EMAIL_VERIFICATION,
+            email=email,
+            ip_address=ip_address,
+            user_agent=user_agent,
+            expires_at=datetime.fromtimestamp(
+                current_time + REGISTER_FLOW_EXPIRES_IN,
+                tz=UTC,
+            ),
+            verification_code_expires_at=datetime.fromtimestamp(
+                current_time + EMAIL_VERIFICATION_CODE_EXPIRES_IN,
+                tz=UTC,
+            ),
+            # hash code before storing
+            verification_code_hash=self.hash_verification_code(
+                email_verification_code=verification_code,
+            ),
+        )
+        await self._create_script(
+            keys=[
+                self.generate_flow_key(flow_id=register_flow.id),
+                self.generate_email_key(email=email),
+            ],
+            args=[
+                self.generate_flow_key(flow_id=""),
+                REGISTER_FLOW_EXPIRES_IN,
+                str(register_flow.id),
+                *self._to_fields(register_flow=register_flow),
+            ],
+        )
+        return verification_code, register_flow
+
+    async def recreate_verification_code(
+        self,
+        *,
+        flow_id: UUID,
+    ) -> str:
+        """Recreate the verification code for the register flow."""
+        verification_code = self.generate_verification_code()
+        await self._update_script(
+            keys=[
+                self.generate_flow_key(flow_id=flow_id),
+            ],
+            args=[
+                "verification_code_hash",
+                self.hash_verification_code(
+                    email_verification_code=verification_code,
+                ),
+                "verification_code_expires_at",
+                time.time() + EMAIL_VERIFICATION_CODE_EXPIRES_IN,
+            ],
+        )
+        return verification_code
+
+    async def get(
+        self, *, flow_id: UUID, step: RegisterFlowStep | None = None
+    ) -> RegisterFlow | None:
+        """
+        Get a register flow by ID and/ or step.
+
+        Filters expired register flows.
+        """
+        fields = await self._redis_client.hgetall(
+            self.generate_flow_key(flow_id=flow_id),
+        )  # type: ignore[misc]
+        if not fields:
+            return None
+        register_flow = self._from_fields(flow_id=flow_id, fields=fields)
+        if step is not None and register_flow.current_step != step:
+            return None
+        return register_flow
+
+    async def update(
+        self,
+        *,
+        register_flow: RegisterFlow,
+        current_step: RegisterFlowStep | None = None,
+    ) -> None:
+        """Update the given register flow."""
+        if current_step is not None:
+            register_flow.current_step = current_step
+
+        await self._update_script(
+            keys=[
+                self.generate_flow_key(flow_id=register_flow.id),
+            ],
+            args=self._to_fields(register_flow=register_flow),
+        )
+
+    async def delete(self, *, flow_id: UUID) -> None:
+        """Delete a register flow by ID."""
+        await self._delete_script(
+            keys=[
+                self.generate_flow_key(flow_id=flow_id),
+            ],
+            args=[
+                self.generate_email_key(email=""),
+                str(flow_id),
+            ],
+        )
+
+    @staticmethod
+    def _to_fields(register_flow: RegisterFlow) -> list[str | float]:
+        """Convert the given register flow to hash fields and values."""
+        return [
+            "current_step",
+            register_flow.current_step,
+            "email",
+            register_flow.email,
+            "verification_code_hash",
+            register_flow.verification_code_hash,
+            "verification_code_expires_at",
+            register_flow.verification_code_expires_at.timestamp(),
+            "ip_address",
+            register_flow.ip_address,
+            "user_agent",
+            register_flow.user_agent,
+            "expires_at",
+            register_flow.expires_at.timestamp(),
+        ]
+
+    @staticmethod
+    def _from_fields(flow_id: UUID, fields: dict[bytes, bytes]) -> RegisterFlow:
+        """Convert the given hash fields to a register flow."""
+        return RegisterFlow(
+            id=flow_id,
+            current_step=RegisterFlowStep(fields[b"current_step"].decode()),
+            email=fields[b"email"].decode(),
+            verification_code_hash=fields[b"verification_code_hash"].decode(),
+            verification_code_expires_at=datetime.fromtimestamp(
+                float(fields[b"verification_code_expires_at"]),
+                tz=UTC,
+            ),
+            ip_address=fields[b"ip_address"].decode(),
+            user_agent=fields[b"user_agent"].decode(),
+            expires_at=datetime.fromtimestamp(
+                float(fields[b"expires_at"]),
+                tz=UTC,
+            ),
+        )
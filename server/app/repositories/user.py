@@ -3,6 +3,7 @@ from uuid import UUID
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.lib.database.routing import read_only
 from app.models.user import User
 
 
@@ -22,7 +23,7 @@ class UserRepo:
             email=email,
         )
         self._session.add(user)
-        await self._session.commit()
+        await self._session.flush()
         return user
 
     async def update(
@@ -36,9 +37,10 @@ class UserRepo:
             user.email = email
 
         self._session.add(user)
-        await self._session.commit()
+        await self._session.flush()
         return user
 
+    @read_only
     async def get(
         self,
         *,
@@ -51,6 +53,7 @@ class UserRepo:
             ),
         )
 
+    @read_only
     async def get_by_email(
         self,
         *,
@@ -1,28 +1,32 @@
+from collections.abc import AsyncIterator
 from datetime import datetime
 from uuid import UUID
 
-from geoip2.database import Reader
-from sqlalchemy import delete, desc, select, text, update
+from sqlalchemy import (
+    String,
+    Uuid,
+    asc,
+    column,
+    delete,
+    desc,
+    select,
+    text,
+    update,
+    values,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 from user_agents.parsers import UserAgent
 
 from app.lib.database.paging import paginate
-from app.lib.geo_ip import (
-    get_city_location,
-    get_geoip_city,
-)
+from app.lib.database.routing import read_only
+from app.lib.geo_ip import resolve_ip_location_unless_deferred
 from app.models.user_session import UserSession
 from app.types.paging import Page, PagingInfo
 
 
 class UserSessionRepo:
-    def __init__(
-        self,
-        session: AsyncSession,
-        geoip_reader: Reader,
-    ) -> None:
+    def __init__(self, session: AsyncSession) -> None:
         self._session = session
-        self._geoip_reader = geoip_reader
 
     async def create(
         self,
@@ -37,40 +41,55 @@ class UserSessionRepo:
             user_id=user_id,
             webauthn_credential_id=webauthn_credential_id,
             ip_address=ip_address,
-            location=get_city_location(
-                city=get_geoip_city(
-                    ip_address=ip_address,
-                    geoip_reader=self._geoip_reader,
-                ),
-            ),
+            location=resolve_ip_location_unless_deferred(ip_address),
             user_agent=str(user_agent),
         )
         self._session.add(user_session)
-        await self._session.commit()
+        await self._session.flush()
         return user_session
 
+    @read_only
     async def get_all(
         self,
         *,
         user_id: UUID,
-        paging_info: PagingInfo,
-    ) -> Page[UserSession, UUID]:
-        """Get user sessions for the given user ID."""
-        statement = (
-            select(UserSession)
-            .where(
-                UserSession.user_id == user_id,
-            )
-            .order_by(desc(UserSession.created_at))
+        paging_info: PagingInfo[str],
+    ) -> Page[UserSession, str]:
+        """Get user sessions for the given user ID, newest first."""
+        statement = select(UserSession).where(
+            UserSession.user_id == user_id,
         )
 
         return await paginate(
             session=self._session,
             statement=statement,
-            paginate_by=UserSession.id,
+            # the ID breaks ties between sessions created at the same time
+            paginate_by=[
+                desc(UserSession.created_at),
+                asc(UserSession.id),
+            ],
             paging_info=paging_info,
         )
 
+    async def stream_all(
+        self,
+        *,
+        user_id: UUID,
+        batch_size: int,
+    ) -> AsyncIterator[list[UserSession]]:
+        """Stream user sessions for the given user ID in batches, newest first."""
+        user_sessions = await self._session.stream_scalars(
+            select(UserSession)
+            .where(
+                UserSession.user_id == user_id,
+            )
+            .order_by(desc(UserSession.created_at), asc(UserSession.id))
+            .execution_options(yield_per=batch_size),
+        )
+
+        async for batch in user_sessions.partitions():
+            yield list(batch)
+
     async def delete(
         self,
         *,
@@ -80,10 +99,10 @@ class UserSessionRepo:
         """Delete an user session."""
         await self._session.execute(
             delete(UserSession).where(
-                UserSession.id == user_session_id and UserSession.user_id == user_id,
+                UserSession.id == user_session_id,
+                UserSession.user_id == user_id,
             ),
         )
-        await self._session.commit()
 
     async def update(
         self,
@@ -99,7 +118,6 @@ class UserSessionRepo:
                 logged_out_at=logged_out_at,
             )
         )
-        await self._session.commit()
 
     async def logout_all(
         self,
@@ -114,4 +132,32 @@ class UserSessionRepo:
                 logged_out_at=text("NOW()"),
             ),
         )
-        await self._session.commit()
+
+    async def claim_pending_locations(self, *, limit: int) -> dict[UUID, str]:
+        """
+        Claim a batch of user sessions with pending locations.
+
+        Returns the IP address for each claimed user session ID.
+        """
+        result = await self._session.execute(
+            select(UserSession.id, UserSession.ip_address)
+            .where(UserSession.location.is_(None))
+            .limit(limit)
+            .with_for_update(skip_locked=True),
+        )
+        return dict(result.tuples().all())
+
+    async def update_locations(self, *, locations: dict[UUID, str]) -> None:
+        """Set the locations for the given user session IDs, in one statement."""
+        if not locations:
+            return
+        user_session_locations = values(
+            column("id", Uuid),
+            column("location", String),
+            name="user_session_locations",
+        ).data(list(locations.items()))
+        await self._session.execute(
+            update(UserSession)
+            .where(UserSession.id == user_session_locations.c.id)
+            .values(location=user_session_locations.c.location),
+        )
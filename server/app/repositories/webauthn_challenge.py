@@ -26,9 +26,13 @@ class WebAuthnChallengeRepo:
             ex=WEBAUTHN_CHALLENGE_TTL,
         )
 
-    async def get(self, *, challenge: bytes) -> UUID | None:
-        """Get the WebAuthn challenge user ID by challenge."""
-        user_id = await self._redis_client.get(
+    async def consume(self, *, challenge: bytes) -> UUID | None:
+        """
+        Get the WebAuthn challenge user ID by challenge, deleting the challenge.
+
+        Each challenge can only be consumed once.
+        """
+        user_id = await self._redis_client.getdel(
             name=self.generate_challenge_key(
                 challenge=challenge,
             ),
@@ -36,11 +40,3 @@ class WebAuthnChallengeRepo:
         if user_id is not None:
             return UUID(bytes=user_id)
         return None
-
-    async def delete(self, *, challenge: bytes) -> None:
-        """Delete the given Webauthn challenge."""
-        await self._redis_client.delete(
-            self.generate_challenge_key(
-                challenge=challenge,
-            ),
-        )
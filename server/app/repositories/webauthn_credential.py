@@ -1,9 +1,12 @@
+from collections.abc import AsyncIterator
 from uuid import UUID
 
 from sqlalchemy import desc, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager
 from webauthn.helpers.structs import AuthenticatorTransport
 
+from app.lib.database.routing import read_only
 from app.models.webauthn_credential import WebAuthnCredential
 
 
@@ -33,7 +36,7 @@ class WebAuthnCredentialRepo:
             transports=transports,
         )
         self._session.add(webauthn_credential)
-        await self._session.commit()
+        await self._session.flush()
         return webauthn_credential
 
     async def update(
@@ -45,7 +48,7 @@ class WebAuthnCredentialRepo:
         """Update the given WebAuthn credential."""
         webauthn_credential.sign_count = sign_count
         self._session.add(webauthn_credential)
-        await self._session.commit()
+        await self._session.flush()
 
     async def get(
         self,
@@ -56,11 +59,29 @@ class WebAuthnCredentialRepo:
         """Get WebAuthn credential by ID and user ID."""
         return await self._session.scalar(
             select(WebAuthnCredential).where(
-                WebAuthnCredential.credential_id == credential_id
-                and WebAuthnCredential.user_id == user_id,
+                WebAuthnCredential.credential_id == credential_id,
+                WebAuthnCredential.user_id == user_id,
+            ),
+        )
+
+    async def get_with_user(
+        self,
+        *,
+        credential_id: bytes,
+        user_id: UUID,
+    ) -> WebAuthnCredential | None:
+        """Get WebAuthn credential by ID and user ID, along with its user."""
+        return await self._session.scalar(
+            select(WebAuthnCredential)
+            .join(WebAuthnCredential.user)
+            .options(contains_eager(WebAuthnCredential.user))
+            .where(
+                WebAuthnCredential.credential_id == credential_id,
+                WebAuthnCredential.user_id == user_id,
             ),
         )
 
+    @read_only
     async def get_all(
         self,
         *,
@@ -76,3 +97,22 @@ class WebAuthnCredentialRepo:
         )
 
         return list(credentials)
+
+    async def stream_all(
+        self,
+        *,
+        user_id: UUID,
+        batch_size: int,
+    ) -> AsyncIterator[list[WebAuthnCredential]]:
+        """Stream all WebAuthn credentials by user ID, in batches."""
+        credentials = await self._session.stream_scalars(
+            select(WebAuthnCredential)
+            .where(
+                WebAuthnCredential.user_id == user_id,
+            )
+            .order_by(desc(WebAuthnCredential.created_at))
+            .execution_options(yield_per=batch_size),
+        )
+
+        async for batch in credentials.partitions():
+            yield list(batch)
@@ -2,8 +2,8 @@ from http import HTTPStatus
 from typing import Annotated, Any
 from uuid import UUID
 
-import user_agents
 from fastapi import APIRouter, Cookie, Depends, Header, Path, Response
+from fastapi.responses import StreamingResponse
 from webauthn.helpers import (
     parse_authentication_credential_json,
     parse_registration_credential_json,
@@ -18,9 +18,13 @@ from app.dependencies.auth import (
 from app.dependencies.ip_address import get_ip_address
 from app.dependencies.paging import get_paging_info
 from app.lib.constants import (
+    ACCESS_TOKEN_COOKIE,
     AUTHENTICATION_TOKEN_COOKIE,
     REGISTER_FLOW_ID_COOKIE,
 )
+from app.lib.database.session_factory import get_session_factory
+from app.lib.user_agent import parse_user_agent
+from app.lib.user_data_export import export_user_data
 from app.models.register_flow import RegisterFlow
 from app.models.user import User
 from app.models.user_session import UserSession
@@ -116,7 +120,7 @@ async def start_register_flow(
     """Start a register flow."""
     register_flow = await auth_service.start_register_flow(
         email=data.email,
-        user_agent=user_agents.parse(user_agent),
+        user_agent=parse_user_agent(user_agent),
         request_ip=request_ip,
     )
 
@@ -205,7 +209,7 @@ async def resend_verification_register_flow(
     """Resend email verification in the register flow."""
     await auth_service.resend_verification_register_flow(
         flow_id=UUID(register_flow_id),
-        user_agent=user_agents.parse(user_agent),
+        user_agent=parse_user_agent(user_agent),
         request_ip=request_ip,
     )
 
@@ -377,7 +381,7 @@ async def verify_authentication_response(
     authentication_token, user = await auth_service.verify_authentication_response(
         credential=parse_authentication_credential_json(data.credential),
         request_ip=request_ip,
-        user_agent=user_agents.parse(user_agent),
+        user_agent=parse_user_agent(user_agent),
     )
 
     # set authentication token in a cookie
@@ -481,18 +485,23 @@ async def logout_current_user(
         remember_session=data.remember_session,
     )
 
-    # remove authentication token from cookie
+    # remove authentication and access tokens from cookies
     response.delete_cookie(
         key=AUTHENTICATION_TOKEN_COOKIE,
         secure=settings.is_production(),
         httponly=True,
     )
+    response.delete_cookie(
+        key=ACCESS_TOKEN_COOKIE,
+        secure=settings.is_production(),
+        httponly=True,
+    )
 
 
 @auth_router.get(
     "/sessions",
     summary="Get the current user's sessions.",
-    response_model=PaginatedResult[UserSessionSchema, UUID],
+    response_model=PaginatedResult[UserSessionSchema, str],
 )
 async def get_user_sessions(
     auth_service: Annotated[
@@ -508,12 +517,12 @@ async def get_user_sessions(
         ),
     ],
     paging_info: Annotated[
-        PagingInfo,
+        PagingInfo[str],
         Depends(
             dependency=get_paging_info,
         ),
     ],
-) -> Page[UserSession, UUID]:
+) -> Page[UserSession, str]:
     """Get the current user's user sessions."""
     return await auth_service.get_user_sessions(
         user_id=viewer_info.user_id,
@@ -521,6 +530,37 @@ async def get_user_sessions(
     )
 
 
+@auth_router.get(
+    "/export",
+    summary="Export the current user's sessions and webauthn credentials.",
+    response_class=StreamingResponse,
+    responses={
+        HTTPStatus.OK: {
+            "content": {
+                "application/x-ndjson": {},
+            },
+            "description": "One JSON object per line, with a `type` and `data`.",
+        },
+    },
+)
+async def export_current_user_data(
+    viewer_info: Annotated[
+        UserInfo,
+        Depends(
+            dependency=get_viewer_info,
+        ),
+    ],
+) -> StreamingResponse:
+    """Export the current user's user sessions and webauthn credentials."""
+    return StreamingResponse(
+        export_user_data(
+            session_factory=get_session_factory(),
+            user_id=viewer_info.user_id,
+        ),
+        media_type="application/x-ndjson",
+    )
+
+
 @auth_router.delete(
     "/sessions/{session_id}",
     summary="Delete a user session.",
@@ -0,0 +1,83 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+
+from app.dependencies.access_token import get_access_token_repo
+from app.dependencies.authentication_token import get_authentication_token_repo
+from app.dependencies.internal_api_key import verify_internal_api_key
+from app.lib.cache import CacheStats, get_cache_stats
+from app.repositories.access_token import AccessTokenRepo
+from app.repositories.authentication_token import AuthenticationTokenRepo
+from app.schemas.auth import (
+    IntrospectAuthenticationTokensInput,
+    IntrospectAuthenticationTokensResult,
+    UserInfoSchema,
+)
+from app.schemas.health import CacheStatsSchema
+
+internal_router = APIRouter(
+    prefix="/internal",
+    tags=["internal"],
+    dependencies=[
+        Depends(
+            dependency=verify_internal_api_key,
+        ),
+    ],
+)
+
+
+@internal_router.post(
+    "/authentication-tokens/introspect",
+    response_model=IntrospectAuthenticationTokensResult,
+    summary="Introspect a batch of authentication tokens.",
+    description="Resolves the user info for each authentication token, for internal services.",
+)
+async def introspect_authentication_tokens(
+    data: IntrospectAuthenticationTokensInput,
+    authentication_token_repo: Annotated[
+        AuthenticationTokenRepo,
+        Depends(
+            dependency=get_authentication_token_repo,
+        ),
+    ],
+    access_token_repo: Annotated[
+        AccessTokenRepo,
+        Depends(
+            dependency=get_access_token_repo,
+        ),
+    ],
+) -> IntrospectAuthenticationTokensResult:
+    """
+    Introspect a batch of authentication tokens.
+
+    Only the process-wide token repos are used, so no database
+    session is set up for it.
+    """
+    user_infos = await authentication_token_repo.get_user_info_many(
+        authentication_tokens=data.authentication_tokens,
+    )
+
+    return IntrospectAuthenticationTokensResult(
+        user_infos=[
+            (
+                UserInfoSchema.model_validate(user_info)
+                if user_info is not None
+                and not access_token_repo.is_revoked(
+                    user_session_id=user_info.user_session_id,
+                )
+                else None
+            )
+            for user_info in user_infos
+        ],
+    )
+
+
+@internal_router.get(
+    "/caches",
+    response_model=list[CacheStatsSchema],
+    summary="Get usage statistics for the in-process caches.",
+    description="Provides hit and miss counters for the caches in this server process.",
+)
+async def get_cache_stats_for_process() -> list[CacheStats]:
+    """Get usage statistics for the in-process caches."""
+    return get_cache_stats()
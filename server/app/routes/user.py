@@ -2,12 +2,12 @@ from http import HTTPStatus
 from typing import Annotated
 from uuid import UUID
 
-import user_agents
 from fastapi import APIRouter, Depends, Header, Path
 
 from app.dependencies.auth import get_viewer_info
 from app.dependencies.ip_address import get_ip_address
 from app.dependencies.user import get_user_service
+from app.lib.user_agent import parse_user_agent
 from app.models.user import User
 from app.schemas.errors import InvalidInputErrorResult, ResourceNotFoundErrorResult
 from app.schemas.user import (
@@ -123,7 +123,7 @@ async def request_current_user_email_change(
         user_id=viewer_info.user_id,
         email=data.email,
         current_password=data.current_password.get_secret_value(),
-        user_agent=user_agents.parse(user_agent),
+        user_agent=parse_user_agent(user_agent),
         request_ip=request_ip,
     )
 
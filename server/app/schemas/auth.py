@@ -7,6 +7,7 @@ from webauthn.helpers.structs import (
     PublicKeyCredentialRequestOptions,
 )
 
+from app.lib.constants import MAX_AUTHENTICATION_TOKEN_INTROSPECTION_BATCH_SIZE
 from app.lib.enums import RegisterFlowStep
 from app.schemas.base import BaseSchema
 from app.schemas.user import UserSchema
@@ -110,3 +111,41 @@ class LogoutInput(BaseSchema):
             description="Whether the current user's session should be remembered.",
         ),
     ] = True
+
+
+class UserInfoSchema(BaseSchema):
+    user_id: Annotated[
+        UUID,
+        Field(
+            description="The ID of the user the authentication token belongs to.",
+        ),
+    ]
+
+    user_session_id: Annotated[
+        UUID,
+        Field(
+            description="The ID of the user session the authentication token belongs to.",
+        ),
+    ]
+
+
+class IntrospectAuthenticationTokensInput(BaseSchema):
+    authentication_tokens: Annotated[
+        list[str],
+        Field(
+            description="The authentication tokens to introspect.",
+            max_length=MAX_AUTHENTICATION_TOKEN_INTROSPECTION_BATCH_SIZE,
+        ),
+    ]
+
+
+class IntrospectAuthenticationTokensResult(BaseSchema):
+    user_infos: Annotated[
+        list[UserInfoSchema | None],
+        Field(
+            description=(
+                "The user info for each authentication token, in the same order. "
+                "Invalid authentication tokens are `null`."
+            ),
+        ),
+    ]
@@ -13,3 +13,49 @@ class HealthCheckResult(BaseSchema):
             description="The status of the application.",
         ),
     ]
+
+
+class CacheStatsSchema(BaseSchema):
+    name: Annotated[
+        str,
+        Field(
+            examples=["authentication_tokens"],
+            description="The name of the cache.",
+        ),
+    ]
+
+    size: Annotated[
+        int,
+        Field(
+            description="The amount of entries in the cache.",
+        ),
+    ]
+
+    max_size: Annotated[
+        int,
+        Field(
+            description="The maximum amount of entries in the cache.",
+        ),
+    ]
+
+    hits: Annotated[
+        int,
+        Field(
+            description="The amount of cache hits.",
+        ),
+    ]
+
+    misses: Annotated[
+        int,
+        Field(
+            description="The amount of cache misses.",
+        ),
+    ]
+
+    hit_ratio: Annotated[
+        float,
+        Field(
+            examples=[0.95],
+            description="The share of lookups that were cache hits.",
+        ),
+    ]
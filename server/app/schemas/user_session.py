@@ -28,9 +28,9 @@ class UserSessionSchema(BaseSchema):
     ]
 
     location: Annotated[
-        str,
+        str | None,
         Field(
-            description="The location of the user session.",
+            description="The location of the user session, if it was resolved yet.",
             examples=[
                 "Los Angeles, California (US)",
             ],
@@ -1,13 +1,10 @@
 from datetime import UTC, datetime
 from uuid import UUID, uuid4
 
-import user_agents
-from geoip2.database import Reader
 from user_agents.parsers import UserAgent
 from webauthn import (
     generate_authentication_options,
     generate_registration_options,
-    verify_authentication_response,
     verify_registration_response,
 )
 from webauthn.helpers import parse_client_data_json
@@ -25,27 +22,34 @@ from webauthn.helpers.structs import (
 )
 
 from app.config import settings
+from app.lib.database.unit_of_work import UnitOfWork
 from app.lib.enums import RegisterFlowStep
 from app.lib.errors import (
     InvalidInputError,
     ResourceNotFoundError,
-    UnauthenticatedError,
 )
-from app.lib.geo_ip import get_city_location, get_geoip_city
+from app.lib.geo_ip import resolve_ip_location_unless_deferred
+from app.lib.task_buffer import TaskBuffer
+from app.lib.user_agent import parse_user_agent
+from app.lib.webauthn_verification import (
+    run_in_webauthn_executor,
+    verify_authentication_response,
+)
 from app.models.register_flow import RegisterFlow
 from app.models.user import User
 from app.models.user_session import UserSession
 from app.models.webauthn_credential import WebAuthnCredential
+from app.repositories.access_token import AccessTokenRepo
 from app.repositories.authentication_token import AuthenticationTokenRepo
 from app.repositories.email_verification_code import EmailVerificationCodeRepo
+from app.repositories.outbox_message import OutboxMessageRepo
+from app.repositories.outgoing_verification_code import OutgoingVerificationCodeRepo
 from app.repositories.register_flow import RegisterFlowRepo
 from app.repositories.user import UserRepo
 from app.repositories.user_session import UserSessionRepo
 from app.repositories.webauthn_challenge import WebAuthnChallengeRepo
 from app.repositories.webauthn_credential import WebAuthnCredentialRepo
-from app.types.auth import UserInfo
 from app.types.paging import Page, PagingInfo
-from app.worker import task_queue
 
 # REFER https://github.com/google/webauthndemo/blob/main/src/libs/webauthn.mts
 # TO IMPROVE AUTH AND REGISTER ROUTES
@@ -56,27 +60,36 @@ from app.worker import task_queue
 class AuthService:
     def __init__(
         self,
+        unit_of_work: UnitOfWork,
         user_session_repo: UserSessionRepo,
         webauthn_credential_repo: WebAuthnCredentialRepo,
         webauthn_challenge_repo: WebAuthnChallengeRepo,
         authentication_token_repo: AuthenticationTokenRepo,
+        access_token_repo: AccessTokenRepo,
         register_flow_repo: RegisterFlowRepo,
         user_repo: UserRepo,
         email_verification_code_repo: EmailVerificationCodeRepo,
-        geoip_reader: Reader,
+        outbox_message_repo: OutboxMessageRepo,
+        outgoing_verification_code_repo: OutgoingVerificationCodeRepo,
+        task_buffer: TaskBuffer,
     ) -> None:
+        self._unit_of_work = unit_of_work
         self._user_session_repo = user_session_repo
         self._webauthn_credential_repo = webauthn_credential_repo
         self._webauthn_challenge_repo = webauthn_challenge_repo
         self._authentication_token_repo = authentication_token_repo
+        self._access_token_repo = access_token_repo
         self._register_flow_repo = register_flow_repo
         self._user_repo = user_repo
         self._email_verification_code_repo = email_verification_code_repo
-        self._geoip_reader = geoip_reader
+        self._outbox_message_repo = outbox_message_repo
+        self._outgoing_verification_code_repo = outgoing_verification_code_repo
+        self._task_buffer = task_buffer
 
     async def get_register_flow(self, *, flow_id: UUID) -> RegisterFlow:
         """Get a register flow."""
-        register_flow = await self._register_flow_repo.get(flow_id=flow_id)
+        async with self._unit_of_work:
+            register_flow = await self._register_flow_repo.get(flow_id=flow_id)
 
         if register_flow is None:
             raise ResourceNotFoundError(
@@ -93,51 +106,59 @@ class AuthService:
         request_ip: str,
     ) -> RegisterFlow:
         """Start a register flow."""
-        if (
-            await self._user_repo.get_by_email(
+        async with self._unit_of_work:
+            existing_user = await self._user_repo.get_by_email(
                 email=email,
             )
-            is not None
-        ):
+
+        if existing_user is not None:
             raise InvalidInputError(
                 message="User with that email already exists.",
             )
 
-        # create register flow
-        verification_code, register_flow = await self._register_flow_repo.create(
-            email=email,
-            ip_address=request_ip,
-            user_agent=user_agent.ua_string,
-        )
+        verification_code_id = uuid4()
+        async with self._unit_of_work:
+            # create register flow
+            verification_code, register_flow = await self._register_flow_repo.create(
+                email=email,
+                ip_address=request_ip,
+                user_agent=user_agent.ua_string,
+            )
+
+            # send verification request email
+            outbox_message = self._outbox_message_repo.create(
+                task_name="send_email_verification_request_email",
+                task_kwargs={
+                    "receiver": email,
+                    "verification_code_id": str(verification_code_id),
+                    "device": user_agent.get_device(),
+                    "browser_name": user_agent.get_browser(),
+                    "location": resolve_ip_location_unless_deferred(request_ip),
+                    "ip_address": request_ip,
+                },
+            )
 
-        # send verification request email
-        await task_queue.enqueue(
-            "send_email_verification_request_email",
-            receiver=email,
+        # stored after the commit, so a rollback leaves no verification code behind
+        await self._outgoing_verification_code_repo.create(
+            verification_code_id=verification_code_id,
             verification_code=verification_code,
-            device=user_agent.get_device(),
-            browser_name=user_agent.get_browser(),
-            location=get_city_location(
-                city=get_geoip_city(
-                    ip_address=request_ip,
-                    geoip_reader=self._geoip_reader,
-                ),
-            ),
-            ip_address=request_ip,
         )
+        self._task_buffer.push(outbox_message)
 
         return register_flow
 
     async def cancel_register_flow(self, *, flow_id: UUID) -> None:
         """Cancel a register flow."""
-        register_flow = await self._register_flow_repo.get(flow_id=flow_id)
+        async with self._unit_of_work:
+            register_flow = await self._register_flow_repo.get(flow_id=flow_id)
 
         if register_flow is None:
             raise ResourceNotFoundError(
                 message="Couldn't find register flow.",
             )
 
-        await self._register_flow_repo.delete(flow_id=flow_id)
+        async with self._unit_of_work:
+            await self._register_flow_repo.delete(flow_id=flow_id)
 
     async def resend_verification_register_flow(
         self,
@@ -147,36 +168,45 @@ class AuthService:
         request_ip: str,
     ) -> RegisterFlow:
         """Resend email verification in the register flow."""
-        register_flow = await self._register_flow_repo.get(
-            flow_id=flow_id,
-            step=RegisterFlowStep.EMAIL_VERIFICATION,
-        )
+        async with self._unit_of_work:
+            register_flow = await self._register_flow_repo.get(
+                flow_id=flow_id,
+                step=RegisterFlowStep.EMAIL_VERIFICATION,
+            )
 
         if register_flow is None:
             raise ResourceNotFoundError(
                 message="Couldn't find register flow.",
             )
 
-        # recreate verification code for register flow
-        verification_code = await self._register_flow_repo.recreate_verification_code(
-            flow_id=register_flow.id,
-        )
+        verification_code_id = uuid4()
+        async with self._unit_of_work:
+            # recreate verification code for register flow
+            verification_code = (
+                await self._register_flow_repo.recreate_verification_code(
+                    flow_id=register_flow.id,
+                )
+            )
 
-        # send verification request email
-        await task_queue.enqueue(
-            "send_email_verification_request_email",
-            receiver=register_flow.email,
+            # send verification request email
+            outbox_message = self._outbox_message_repo.create(
+                task_name="send_email_verification_request_email",
+                task_kwargs={
+                    "receiver": register_flow.email,
+                    "verification_code_id": str(verification_code_id),
+                    "device": user_agent.get_device(),
+                    "browser_name": user_agent.get_browser(),
+                    "location": resolve_ip_location_unless_deferred(request_ip),
+                    "ip_address": request_ip,
+                },
+            )
+
+        # stored after the commit, so a rollback leaves no verification code behind
+        await self._outgoing_verification_code_repo.create(
+            verification_code_id=verification_code_id,
             verification_code=verification_code,
-            device=user_agent.get_device(),
-            browser_name=user_agent.get_browser(),
-            location=get_city_location(
-                city=get_geoip_city(
-                    ip_address=request_ip,
-                    geoip_reader=self._geoip_reader,
-                ),
-            ),
-            ip_address=request_ip,
         )
+        self._task_buffer.push(outbox_message)
 
         return register_flow
 
@@ -187,10 +217,11 @@ class AuthService:
         verification_code: str,
     ) -> RegisterFlow:
         """Verify a register flow."""
-        register_flow = await self._register_flow_repo.get(
-            flow_id=flow_id,
-            step=RegisterFlowStep.EMAIL_VERIFICATION,
-        )
+        async with self._unit_of_work:
+            register_flow = await self._register_flow_repo.get(
+                flow_id=flow_id,
+                step=RegisterFlowStep.EMAIL_VERIFICATION,
+            )
 
         if register_flow is None:
             raise ResourceNotFoundError(
@@ -214,11 +245,12 @@ class AuthService:
                 message="Invalid email verification code passed.",
             )
 
-        # update current step
-        await self._register_flow_repo.update(
-            register_flow=register_flow,
-            current_step=RegisterFlowStep.WEBAUTHN_REGISTRATION,
-        )
+        async with self._unit_of_work:
+            # update current step
+            await self._register_flow_repo.update(
+                register_flow=register_flow,
+                current_step=RegisterFlowStep.WEBAUTHN_REGISTRATION,
+            )
 
         return register_flow
 
@@ -228,10 +260,11 @@ class AuthService:
         flow_id: UUID,
     ) -> tuple[RegisterFlow, PublicKeyCredentialCreationOptions]:
         """Start the webauthn registration in the register flow."""
-        register_flow = await self._register_flow_repo.get(
-            flow_id=flow_id,
-            step=RegisterFlowStep.WEBAUTHN_REGISTRATION,
-        )
+        async with self._unit_of_work:
+            register_flow = await self._register_flow_repo.get(
+                flow_id=flow_id,
+                step=RegisterFlowStep.WEBAUTHN_REGISTRATION,
+            )
 
         if register_flow is None:
             raise ResourceNotFoundError(
@@ -269,10 +302,11 @@ class AuthService:
         credential: RegistrationCredential,
     ) -> tuple[str, User]:
         """Finish the webauthn registration in the register flow."""
-        register_flow = await self._register_flow_repo.get(
-            flow_id=flow_id,
-            step=RegisterFlowStep.WEBAUTHN_REGISTRATION,
-        )
+        async with self._unit_of_work:
+            register_flow = await self._register_flow_repo.get(
+                flow_id=flow_id,
+                step=RegisterFlowStep.WEBAUTHN_REGISTRATION,
+            )
 
         if register_flow is None:
             raise ResourceNotFoundError(
@@ -284,7 +318,8 @@ class AuthService:
         )
 
         # FIXME: we should be storing the user ID in the session itself, along with the challenge
-        user_id = await self._webauthn_challenge_repo.get(
+        # consume the challenge, so that it can't be replayed
+        user_id = await self._webauthn_challenge_repo.consume(
             challenge=client_data.challenge,
         )
 
@@ -293,7 +328,8 @@ class AuthService:
                 message="Challenge response doesn't match.",
             )
 
-        verified_registration = verify_registration_response(
+        verified_registration = await run_in_webauthn_executor(
+            verify_registration_response,
             credential=credential,
             expected_challenge=client_data.challenge,
             expected_rp_id=settings.rp_id,
@@ -306,67 +342,68 @@ class AuthService:
                 message="Couldn't verify user.",
             )
 
-        # delete challenge server-side
-        await self._webauthn_challenge_repo.delete(
-            challenge=client_data.challenge,
-        )
+        async with self._unit_of_work:
+            user = await self._user_repo.create(
+                user_id=user_id,
+                email=register_flow.email,
+            )
 
-        user = await self._user_repo.create(
-            user_id=user_id,
-            email=register_flow.email,
-        )
+            webauthn_credential = await self._webauthn_credential_repo.create(
+                user_id=user.id,
+                credential_id=verified_registration.credential_id,
+                public_key=verified_registration.credential_public_key,
+                sign_count=verified_registration.sign_count,
+                backed_up=verified_registration.credential_backed_up,
+                device_type=verified_registration.credential_device_type,
+                transports=credential.response.transports,
+            )
 
-        webauthn_credential = await self._webauthn_credential_repo.create(
-            user_id=user.id,
-            credential_id=verified_registration.credential_id,
-            public_key=verified_registration.credential_public_key,
-            sign_count=verified_registration.sign_count,
-            backed_up=verified_registration.credential_backed_up,
-            device_type=verified_registration.credential_device_type,
-            transports=credential.response.transports,
-        )
+            user_session = await self._user_session_repo.create(
+                user_id=user.id,
+                webauthn_credential_id=webauthn_credential.id,
+                ip_address=register_flow.ip_address,
+                user_agent=parse_user_agent(register_flow.user_agent),
+            )
 
-        user_session = await self._user_session_repo.create(
-            user_id=user.id,
-            webauthn_credential_id=webauthn_credential.id,
-            ip_address=register_flow.ip_address,
-            user_agent=user_agents.parse(register_flow.user_agent),
-        )
+            # delete register flow
+            await self._register_flow_repo.delete(
+                flow_id=register_flow.id,
+            )
 
-        # delete register flow
-        await self._register_flow_repo.delete(
-            flow_id=register_flow.id,
-        )
+            outbox_message = self._outbox_message_repo.create(
+                task_name="send_onboarding_email",
+                task_kwargs={
+                    "receiver": user.email,
+                    "email": user.email,
+                },
+            )
+
+        self._task_buffer.push(outbox_message)
 
         authentication_token = await self._authentication_token_repo.create(
             user_id=user.id,
             user_session_id=user_session.id,
         )
 
-        await task_queue.enqueue(
-            "send_onboarding_email",
-            receiver=user.email,
-            email=user.email,
-        )
-
         return authentication_token, user
 
     async def generate_authentication_options(
         self, *, email: str
     ) -> PublicKeyCredentialRequestOptions:
         """Generate options for retrieving a credential."""
-        existing_user = await self._user_repo.get_by_email(
-            email=email,
-        )
-
-        if existing_user is None:
-            raise InvalidInputError(
-                message="User with that email doesn't exist.",
+        async with self._unit_of_work:
+            existing_user = await self._user_repo.get_by_email(
+                email=email,
             )
 
-        existing_credentials = await self._webauthn_credential_repo.get_all(
-            user_id=existing_user.id,
-        )
+            if existing_user is None:
+                raise InvalidInputError(
+                    message="User with that email doesn't exist.",
+                )
+
+            existing_credentials = await self._webauthn_credential_repo.get_all(
+                user_id=existing_user.id,
+            )
 
         authentication_options = generate_authentication_options(
             rp_id=settings.rp_id,
@@ -405,7 +442,8 @@ class AuthService:
         )
 
         # FIXME: verify challenge from stored challenge in session
-        dummy_user_id = await self._webauthn_challenge_repo.get(
+        # consume the challenge, so that it can't be replayed
+        dummy_user_id = await self._webauthn_challenge_repo.consume(
             challenge=client_data.challenge,
         )
 
@@ -419,24 +457,23 @@ class AuthService:
                 message="Couldn't find user ID.",
             )
 
-        existing_user = await self._user_repo.get(user_id=UUID(bytes=user_id))
-
-        if existing_user is None:
-            raise ResourceNotFoundError(
-                message="User doesn't exist.",
+        # fetch the credential along with its user in a single query, ending the
+        # transaction before verification so no connection is held meanwhile
+        async with self._unit_of_work:
+            existing_credential = await self._webauthn_credential_repo.get_with_user(
+                credential_id=credential.raw_id,
+                user_id=UUID(bytes=user_id),
             )
 
-        existing_credential = await self._webauthn_credential_repo.get(
-            credential_id=credential.raw_id,
-            user_id=existing_user.id,
-        )
-
         if existing_credential is None:
             raise InvalidInputError(
                 message="Webauthn credential doesn't exist.",
             )
 
-        verified_authentication = verify_authentication_response(
+        existing_user = existing_credential.user
+
+        verified_authentication = await run_in_webauthn_executor(
+            verify_authentication_response,
             credential=credential,
             expected_challenge=client_data.challenge,
             expected_rp_id=settings.rp_id,
@@ -446,23 +483,19 @@ class AuthService:
             require_user_verification=True,
         )
 
-        # delete challenge server-side
-        await self._webauthn_challenge_repo.delete(
-            challenge=client_data.challenge,
-        )
-
-        # update credential sign count
-        await self._webauthn_credential_repo.update(
-            webauthn_credential=existing_credential,
-            sign_count=verified_authentication.new_sign_count,
-        )
+        async with self._unit_of_work:
+            # update credential sign count
+            await self._webauthn_credential_repo.update(
+                webauthn_credential=existing_credential,
+                sign_count=verified_authentication.new_sign_count,
+            )
 
-        user_session = await self._user_session_repo.create(
-            user_id=existing_user.id,
-            webauthn_credential_id=existing_credential.id,
-            ip_address=request_ip,
-            user_agent=user_agent,
-        )
+            user_session = await self._user_session_repo.create(
+                user_id=existing_user.id,
+                webauthn_credential_id=existing_credential.id,
+                ip_address=request_ip,
+                user_agent=user_agent,
+            )
 
         authentication_token = await self._authentication_token_repo.create(
             user_id=existing_user.id,
@@ -475,13 +508,14 @@ class AuthService:
         self,
         *,
         user_id: UUID,
-        paging_info: PagingInfo,
-    ) -> Page[UserSession, UUID]:
+        paging_info: PagingInfo[str],
+    ) -> Page[UserSession, str]:
         """Get user sessions for the given user ID."""
-        return await self._user_session_repo.get_all(
-            user_id=user_id,
-            paging_info=paging_info,
-        )
+        async with self._unit_of_work:
+            return await self._user_session_repo.get_all(
+                user_id=user_id,
+                paging_info=paging_info,
+            )
 
     async def delete_user_session(
         self,
@@ -490,10 +524,21 @@ class AuthService:
         user_session_id: UUID,
     ) -> None:
         """Delete the user session with the given ID."""
-        return await self._user_session_repo.delete(
+        async with self._unit_of_work:
+            await self._user_session_repo.delete(
+                user_id=user_id,
+                user_session_id=user_session_id,
+            )
+        # revocations expire with the access tokens, so the authentication
+        # tokens must go too, or they could mint new access tokens
+        await self._authentication_token_repo.delete_all_for_user_session(
             user_id=user_id,
             user_session_id=user_session_id,
         )
+        if settings.access_tokens_enabled:
+            await self._access_token_repo.revoke(
+                user_session_ids=[user_session_id],
+            )
 
     async def logout_user(
         self,
@@ -504,44 +549,36 @@ class AuthService:
         remember_session: bool,
     ) -> None:
         """Logout the user."""
+        async with self._unit_of_work:
+            if remember_session:
+                await self._user_session_repo.update(
+                    user_session_id=user_session_id,
+                    logged_out_at=datetime.now(UTC),
+                )
+            else:
+                await self._user_session_repo.delete(
+                    user_session_id=user_session_id,
+                    user_id=user_id,
+                )
         await self._authentication_token_repo.delete(
             authentication_token=authentication_token,
             user_id=user_id,
         )
-        if remember_session:
-            await self._user_session_repo.update(
-                user_session_id=user_session_id,
-                logged_out_at=datetime.now(UTC),
-            )
-        else:
-            await self._user_session_repo.delete(
-                user_session_id=user_session_id,
-                user_id=user_id,
+        if settings.access_tokens_enabled:
+            await self._access_token_repo.revoke(
+                user_session_ids=[user_session_id],
             )
 
-    async def get_user_info_for_authentication_token(
-        self, *, authentication_token: str
-    ) -> UserInfo:
-        """Verify the given authentication token and return the corresponding user info."""
-        user_info = await self._authentication_token_repo.get_user_info(
-            authentication_token=authentication_token,
-        )
-
-        if not user_info:
-            raise UnauthenticatedError(
-                message="Invalid authentication token provided.",
-            )
-        return user_info
-
     async def get_webauthn_credentials(
         self,
         *,
         user_id: UUID,
     ) -> list[WebAuthnCredential]:
         """Get WebAuthn credentials for the given user ID."""
-        return await self._webauthn_credential_repo.get_all(
-            user_id=user_id,
-        )
+        async with self._unit_of_work:
+            return await self._webauthn_credential_repo.get_all(
+                user_id=user_id,
+            )
 
     async def create_webauthn_credential(
         self,
@@ -549,11 +586,12 @@ class AuthService:
         user_id: User,
     ) -> PublicKeyCredentialCreationOptions:
         """Create a new WebAuthn credential for the given user ID."""
-        existing_credentials = await self._webauthn_credential_repo.get_all(
-            user_id=user_id
-        )
+        async with self._unit_of_work:
+            existing_credentials = await self._webauthn_credential_repo.get_all(
+                user_id=user_id
+            )
 
-        user = await self._user_repo.get(user_id=user_id)
+            user = await self._user_repo.get(user_id=user_id)
 
         registration_options = generate_registration_options(
             rp_id=settings.rp_id,
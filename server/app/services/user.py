@@ -1,37 +1,46 @@
 from datetime import UTC, datetime
-from uuid import UUID
+from uuid import UUID, uuid4
 
-from geoip2.database import Reader
 from user_agents.parsers import UserAgent
 
+from app.lib.database.unit_of_work import UnitOfWork
 from app.lib.errors import InvalidInputError, ResourceNotFoundError
-from app.lib.geo_ip import get_city_location, get_geoip_city
+from app.lib.geo_ip import resolve_ip_location_unless_deferred
+from app.lib.task_buffer import TaskBuffer
 from app.models.user import User
 from app.repositories.authentication_token import AuthenticationTokenRepo
 from app.repositories.email_verification_code import EmailVerificationCodeRepo
+from app.repositories.outbox_message import OutboxMessageRepo
+from app.repositories.outgoing_verification_code import OutgoingVerificationCodeRepo
 from app.repositories.user import UserRepo
 from app.repositories.user_session import UserSessionRepo
-from app.worker import task_queue
 
 
 class UserService:
     def __init__(
         self,
+        unit_of_work: UnitOfWork,
         user_repo: UserRepo,
         email_verification_code_repo: EmailVerificationCodeRepo,
         authentication_token_repo: AuthenticationTokenRepo,
         user_session_repo: UserSessionRepo,
-        geoip_reader: Reader,
+        outbox_message_repo: OutboxMessageRepo,
+        outgoing_verification_code_repo: OutgoingVerificationCodeRepo,
+        task_buffer: TaskBuffer,
     ) -> None:
+        self._unit_of_work = unit_of_work
         self._user_repo = user_repo
         self._email_verification_code_repo = email_verification_code_repo
         self._authentication_token_repo = authentication_token_repo
         self._user_session_repo = user_session_repo
-        self._geoip_reader = geoip_reader
+        self._outbox_message_repo = outbox_message_repo
+        self._outgoing_verification_code_repo = outgoing_verification_code_repo
+        self._task_buffer = task_buffer
 
     async def get_user_by_id(self, *, user_id: UUID) -> User:
         """Get a user by ID."""
-        user = await self._user_repo.get(user_id=user_id)
+        async with self._unit_of_work:
+            user = await self._user_repo.get(user_id=user_id)
         if user is None:
             raise ResourceNotFoundError(
                 message="Couldn't find user with the given ID.",
@@ -45,11 +54,12 @@ class UserService:
         display_name: str | None = None,
     ) -> User:
         """Update the user with the given ID."""
-        user = await self.get_user_by_id(user_id=user_id)
-        return await self._user_repo.update(
-            user=user,
-            display_name=display_name,
-        )
+        async with self._unit_of_work:
+            user = await self.get_user_by_id(user_id=user_id)
+            return await self._user_repo.update(
+                user=user,
+                display_name=display_name,
+            )
 
     async def send_change_email_request(
         self,
@@ -61,38 +71,49 @@ class UserService:
         request_ip: str,
     ) -> None:
         """Update the user with the given ID."""
-        user = await self.get_user_by_id(user_id=user_id)
+        async with self._unit_of_work:
+            user = await self.get_user_by_id(user_id=user_id)
 
-        # TODO: reauthenticate here using webauthn
+            # TODO: reauthenticate here using webauthn
 
-        if (
-            email
-            and await self._user_repo.get_by_email(
-                email=email,
+            existing_user = (
+                await self._user_repo.get_by_email(
+                    email=email,
+                )
+                if email
+                else None
             )
-            is not None
-        ):
+
+        if existing_user is not None:
             raise InvalidInputError(
                 message="User with that email already exists.",
             )
 
-        verification_code = await self._email_verification_code_repo.create(email=email)
+        verification_code_id = uuid4()
+        async with self._unit_of_work:
+            verification_code, _ = await self._email_verification_code_repo.create(
+                email=email,
+            )
 
-        # send verification request email
-        await task_queue.enqueue(
-            "send_email_verification_request_email",
-            receiver=email,
+            # send verification request email
+            outbox_message = self._outbox_message_repo.create(
+                task_name="send_email_verification_request_email",
+                task_kwargs={
+                    "receiver": email,
+                    "verification_code_id": str(verification_code_id),
+                    "device": user_agent.get_device(),
+                    "browser_name": user_agent.get_browser(),
+                    "location": resolve_ip_location_unless_deferred(request_ip),
+                    "ip_address": request_ip,
+                },
+            )
+
+        # stored after the commit, so a rollback leaves no verification code behind
+        await self._outgoing_verification_code_repo.create(
+            verification_code_id=verification_code_id,
             verification_code=verification_code,
-            device=user_agent.get_device(),
-            browser_name=user_agent.get_browser(),
-            location=get_city_location(
-                city=get_geoip_city(
-                    ip_address=request_ip,
-                    geoip_reader=self._geoip_reader,
-                ),
-            ),
-            ip_address=request_ip,
         )
+        self._task_buffer.push(outbox_message)
 
     async def update_user_email(
         self,
@@ -102,12 +123,13 @@ class UserService:
         verification_code: str,
     ) -> User:
         """Update the email for the given user."""
-        user = await self.get_user_by_id(user_id=user_id)
+        async with self._unit_of_work:
+            user = await self.get_user_by_id(user_id=user_id)
 
-        email_verification_code = await self._email_verification_code_repo.get(
-            verification_code=verification_code,
-            email=email,
-        )
+            email_verification_code = await self._email_verification_code_repo.get(
+                verification_code=verification_code,
+                email=email,
+            )
 
         if (
             email_verification_code is None
@@ -117,9 +139,10 @@ class UserService:
                 message="Invalid email or email verification code provided."
             )
 
-        await self._email_verification_code_repo.delete_all(email=email)
+        async with self._unit_of_work:
+            await self._email_verification_code_repo.delete_all(email=email)
 
-        return await self._user_repo.update(
-            user=user,
-            email=email,
-        )
+            return await self._user_repo.update(
+                user=user,
+                email=email,
+            )
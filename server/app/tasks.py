@@ -1,23 +1,61 @@
 from datetime import timedelta
+from uuid import UUID
 
 from humanize import naturaldelta
-from saq.types import Context
 
 from app.config import settings
 from app.lib.constants import (
     EMAIL_VERIFICATION_CODE_EXPIRES_IN,
+    USER_SESSION_LOCATION_BATCH_SIZE,
+    USER_SESSION_LOCATION_MAX_BATCHES,
 )
+from app.lib.database.reaper import EXPIRING_TABLES, reap_expired_table
+from app.lib.database.unit_of_work import UnitOfWork
 from app.lib.emails import send_template_email
-from app.repositories.email_verification_code import EmailVerificationCodeRepo
+from app.lib.geo_ip import resolve_ip_location
+from app.repositories.authentication_token import AuthenticationTokenRepo
+from app.repositories.outgoing_verification_code import OutgoingVerificationCodeRepo
+from app.repositories.user_session import UserSessionRepo
+from app.types.worker import WorkerContext
 
 
-async def delete_expired_email_verification_codes(ctx: Context) -> None:
-    """Delete expired email verification codes."""
-    await EmailVerificationCodeRepo(session=ctx["session"]).delete_expired()
+async def reap_expired_rows(ctx: WorkerContext, /) -> None:
+    """Delete expired rows from all expiring tables, in batches."""
+    for table in EXPIRING_TABLES:
+        await reap_expired_table(
+            session_factory=ctx["session_factory"],
+            table=table,
+        )
+
+
+async def enrich_user_session_locations(ctx: WorkerContext, /) -> None:
+    """Resolve pending user session locations, in batches."""
+    for _ in range(USER_SESSION_LOCATION_MAX_BATCHES):
+        async with ctx["session_factory"]() as session, UnitOfWork(session=session):
+            user_session_repo = UserSessionRepo(session=session)
+            ip_addresses = await user_session_repo.claim_pending_locations(
+                limit=USER_SESSION_LOCATION_BATCH_SIZE,
+            )
+            await user_session_repo.update_locations(
+                locations={
+                    user_session_id: resolve_ip_location(ip_address)
+                    for user_session_id, ip_address in ip_addresses.items()
+                },
+            )
+        if len(ip_addresses) < USER_SESSION_LOCATION_BATCH_SIZE:
+            break
+
+
+async def prune_authentication_token_owners(ctx: WorkerContext, /) -> None:
+    """Remove expired authentication tokens from the token owner sets."""
+    await AuthenticationTokenRepo(
+        redis_client=ctx["redis_client"],
+    ).prune_token_owners()
 
 
 async def send_onboarding_email(
-    _ctx: Context,
+    _ctx: WorkerContext,
+    /,
     *,
     receiver: str,
     email: str,
@@ -34,16 +72,32 @@ async def send_onboarding_email(
 
 
 async def send_email_verification_request_email(
-    _ctx: Context,
+    ctx: WorkerContext,
+    /,
     *,
     receiver: str,
-    verification_code: str,
+    verification_code_id: str,
     device: str,
     browser_name: str,
     ip_address: str,
-    location: str,
+    location: str | None = None,
 ) -> None:
-    """Send an email verification request to the given email."""
+    """
+    Send an email verification request to the given email.
+
+    Resolves the location here when GeoIP enrichment is deferred.
+    """
+    outgoing_verification_code_repo = OutgoingVerificationCodeRepo(
+        redis_client=ctx["redis_client"],
+    )
+    verification_code = await outgoing_verification_code_repo.get(
+        verification_code_id=UUID(verification_code_id),
+    )
+    if verification_code is None:
+        # the verification code expired before it could be sent
+        return
+    if location is None:
+        location = resolve_ip_location(ip_address)
     await send_template_email(
         sender=settings.email_from,
         receiver=receiver,
@@ -61,3 +115,6 @@ async def send_email_verification_request_email(
             "location": location,
         },
     )
+    await outgoing_verification_code_repo.delete(
+        verification_code_id=UUID(verification_code_id),
+    )
@@ -0,0 +1,14 @@
+import asyncio
+
+from redis.asyncio import Redis
+from saq.types import Context
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+
+class WorkerContext(Context, total=False):
+    """The task context, along with the resources loaded on worker startup."""
+
+    session_factory: async_sessionmaker[AsyncSession]
+    redis_client: Redis
+    outbox_relay: asyncio.Task[None]
+    geoip_database_watcher: asyncio.Task[None]
@@ -1,37 +1,61 @@
 import asyncio
+import contextlib
 from logging.config import dictConfig
 
 from asgi_correlation_id import correlation_id
 from saq import CronJob, Job, Queue
-from saq.types import Context
 from saq.worker import Worker
 
 from app.config import settings
-from app.dependencies.database_session import get_database_session
+from app.lib.database.engine import dispose_database_engine
+from app.lib.database.session_factory import get_session_factory
+from app.lib.geo_ip import close_geoip_database, watch_geoip_database
+from app.lib.outbox_relay import run_outbox_relay
+from app.lib.redis_client import get_redis_client
 from app.logger import build_worker_log_config, setup_logging
 from app.tasks import (
-    delete_expired_email_verification_codes,
+    enrich_user_session_locations,
+    prune_authentication_token_owners,
+    reap_expired_rows,
     send_email_verification_request_email,
     send_onboarding_email,
 )
+from app.types.worker import WorkerContext
 
 
-async def startup(ctx: Context) -> None:
+async def startup(ctx: WorkerContext) -> None:
     """
     Start up handler.
 
-    Loads the database session into the context.
+    Loads the database session factory and the redis client into the context,
+    starts relaying outbox messages to the task queue, and starts watching
+    the GeoIP database for updates.
     """
-    ctx["session"] = await get_database_session()
+    ctx["session_factory"] = get_session_factory()
+    ctx["redis_client"] = get_redis_client()
+    ctx["outbox_relay"] = asyncio.create_task(
+        run_outbox_relay(
+            session_factory=ctx["session_factory"],
+            queue=task_queue,
+        ),
+    )
+    ctx["geoip_database_watcher"] = asyncio.create_task(watch_geoip_database())
 
 
-async def shutdown(ctx: Context) -> None:
+async def shutdown(ctx: WorkerContext) -> None:
     """
     Shutdown handler.
 
-    Shuts down the existing database session.
+    Stops relaying outbox messages and watching the GeoIP database,
+    and closes the redis client, the database engine and the GeoIP database.
     """
-    await ctx["session"].close()
+    for background_task in (ctx["outbox_relay"], ctx["geoip_database_watcher"]):
+        background_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await background_task
+    await ctx["redis_client"].aclose()
+    await dispose_database_engine()
+    close_geoip_database()
 
 
 async def before_enqueue(job: Job) -> None:
@@ -52,7 +76,7 @@ task_queue.register_before_enqueue(
 )
 
 
-async def before_process(ctx: Context) -> None:
+async def before_process(ctx: WorkerContext) -> None:
     """
     Before process handler.
 
@@ -62,7 +86,7 @@ async def before_process(ctx: Context) -> None:
     correlation_id.set(request_id)
 
 
-async def after_process(_ctx: Context) -> None:
+async def after_process(_ctx: WorkerContext) -> None:
     """
     After process handler.
 
@@ -92,8 +116,16 @@ if __name__ == "__main__":
         ],
         cron_jobs=[
             CronJob(
-                delete_expired_email_verification_codes,
-                cron="0 * * * *",
+                reap_expired_rows,
+                cron="*/5 * * * *",
+            ),
+            CronJob(
+                enrich_user_session_locations,
+                cron="* * * * *",
+            ),
+            CronJob(
+                prune_authentication_token_owners,
+                cron="*/10 * * * *",
             ),
         ],
         concurrency=settings.saq_concurrency,
@@ -0,0 +1,44 @@
+"""
+add expires at indexes
+
+Revision ID: 2b9e4f71c8d3
+Revises: 8f3a2d6c4b17
+Create Date: 2026-10-17 16:41:09.274105
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2b9e4f71c8d3"
+down_revision: str | None = "8f3a2d6c4b17"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        op.f("email_verification_codes_expires_at_idx"),
+        "email_verification_codes",
+        ["expires_at"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("register_flows_expires_at_idx"),
+        "register_flows",
+        ["expires_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f("register_flows_expires_at_idx"),
+        table_name="register_flows",
+    )
+    op.drop_index(
+        op.f("email_verification_codes_expires_at_idx"),
+        table_name="email_verification_codes",
+    )
@@ -0,0 +1,45 @@
+"""
+add lookup indexes
+
+Revision ID: 8f3a2d6c4b17
+Revises: 5c0e7b1d9a42
+Create Date: 2026-10-17 14:03:22.518937
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8f3a2d6c4b17"
+down_revision: str | None = "5c0e7b1d9a42"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # the composite index also serves lookups by credential ID alone
+    op.create_index(
+        "webauthn_credentials_credential_id_user_id_idx",
+        "webauthn_credentials",
+        ["credential_id", "user_id"],
+        unique=False,
+    )
+    op.drop_index(
+        op.f("webauthn_credentials_credential_id_idx"),
+        table_name="webauthn_credentials",
+    )
+
+
+def downgrade() -> None:
+    op.create_index(
+        op.f("webauthn_credentials_credential_id_idx"),
+        "webauthn_credentials",
+        ["credential_id"],
+        unique=False,
+    )
+    op.drop_index(
+        "webauthn_credentials_credential_id_user_id_idx",
+        table_name="webauthn_credentials",
+    )
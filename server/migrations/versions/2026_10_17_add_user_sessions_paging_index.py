@@ -0,0 +1,46 @@
+"""
+add user sessions paging index
+
+Revision ID: 9a4c2e7b1f35
+Revises: 6d1c8e3f5a90
+Create Date: 2026-10-17 19:12:40.618327
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9a4c2e7b1f35"
+down_revision: str | None = "6d1c8e3f5a90"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # the composite index also serves lookups by user ID alone
+    op.create_index(
+        "user_sessions_user_id_created_at_id_idx",
+        "user_sessions",
+        ["user_id", sa.text("created_at DESC"), "id"],
+        unique=False,
+    )
+    op.drop_index(
+        op.f("user_sessions_user_id_idx"),
+        table_name="user_sessions",
+    )
+
+
+def downgrade() -> None:
+    op.create_index(
+        op.f("user_sessions_user_id_idx"),
+        "user_sessions",
+        ["user_id"],
+        unique=False,
+    )
+    op.drop_index(
+        "user_sessions_user_id_created_at_id_idx",
+        table_name="user_sessions",
+    )
@@ -0,0 +1,55 @@
+"""
+create outbox messages
+
+Revision ID: 5c0e7b1d9a42
+Revises: 351685e4464a
+Create Date: 2026-10-17 10:12:41.301524
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "5c0e7b1d9a42"
+down_revision: str | None = "351685e4464a"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "outbox_messages",
+        sa.Column(
+            "id", sa.Uuid(), server_default=sa.text("gen_random_uuid()"), nullable=False
+        ),
+        sa.Column("task_name", sa.String(length=255), nullable=False),
+        sa.Column(
+            "task_kwargs", postgresql.JSONB(astext_type=sa.Text()), nullable=False
+        ),
+        sa.Column("request_id", sa.String(length=255), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("outbox_messages_pkey")),
+    )
+    op.create_index(
+        op.f("outbox_messages_created_at_idx"),
+        "outbox_messages",
+        ["created_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f("outbox_messages_created_at_idx"),
+        table_name="outbox_messages",
+    )
+    op.drop_table("outbox_messages")
@@ -0,0 +1,50 @@
+"""
+defer user session locations
+
+Revision ID: 6d1c8e3f5a90
+Revises: 2b9e4f71c8d3
+Create Date: 2026-10-17 18:27:55.906112
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "6d1c8e3f5a90"
+down_revision: str | None = "2b9e4f71c8d3"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.alter_column(
+        "user_sessions",
+        "location",
+        existing_type=sa.String(length=256),
+        nullable=True,
+    )
+    op.create_index(
+        "user_sessions_pending_location_idx",
+        "user_sessions",
+        ["id"],
+        unique=False,
+        postgresql_where=sa.text("location IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "user_sessions_pending_location_idx",
+        table_name="user_sessions",
+        postgresql_where=sa.text("location IS NULL"),
+    )
+    op.execute("UPDATE user_sessions SET location = 'Unknown' WHERE location IS NULL")
+    op.alter_column(
+        "user_sessions",
+        "location",
+        existing_type=sa.String(length=256),
+        nullable=False,
+    )
@@ -0,0 +1,52 @@
+from collections.abc import Iterable
+from pathlib import Path
+
+import pytest
+from redis.asyncio.connection import AbstractConnection
+
+BENCHMARKS_PATH = Path(__file__).parent
+
+# benchmarks seed and measure far more than the default timeout allows
+BENCHMARK_TIMEOUT = 600
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_modifyitems(items: list[pytest.Item]) -> None:
+    """Mark the benchmarks, so that they are deselected by default."""
+    for item in items:
+        if item.path.is_relative_to(BENCHMARKS_PATH):
+            item.add_marker(pytest.mark.benchmark)
+            item.add_marker(pytest.mark.timeout(BENCHMARK_TIMEOUT))
+
+
+class RoundTripCounter:
+    """Count the round trips made to a server."""
+
+    def __init__(self) -> None:
+        self.count = 0
+
+    def reset(self) -> None:
+        """Reset the round trip count."""
+        self.count = 0
+
+
+@pytest.fixture
+def redis_round_trips(monkeypatch: pytest.MonkeyPatch) -> RoundTripCounter:
+    """Count the round trips made to Redis."""
+    counter = RoundTripCounter()
+    send_packed_command = AbstractConnection.send_packed_command
+
+    async def counting_send_packed_command(
+        self: AbstractConnection,
+        command: bytes | str | Iterable[bytes],
+        check_health: bool = True,  # noqa: FBT001, FBT002
+    ) -> None:
+        counter.count += 1
+        await send_packed_command(self, command, check_health=check_health)
+
+    monkeypatch.setattr(
+        AbstractConnection,
+        "send_packed_command",
+        counting_send_packed_command,
+    )
+    return counter
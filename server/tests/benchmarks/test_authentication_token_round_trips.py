@@ -0,0 +1,155 @@
+import time
+from collections.abc import Awaitable, Callable
+from uuid import UUID, uuid4
+
+import pytest
+from app.repositories.authentication_token import AuthenticationTokenRepo
+from redis.asyncio import Redis
+
+from tests.benchmarks.conftest import RoundTripCounter
+
+pytestmark = [pytest.mark.anyio]
+
+ITERATIONS = 100
+
+
+class SequentialAuthenticationTokenRepo(AuthenticationTokenRepo):
+    """The authentication token repo, issuing one command per round trip."""
+
+    async def create(self, *, user_id: UUID, user_session_id: UUID) -> str:
+        """Create a new authentication token."""
+        authentication_token = self.generate_token()
+        authentication_token_hash = self.hash_token(
+            authentication_token=authentication_token,
+        )
+        await self._redis_client.hset(
+            name=self.generate_token_key(
+                authentication_token_hash=authentication_token_hash,
+            ),
+            mapping={
+                "user_id": user_id.bytes,
+                "user_session_id": user_session_id.bytes,
+            },
+        )  # type: ignore[misc]
+        await self._redis_client.sadd(
+            self.generate_token_owner_key(user_id=user_id),
+            authentication_token_hash,
+        )  # type: ignore[misc]
+        return authentication_token
+
+    async def delete(self, *, authentication_token: str, user_id: UUID) -> None:
+        """Delete the given authentication token."""
+        authentication_token_hash = self.hash_token(
+            authentication_token=authentication_token,
+        )
+        await self._redis_client.delete(
+            self.generate_token_key(
+                authentication_token_hash=authentication_token_hash,
+            ),
+        )
+        await self._redis_client.srem(
+            self.generate_token_owner_key(user_id=user_id),
+            authentication_token_hash,
+        )  # type: ignore[misc]
+
+    async def delete_all(self, *, user_id: UUID) -> None:
+        """Delete all authentication tokens for the given user ID."""
+        authentication_token_hashes = await self._redis_client.smembers(
+            name=self.generate_token_owner_key(user_id=user_id),
+        )  # type: ignore[misc]
+        if authentication_token_hashes:
+            await self._redis_client.delete(
+                *[
+                    self.generate_token_key(
+                        authentication_token_hash=authentication_token_hash.decode(),
+                    )
+                    for authentication_token_hash in authentication_token_hashes
+                ]
+            )
+        await self._redis_client.delete(
+            self.generate_token_owner_key(user_id=user_id),
+        )
+
+
+async def measure(
+    operation: Callable[[UUID], Awaitable[object]],
+    redis_round_trips: RoundTripCounter,
+    setup: Callable[[UUID], Awaitable[object]] | None = None,
+) -> tuple[float, float]:
+    """Measure the round trips and duration (in ms) per call of the given operation."""
+    round_trips = 0
+    elapsed = 0.0
+    for _ in range(ITERATIONS):
+        user_id = uuid4()
+        if setup is not None:
+            await setup(user_id)
+        redis_round_trips.reset()
+        started_at = time.perf_counter()
+        await operation(user_id)
+        elapsed += time.perf_counter() - started_at
+        round_trips += redis_round_trips.count
+    return round_trips / ITERATIONS, elapsed * 1000 / ITERATIONS
+
+
+@pytest.mark.parametrize(
+    ("repo_class", "max_round_trips"),
+    [
+        (SequentialAuthenticationTokenRepo, None),
+        (AuthenticationTokenRepo, 1),
+    ],
+)
+async def test_authentication_token_round_trips(
+    redis_client: Redis,
+    redis_round_trips: RoundTripCounter,
+    repo_class: type[AuthenticationTokenRepo],
+    max_round_trips: int | None,
+) -> None:
+    """Compare the round trips per authentication token operation."""
+    repo = repo_class(redis_client=redis_client)
+
+    authentication_tokens: dict[UUID, str] = {}
+
+    async def create_token(user_id: UUID) -> None:
+        authentication_tokens[user_id] = await repo.create(
+            user_id=user_id,
+            user_session_id=uuid4(),
+        )
+
+    async def create_tokens(user_id: UUID) -> None:
+        for _ in range(3):
+            await repo.create(user_id=user_id, user_session_id=uuid4())
+
+    # load the scripts used by the repo beforehand
+    await repo.delete_all(user_id=uuid4())
+
+    create_round_trips, create_duration = await measure(
+        lambda user_id: repo.create(user_id=user_id, user_session_id=uuid4()),
+        redis_round_trips,
+    )
+
+    delete_round_trips, delete_duration = await measure(
+        lambda user_id: repo.delete(
+            authentication_token=authentication_tokens[user_id],
+            user_id=user_id,
+        ),
+        redis_round_trips,
+        setup=create_token,
+    )
+
+    delete_all_round_trips, delete_all_duration = await measure(
+        lambda user_id: repo.delete_all(user_id=user_id),
+        redis_round_trips,
+        setup=create_tokens,
+    )
+
+    print(  # noqa: T201
+        f"\n{repo_class.__name__}:"
+        f"\n  create: {create_round_trips} round trips, {create_duration:.3f}ms"
+        f"\n  delete: {delete_round_trips} round trips, {delete_duration:.3f}ms"
+        f"\n  delete_all: {delete_all_round_trips} round trips, {delete_all_duration:.3f}ms",
+    )
+
+    if max_round_trips is not None:
+        assert create_round_trips <= max_round_trips
+        assert delete_round_trips <= max_round_trips
+        assert delete_all_round_trips <= max_round_trips
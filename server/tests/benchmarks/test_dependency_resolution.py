@@ -0,0 +1,80 @@
+import time
+from contextlib import AsyncExitStack
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+import pytest
+from app import create_app
+from app.repositories.authentication_token import AuthenticationTokenRepo
+from app.types.auth import UserInfo
+from fastapi.dependencies.utils import solve_dependencies
+from fastapi.routing import APIRoute
+from starlette.requests import Request
+from starlette.responses import Response
+
+pytestmark = [pytest.mark.anyio]
+
+RESOLUTIONS = 1000
+
+ROUTES = [
+    ("GET", "/auth/sessions"),
+    ("GET", "/auth/webauthn-credentials"),
+    ("POST", "/auth/logout"),
+    ("GET", "/users/@me"),
+    ("POST", "/auth/authenticate/start"),
+]
+
+
+def build_request(method: str, path: str) -> Request:
+    """Build an authenticated request for the given route."""
+    return Request(
+        {
+            "type": "http",
+            "method": method,
+            "path": path,
+            "query_string": b"",
+            "headers": [
+                (b"cookie", b"authentication_token=token"),
+                (b"user-agent", b"Mozilla/5.0"),
+            ],
+            "client": ("127.0.0.1", 12345),
+        },
+    )
+
+
+@pytest.mark.parametrize(("method", "path"), ROUTES)
+async def test_dependency_resolution_overhead(
+    method: str,
+    path: str,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Measure the time taken to resolve a route's dependencies."""
+    app = create_app()
+    route = next(
+        route
+        for route in app.routes
+        if isinstance(route, APIRoute)
+        and route.path == path
+        and method in route.methods
+    )
+    # resolve the viewer without a round trip to redis
+    monkeypatch.setattr(
+        AuthenticationTokenRepo,
+        "get_user_info",
+        AsyncMock(return_value=UserInfo(user_id=uuid4(), user_session_id=uuid4())),
+    )
+    start = time.perf_counter()
+    for _ in range(RESOLUTIONS):
+        async with AsyncExitStack() as async_exit_stack:
+            await solve_dependencies(
+                request=build_request(method, path),
+                dependant=route.dependant,
+                body={},
+                response=Response(),
+                async_exit_stack=async_exit_stack,
+            )
+    elapsed = time.perf_counter() - start
+
+    print(  # noqa: T201
+        f"\n{method} {path}: {elapsed / RESOLUTIONS * 1_000_000:.1f}us per request",
+    )
@@ -0,0 +1,177 @@
+import os
+from collections.abc import Iterator
+from uuid import uuid4
+
+import pytest
+import user_agents
+from app.config import settings
+from app.lib.authentication_token_cache import get_authentication_token_cache
+from app.lib.database.unit_of_work import UnitOfWork
+from app.lib.task_buffer import get_task_buffer
+from app.lib.user_session_revocations import get_revoked_user_sessions
+from app.repositories.access_token import AccessTokenRepo
+from app.repositories.authentication_token import AuthenticationTokenRepo
+from app.repositories.email_verification_code import EmailVerificationCodeRepo
+from app.repositories.outbox_message import OutboxMessageRepo
+from app.repositories.outgoing_verification_code import OutgoingVerificationCodeRepo
+from app.repositories.register_flow import DatabaseRegisterFlowRepo
+from app.repositories.user import UserRepo
+from app.repositories.user_session import UserSessionRepo
+from app.repositories.webauthn_challenge import WebAuthnChallengeRepo
+from app.repositories.webauthn_credential import WebAuthnCredentialRepo
+from app.services.auth import AuthService
+from redis.asyncio import Redis
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from tests.benchmarks.conftest import RoundTripCounter
+from tests.utils.authenticator import Authenticator
+
+pytestmark = [pytest.mark.anyio]
+
+# one joined SELECT, then the UPDATE and INSERT in a single transaction
+MAX_DATABASE_STATEMENTS = 3
+
+MAX_DATABASE_COMMITS = 1
+
+# consume the challenge, then create the authentication token
+MAX_REDIS_ROUND_TRIPS = 2
+
+
+@pytest.fixture
+def database_statements(
+    test_database_engine: AsyncEngine,
+) -> Iterator[RoundTripCounter]:
+    """Count the statements sent to the database."""
+    counter = RoundTripCounter()
+
+    def count_statement(*_args: object) -> None:
+        counter.count += 1
+
+    event.listen(
+        test_database_engine.sync_engine,
+        "before_cursor_execute",
+        count_statement,
+    )
+    yield counter
+    event.remove(
+        test_database_engine.sync_engine,
+        "before_cursor_execute",
+        count_statement,
+    )
+
+
+@pytest.fixture
+def database_commits(
+    test_database_session: AsyncSession,
+) -> Iterator[RoundTripCounter]:
+    """Count the commits made by the database session."""
+    counter = RoundTripCounter()
+
+    def count_commit(*_args: object) -> None:
+        counter.count += 1
+
+    event.listen(test_database_session.sync_session, "after_commit", count_commit)
+    yield counter
+    event.remove(test_database_session.sync_session, "after_commit", count_commit)
+
+
+@pytest.fixture
+def auth_service(
+    test_database_session: AsyncSession,
+    redis_client: Redis,
+) -> AuthService:
+    """Get the auth service."""
+    return AuthService(
+        unit_of_work=UnitOfWork(
+            session=test_database_session,
+        ),
+        user_session_repo=UserSessionRepo(
+            session=test_database_session,
+        ),
+        webauthn_credential_repo=WebAuthnCredentialRepo(
+            session=test_database_session,
+        ),
+        webauthn_challenge_repo=WebAuthnChallengeRepo(
+            redis_client=redis_client,
+        ),
+        authentication_token_repo=AuthenticationTokenRepo(
+            redis_client=redis_client,
+            cache=get_authentication_token_cache(),
+        ),
+        access_token_repo=AccessTokenRepo(
+            redis_client=redis_client,
+            revoked_user_sessions=get_revoked_user_sessions(),
+        ),
+        register_flow_repo=DatabaseRegisterFlowRepo(
+            session=test_database_session,
+        ),
+        user_repo=UserRepo(
+            session=test_database_session,
+        ),
+        email_verification_code_repo=EmailVerificationCodeRepo(
+            session=test_database_session,
+        ),
+        outbox_message_repo=OutboxMessageRepo(
+            session=test_database_session,
+        ),
+        outgoing_verification_code_repo=OutgoingVerificationCodeRepo(
+            redis_client=redis_client,
+        ),
+        task_buffer=get_task_buffer(),
+    )
+
+
+async def test_login_round_trips(
+    auth_service: AuthService,
+    test_database_session: AsyncSession,
+    redis_client: Redis,
+    database_statements: RoundTripCounter,
+    database_commits: RoundTripCounter,
+    redis_round_trips: RoundTripCounter,
+) -> None:
+    """Measure the database and Redis round trips made per login."""
+    authenticator = Authenticator(
+        rp_id=settings.rp_id,
+        origin=settings.rp_expected_origin,
+    )
+    user = await UserRepo(session=test_database_session).create(
+        user_id=uuid4(),
+        email="login-round-trips@example.org",
+    )
+    await WebAuthnCredentialRepo(session=test_database_session).create(
+        credential_id=authenticator.credential_id,
+        user_id=user.id,
+        public_key=authenticator.public_key,
+        sign_count=0,
+        device_type="single_device",
+        backed_up=False,
+        transports=None,
+    )
+    challenge = os.urandom(32)
+    await WebAuthnChallengeRepo(redis_client=redis_client).create(
+        user_id=user.id,
+        challenge=challenge,
+    )
+    credential = authenticator.get_assertion(
+        challenge=challenge,
+        user_handle=user.id.bytes,
+    )
+    database_statements.reset()
+    database_commits.reset()
+    redis_round_trips.reset()
+
+    await auth_service.verify_authentication_response(
+        credential=credential,
+        request_ip="127.0.0.1",
+        user_agent=user_agents.parse("Mozilla/5.0"),
+    )
+
+    print(  # noqa: T201
+        f"\nlogin: {database_statements.count} database statements, "
+        f"{database_commits.count} commits, "
+        f"{redis_round_trips.count} redis round trips",
+    )
+    assert database_statements.count <= MAX_DATABASE_STATEMENTS
+    assert database_commits.count <= MAX_DATABASE_COMMITS
+    assert redis_round_trips.count <= MAX_REDIS_ROUND_TRIPS
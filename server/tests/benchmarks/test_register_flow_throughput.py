@@ -0,0 +1,78 @@
+import time
+
+import pytest
+from app.config import RegisterFlowBackend
+from app.lib.database.unit_of_work import UnitOfWork
+from app.lib.enums import RegisterFlowStep
+from app.repositories.register_flow import (
+    DatabaseRegisterFlowRepo,
+    RedisRegisterFlowRepo,
+    RegisterFlowRepo,
+)
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+pytestmark = [pytest.mark.anyio]
+
+REGISTER_FLOWS = 1000
+
+
+@pytest.fixture
+def register_flow_repo(
+    request: pytest.FixtureRequest,
+    test_database_session: AsyncSession,
+    redis_client: Redis,
+) -> RegisterFlowRepo:
+    """Get the register flow repo for the given backend."""
+    if request.param == RegisterFlowBackend.redis:
+        return RedisRegisterFlowRepo(redis_client=redis_client)
+    return DatabaseRegisterFlowRepo(session=test_database_session)
+
+
+@pytest.mark.parametrize(
+    "register_flow_repo",
+    [RegisterFlowBackend.database, RegisterFlowBackend.redis],
+    indirect=True,
+)
+async def test_register_flow_throughput(
+    register_flow_repo: RegisterFlowRepo,
+    test_database_session: AsyncSession,
+) -> None:
+    """Measure the register flows completed per second (start, verify and finish)."""
+    unit_of_work = UnitOfWork(session=test_database_session)
+    start = time.perf_counter()
+    for index in range(REGISTER_FLOWS):
+        # start
+        async with unit_of_work:
+            _, created_register_flow = await register_flow_repo.create(
+                email=f"register-flow-{index}@example.org",
+                ip_address="127.0.0.1",
+                user_agent="Mozilla/5.0",
+            )
+
+        # verify
+        register_flow = await register_flow_repo.get(
+            flow_id=created_register_flow.id,
+            step=RegisterFlowStep.EMAIL_VERIFICATION,
+        )
+        assert register_flow is not None
+        async with unit_of_work:
+            await register_flow_repo.update(
+                register_flow=register_flow,
+                current_step=RegisterFlowStep.WEBAUTHN_REGISTRATION,
+            )
+
+        # finish
+        register_flow = await register_flow_repo.get(
+            flow_id=register_flow.id,
+            step=RegisterFlowStep.WEBAUTHN_REGISTRATION,
+        )
+        assert register_flow is not None
+        async with unit_of_work:
+            await register_flow_repo.delete(flow_id=register_flow.id)
+    elapsed = time.perf_counter() - start
+
+    print(  # noqa: T201
+        f"\n{type(register_flow_repo).__name__}: "
+        f"{REGISTER_FLOWS / elapsed:.0f} register flows/s",
+    )
@@ -0,0 +1,47 @@
+import time
+
+import pytest
+from app.lib.user_agent import get_user_agent_cache, parse_user_agent
+
+PARSES = 1000
+
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/128.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_6_1) AppleWebKit/605.1.15 "
+    "(KHTML, like Gecko) Version/17.6 Safari/605.1.15",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_6 like Mac OS X) AppleWebKit/605.1.15 "
+    "(KHTML, like Gecko) Version/17.6 Mobile/15E148 Safari/604.1",
+    "Mozilla/5.0 (Linux; Android 14; Pixel 8) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/128.0.0.0 Mobile Safari/537.36",
+    "Mozilla/5.0 (X11; Linux x86_64; rv:130.0) Gecko/20100101 Firefox/130.0",
+]
+
+
+def measure_parse_time() -> float:
+    """Measure the mean time taken to parse a user agent."""
+    start = time.perf_counter()
+    for index in range(PARSES):
+        parse_user_agent(USER_AGENTS[index % len(USER_AGENTS)])
+    return (time.perf_counter() - start) / PARSES
+
+
+def test_user_agent_parse_time(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Measure the user agent parse time with a cold and a warm cache."""
+    cache = get_user_agent_cache()
+    cache.clear()
+    with monkeypatch.context() as patch:
+        # skip caching, so that every parse misses
+        patch.setattr(cache, "set", lambda *_: None)
+        cold_parse_time = measure_parse_time()
+    hits = cache.hits
+    warm_parse_time = measure_parse_time()
+    warm_hits = cache.hits - hits
+    cache.clear()
+
+    # only the first parse of each user agent misses
+    assert warm_hits == PARSES - len(USER_AGENTS)
+    print(  # noqa: T201
+        f"\ncold: {cold_parse_time * 1_000_000:.1f}us per parse, "
+        f"warm: {warm_parse_time * 1_000_000:.1f}us per parse",
+    )
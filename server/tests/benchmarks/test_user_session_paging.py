@@ -0,0 +1,85 @@
+import time
+from uuid import UUID
+
+import pytest
+from app.lib.constants import MAX_PAGINATION_LIMIT
+from app.repositories.user_session import UserSessionRepo
+from app.types.paging import PagingInfo
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+pytestmark = [pytest.mark.anyio]
+
+USER_SESSIONS = 100_000
+
+
+@pytest.fixture
+async def user_id(test_database_session: AsyncSession) -> UUID:
+    """Get the ID of a user with many user sessions."""
+    user_id = await test_database_session.scalar(
+        text(
+            "INSERT INTO users (email) VALUES ('paging@example.org') RETURNING id",
+        ),
+    )
+    webauthn_credential_id = await test_database_session.scalar(
+        text(
+            "INSERT INTO webauthn_credentials "
+            "(credential_id, user_id, public_key, sign_count, device_type, backed_up) "
+            "VALUES ('\\x00', :user_id, '\\x00', 0, 'single_device', false) "
+            "RETURNING id",
+        ),
+        {"user_id": user_id},
+    )
+    # a few sessions share each creation time, so the ID breaks ties
+    await test_database_session.execute(
+        text(
+            "INSERT INTO user_sessions "
+            "(user_id, webauthn_credential_id, ip_address, location, "
+            "user_agent, created_at) "
+            "SELECT :user_id, :webauthn_credential_id, '127.0.0.1', 'Unknown', "
+            "'Mozilla/5.0', NOW() - (index / 4) * INTERVAL '1 second' "
+            "FROM generate_series(1, :user_sessions) AS index",
+        ),
+        {
+            "user_id": user_id,
+            "webauthn_credential_id": webauthn_credential_id,
+            "user_sessions": USER_SESSIONS,
+        },
+    )
+    await test_database_session.execute(text("ANALYZE user_sessions"))
+    return user_id
+
+
+async def test_user_session_paging(
+    test_database_session: AsyncSession,
+    user_id: UUID,
+) -> None:
+    """
+    Measure the latency of paging through a user's sessions.
+
+    Keyset pagination seeks straight to each page, so the last page
+    should take about as long as the first one.
+    """
+    user_session_repo = UserSessionRepo(session=test_database_session)
+    seen_user_session_ids: set[UUID] = set()
+    page_latencies = []
+    after = None
+    while True:
+        start = time.perf_counter()
+        page = await user_session_repo.get_all(
+            user_id=user_id,
+            paging_info=PagingInfo(after=after, limit=MAX_PAGINATION_LIMIT),
+        )
+        page_latencies.append(time.perf_counter() - start)
+        seen_user_session_ids.update(user_session.id for user_session in page.entities)
+        after = page.page_info.next_cursor
+        if after is None:
+            break
+
+    # every session is returned exactly once
+    assert len(seen_user_session_ids) == USER_SESSIONS
+    print(  # noqa: T201
+        f"\n{len(page_latencies)} pages of {MAX_PAGINATION_LIMIT}: "
+        f"first page {page_latencies[0] * 1000:.2f}ms, "
+        f"last page {page_latencies[-1] * 1000:.2f}ms",
+    )
@@ -0,0 +1,125 @@
+import asyncio
+import os
+import statistics
+import time
+from collections.abc import Awaitable, Callable, Iterator
+
+import pytest
+from app import create_app
+from app.config import ExecutorKind, settings
+from app.lib.webauthn_verification import (
+    get_webauthn_executor,
+    run_in_webauthn_executor,
+    shutdown_webauthn_executor,
+    verify_authentication_response,
+)
+from httpx import AsyncClient
+
+from tests.utils.authenticator import Authenticator
+
+pytestmark = [pytest.mark.anyio]
+
+CONCURRENT_LOGINS = 500
+
+PROBE_INTERVAL = 0.002  # 2 milliseconds
+
+
+@pytest.fixture
+def webauthn_executor_kind(
+    request: pytest.FixtureRequest,
+    monkeypatch: pytest.MonkeyPatch,
+) -> Iterator[ExecutorKind | None]:
+    """Configure the WebAuthn verification executor (`None` verifies inline)."""
+    if request.param is not None:
+        monkeypatch.setattr(settings, "webauthn_executor_kind", request.param)
+    shutdown_webauthn_executor()
+    yield request.param
+    shutdown_webauthn_executor()
+
+
+async def verify_inline(**kwargs: object) -> None:
+    """Verify the authentication response on the event loop."""
+    verify_authentication_response(**kwargs)  # type: ignore[arg-type]
+
+
+async def verify_in_executor(**kwargs: object) -> None:
+    """Verify the authentication response in the WebAuthn executor."""
+    await run_in_webauthn_executor(
+        verify_authentication_response,
+        **kwargs,  # type: ignore[arg-type]
+    )
+
+
+async def measure_health_latencies(
+    verify: Callable[..., Awaitable[None]],
+) -> list[float]:
+    """Measure the latency of the health endpoint during a login burst."""
+    authenticator = Authenticator(
+        rp_id=settings.rp_id,
+        origin=settings.rp_expected_origin,
+    )
+    challenge = os.urandom(32)
+    credential = authenticator.get_assertion(challenge=challenge)
+    latencies = []
+    async with AsyncClient(app=create_app(), base_url="http://test") as test_client:
+
+        async def probe_health() -> None:
+            # measure from the scheduled start of each request, so that
+            # requests delayed by a blocked event loop are accounted for
+            scheduled_at = time.perf_counter()
+            while True:
+                scheduled_at += PROBE_INTERVAL
+                await asyncio.sleep(max(0, scheduled_at - time.perf_counter()))
+                await test_client.get("/health/")
+                latencies.append(time.perf_counter() - scheduled_at)
+
+        probe = asyncio.create_task(probe_health())
+        await asyncio.sleep(0.01)
+        await asyncio.gather(
+            *(
+                verify(
+                    credential=credential,
+                    expected_challenge=challenge,
+                    expected_rp_id=settings.rp_id,
+                    expected_origin=settings.rp_expected_origin,
+                    credential_public_key=authenticator.public_key,
+                    credential_current_sign_count=0,
+                    require_user_verification=True,
+                )
+                for _ in range(CONCURRENT_LOGINS)
+            ),
+        )
+        probe.cancel()
+    return latencies
+
+
+@pytest.mark.parametrize(
+    ("webauthn_executor_kind", "verify"),
+    [
+        (None, verify_inline),
+        (ExecutorKind.thread, verify_in_executor),
+        (ExecutorKind.process, verify_in_executor),
+    ],
+    indirect=["webauthn_executor_kind"],
+)
+async def test_health_latency_during_logins(
+    webauthn_executor_kind: ExecutorKind | None,
+    verify: Callable[..., Awaitable[None]],
+) -> None:
+    """Measure the p99 latency of an unrelated endpoint while logins run."""
+    if webauthn_executor_kind is not None:
+        # start the executor's workers before measuring
+        list(
+            get_webauthn_executor().map(
+                int,
+                range(settings.webauthn_executor_max_workers),
+            ),
+        )
+    latencies = await measure_health_latencies(verify)
+
+    assert latencies
+    p99 = statistics.quantiles(latencies, n=100)[98]
+    print(  # noqa: T201
+        f"\n{webauthn_executor_kind or 'inline'}: "
+        f"{len(latencies)} health checks, p99 {p99 * 1000:.2f}ms",
+    )
@@ -0,0 +1,107 @@
+from http import HTTPStatus
+from uuid import uuid4
+
+import pytest
+from app.config import settings
+from app.dependencies.database_session import get_database_session
+from app.repositories.authentication_token import AuthenticationTokenRepo
+from app.routes.internal import internal_router, introspect_authentication_tokens
+from fastapi.routing import APIRoute
+from httpx import AsyncClient
+from pydantic import SecretStr
+from redis.asyncio import Redis
+
+pytestmark = [pytest.mark.anyio]
+
+INTERNAL_API_KEY = "internal-api-key"
+
+
+@pytest.fixture
+def _internal_api_key(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Configure the internal API key."""
+    monkeypatch.setattr(settings, "internal_api_key", SecretStr(INTERNAL_API_KEY))
+
+
+@pytest.mark.usefixtures("_internal_api_key")
+async def test_introspect_authentication_tokens(
+    test_client: AsyncClient,
+    redis_client: Redis,
+) -> None:
+    """Ensure we can introspect a batch of authentication tokens."""
+    user_id, user_session_id = uuid4(), uuid4()
+    authentication_token = await AuthenticationTokenRepo(
+        redis_client=redis_client,
+    ).create(
+        user_id=user_id,
+        user_session_id=user_session_id,
+    )
+
+    response = await test_client.post(
+        "/internal/authentication-tokens/introspect",
+        headers={"X-Internal-API-Key": INTERNAL_API_KEY},
+        json={"authenticationTokens": [authentication_token, "invalid"]},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        "userInfos": [
+            {"userId": str(user_id), "userSessionId": str(user_session_id)},
+            None,
+        ],
+    }
+
+
+def test_introspect_authentication_tokens_skips_database_session() -> None:
+    """Ensure introspecting authentication tokens doesn't set up a database session."""
+    route = next(
+        route
+        for route in internal_router.routes
+        if isinstance(route, APIRoute)
+        and route.endpoint is introspect_authentication_tokens
+    )
+
+    dependants = [route.dependant]
+    calls = []
+    while dependants:
+        dependant = dependants.pop()
+        calls.append(dependant.call)
+        dependants.extend(dependant.dependencies)
+
+    assert get_database_session not in calls
+
+
+@pytest.mark.usefixtures("_internal_api_key")
+async def test_introspect_authentication_tokens_invalid_api_key(
+    test_client: AsyncClient,
+) -> None:
+    """Ensure internal routes can't be accessed with an invalid API key."""
+    response = await test_client.post(
+        "/internal/authentication-tokens/introspect",
+        headers={"X-Internal-API-Key": "invalid"},
+        json={"authenticationTokens": []},
+    )
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+@pytest.mark.usefixtures("_internal_api_key")
+async def test_cache_stats(test_client: AsyncClient) -> None:
+    """Ensure we can successfully retrieve cache usage statistics."""
+    response = await test_client.get(
+        "/internal/caches",
+        headers={"X-Internal-API-Key": INTERNAL_API_KEY},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert all("hits" in cache for cache in response.json())
+
+
+@pytest.mark.usefixtures("_internal_api_key")
+async def test_cache_stats_invalid_api_key(test_client: AsyncClient) -> None:
+    """Ensure cache usage statistics can't be accessed with an invalid API key."""
+    response = await test_client.get(
+        "/internal/caches",
+        headers={"X-Internal-API-Key": "invalid"},
+    )
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
@@ -0,0 +1,119 @@
+from uuid import uuid4
+
+import pytest
+from app.lib.user_session_revocations import RevokedUserSessions
+from app.repositories.access_token import AccessTokenRepo
+from redis.asyncio import Redis
+
+pytestmark = [pytest.mark.anyio]
+
+
+@pytest.fixture
+def revoked_user_sessions() -> RevokedUserSessions:
+    """Get the revoked user sessions."""
+    revoked_user_sessions = RevokedUserSessions()
+    revoked_user_sessions.is_synced = True
+    return revoked_user_sessions
+
+
+@pytest.fixture
+def access_token_repo(
+    redis_client: Redis,
+    revoked_user_sessions: RevokedUserSessions,
+) -> AccessTokenRepo:
+    """Get the access token repo."""
+    return AccessTokenRepo(
+        redis_client=redis_client,
+        revoked_user_sessions=revoked_user_sessions,
+    )
+
+
+def test_get_user_info(access_token_repo: AccessTokenRepo) -> None:
+    """Ensure the user info can be read from a valid access token."""
+    user_id, user_session_id = uuid4(), uuid4()
+    access_token = access_token_repo.create(
+        user_id=user_id,
+        user_session_id=user_session_id,
+    )
+
+    user_info = access_token_repo.get_user_info(access_token=access_token)
+
+    assert user_info is not None
+    assert user_info.user_id == user_id
+    assert user_info.user_session_id == user_session_id
+
+
+@pytest.mark.parametrize(
+    "access_token",
+    [
+        "",
+        "invalid",
+        "invalid.access-token",
+        "a.b.c",
+    ],
+)
+def test_get_user_info_invalid_access_token(
+    access_token_repo: AccessTokenRepo,
+    access_token: str,
+) -> None:
+    """Ensure malformed access tokens are rejected."""
+    assert access_token_repo.get_user_info(access_token=access_token) is None
+
+
+def test_get_user_info_tampered_access_token(
+    access_token_repo: AccessTokenRepo,
+) -> None:
+    """Ensure access tokens with a tampered payload are rejected."""
+    access_token = access_token_repo.create(
+        user_id=uuid4(),
+        user_session_id=uuid4(),
+    )
+    _, signature = access_token.split(".")
+    other_payload, _ = access_token_repo.create(
+        user_id=uuid4(),
+        user_session_id=uuid4(),
+    ).split(".")
+
+    assert (
+        access_token_repo.get_user_info(
+            access_token=f"{other_payload}.{signature}",
+        )
+        is None
+    )
+
+
+def test_get_user_info_unsynced(
+    access_token_repo: AccessTokenRepo,
+    revoked_user_sessions: RevokedUserSessions,
+) -> None:
+    """Ensure access tokens are rejected while revocations might be missing."""
+    access_token = access_token_repo.create(
+        user_id=uuid4(),
+        user_session_id=uuid4(),
+    )
+    revoked_user_sessions.is_synced = False
+
+    assert access_token_repo.get_user_info(access_token=access_token) is None
+
+
+async def test_revoke(
+    access_token_repo: AccessTokenRepo,
+    redis_client: Redis,
+) -> None:
+    """Ensure access tokens for revoked user sessions are rejected."""
+    user_session_id = uuid4()
+    access_token = access_token_repo.create(
+        user_id=uuid4(),
+        user_session_id=user_session_id,
+    )
+
+    await access_token_repo.revoke(user_session_ids=[user_session_id])
+
+    assert access_token_repo.get_user_info(access_token=access_token) is None
+    assert (
+        await redis_client.zscore(
+            "revoked-user-sessions",
+            user_session_id.bytes,
+        )
+        is not None
+    )
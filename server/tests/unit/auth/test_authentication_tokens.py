@@ -0,0 +1,317 @@
+import time
+from uuid import uuid4
+
+import pytest
+from app.config import settings
+from app.lib.cache import LRUCache
+from app.repositories.authentication_token import AuthenticationTokenRepo
+from app.types.auth import UserInfo
+from redis.asyncio import Redis
+
+pytestmark = [pytest.mark.anyio]
+
+# the remaining lifetime given to a token before it is looked up
+SHORT_TTL = 60
+
+# how long ago the token was refreshed, to force another refresh
+STALE_REFRESH_AGE = 86400
+
+# an idle expiry shorter than the maximum refresh interval
+SHORT_IDLE_EXPIRY = 600
+
+
+@pytest.fixture
+def authentication_token_repo(redis_client: Redis) -> AuthenticationTokenRepo:
+    """Get the authentication token repo."""
+    return AuthenticationTokenRepo(redis_client=redis_client)
+
+
+async def test_create_authentication_token_expires(
+    authentication_token_repo: AuthenticationTokenRepo,
+    redis_client: Redis,
+) -> None:
+    """Ensure authentication tokens are created with an expiry."""
+    authentication_token = await authentication_token_repo.create(
+        user_id=uuid4(),
+        user_session_id=uuid4(),
+    )
+
+    ttl = await redis_client.ttl(
+        authentication_token_repo.generate_token_key(
+            authentication_token_hash=authentication_token_repo.hash_token(
+                authentication_token=authentication_token,
+            ),
+        ),
+    )
+
+    assert 0 < ttl <= settings.authentication_token_idle_expires_in
+
+
+async def test_get_user_info_refreshes_expiry(
+    authentication_token_repo: AuthenticationTokenRepo,
+    redis_client: Redis,
+) -> None:
+    """Ensure the idle expiry is extended once the refresh interval has passed."""
+    authentication_token = await authentication_token_repo.create(
+        user_id=uuid4(),
+        user_session_id=uuid4(),
+    )
+    authentication_token_key = authentication_token_repo.generate_token_key(
+        authentication_token_hash=authentication_token_repo.hash_token(
+            authentication_token=authentication_token,
+        ),
+    )
+    await redis_client.expire(authentication_token_key, SHORT_TTL)
+
+    # the token was refreshed just now
+    await authentication_token_repo.get_user_info(
+        authentication_token=authentication_token,
+    )
+    assert await redis_client.ttl(authentication_token_key) <= SHORT_TTL
+
+    await redis_client.hset(
+        authentication_token_key,
+        mapping={"refreshed_at": int(time.time()) - STALE_REFRESH_AGE},
+    )  # type: ignore[misc]
+    await authentication_token_repo.get_user_info(
+        authentication_token=authentication_token,
+    )
+    assert await redis_client.ttl(authentication_token_key) > SHORT_TTL
+
+
+async def test_get_user_info_refreshes_short_idle_expiry(
+    authentication_token_repo: AuthenticationTokenRepo,
+    redis_client: Redis,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Ensure tokens are refreshed before an idle expiry under an hour runs out."""
+    monkeypatch.setattr(
+        settings,
+        "authentication_token_idle_expires_in",
+        SHORT_IDLE_EXPIRY,
+    )
+    authentication_token = await authentication_token_repo.create(
+        user_id=uuid4(),
+        user_session_id=uuid4(),
+    )
+    authentication_token_key = authentication_token_repo.generate_token_key(
+        authentication_token_hash=authentication_token_repo.hash_token(
+            authentication_token=authentication_token,
+        ),
+    )
+    await redis_client.expire(authentication_token_key, SHORT_TTL)
+    await redis_client.hset(
+        authentication_token_key,
+        mapping={"refreshed_at": int(time.time()) - SHORT_IDLE_EXPIRY // 2},
+    )  # type: ignore[misc]
+
+    await authentication_token_repo.get_user_info(
+        authentication_token=authentication_token,
+    )
+
+    assert await redis_client.ttl(authentication_token_key) > SHORT_TTL
+
+
+async def test_get_user_info_backfills_legacy_token(
+    authentication_token_repo: AuthenticationTokenRepo,
+    redis_client: Redis,
+) -> None:
+    """Ensure tokens stored without expiry fields are treated as created now."""
+    user_id = uuid4()
+    user_session_id = uuid4()
+    authentication_token = authentication_token_repo.generate_token()
+    authentication_token_key = authentication_token_repo.generate_token_key(
+        authentication_token_hash=authentication_token_repo.hash_token(
+            authentication_token=authentication_token,
+        ),
+    )
+    await redis_client.hset(
+        authentication_token_key,
+        mapping={"user_id": user_id.bytes, "user_session_id": user_session_id.bytes},
+    )  # type: ignore[misc]
+
+    assert await authentication_token_repo.get_user_info(
+        authentication_token=authentication_token,
+    ) == UserInfo(user_id=user_id, user_session_id=user_session_id)
+    assert await redis_client.hget(
+        authentication_token_key,
+        "expires_at",
+    )  # type: ignore[misc]
+    assert (
+        0
+        < await redis_client.ttl(authentication_token_key)
+        <= settings.authentication_token_idle_expires_in
+    )
+
+
+async def test_delete_authentication_token(
+    authentication_token_repo: AuthenticationTokenRepo,
+) -> None:
+    """Ensure deleted authentication tokens are no longer valid."""
+    user_id = uuid4()
+    authentication_token = await authentication_token_repo.create(
+        user_id=user_id,
+        user_session_id=uuid4(),
+    )
+
+    await authentication_token_repo.delete(
+        authentication_token=authentication_token,
+        user_id=user_id,
+    )
+
+    assert (
+        await authentication_token_repo.get_user_info(
+            authentication_token=authentication_token,
+        )
+        is None
+    )
+
+
+async def test_delete_all_for_user_session(
+    authentication_token_repo: AuthenticationTokenRepo,
+) -> None:
+    """Ensure only the authentication tokens of the given user session are deleted."""
+    user_id, user_session_id = uuid4(), uuid4()
+    authentication_token = await authentication_token_repo.create(
+        user_id=user_id,
+        user_session_id=user_session_id,
+    )
+    other_authentication_token = await authentication_token_repo.create(
+        user_id=user_id,
+        user_session_id=uuid4(),
+    )
+
+    await authentication_token_repo.delete_all_for_user_session(
+        user_id=user_id,
+        user_session_id=user_session_id,
+    )
+
+    assert (
+        await authentication_token_repo.get_user_info(
+            authentication_token=authentication_token,
+        )
+        is None
+    )
+    assert (
+        await authentication_token_repo.get_user_info(
+            authentication_token=other_authentication_token,
+        )
+        is not None
+    )
+
+
+async def test_prune_token_owners(
+    authentication_token_repo: AuthenticationTokenRepo,
+    redis_client: Redis,
+) -> None:
+    """Ensure expired authentication tokens are pruned from the owner sets."""
+    user_id = uuid4()
+    expired_token = await authentication_token_repo.create(
+        user_id=user_id,
+        user_session_id=uuid4(),
+    )
+    await authentication_token_repo.create(
+        user_id=user_id,
+        user_session_id=uuid4(),
+    )
+    await redis_client.delete(
+        authentication_token_repo.generate_token_key(
+            authentication_token_hash=authentication_token_repo.hash_token(
+                authentication_token=expired_token,
+            ),
+        ),
+    )
+
+    await authentication_token_repo.prune_token_owners()
+
+    assert (
+        await redis_client.scard(
+            authentication_token_repo.generate_token_owner_key(user_id=user_id),
+        )  # type: ignore[misc]
+        == 1
+    )
+
+
+async def test_get_user_info_many(
+    authentication_token_repo: AuthenticationTokenRepo,
+) -> None:
+    """Ensure the user info can be resolved for a batch of authentication tokens."""
+    user_id, user_session_id = uuid4(), uuid4()
+    authentication_token = await authentication_token_repo.create(
+        user_id=user_id,
+        user_session_id=user_session_id,
+    )
+
+    user_infos = await authentication_token_repo.get_user_info_many(
+        authentication_tokens=[authentication_token, "invalid"],
+    )
+
+    assert user_infos == [(user_id, user_session_id), None]
+
+
+async def test_get_user_info_skips_caching_evicted_token(
+    redis_client: Redis,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Ensure a token evicted during its lookup isn't cached afterwards."""
+    cache: LRUCache[str, UserInfo] = LRUCache(name="test", max_size=10)
+    authentication_token_repo = AuthenticationTokenRepo(
+        redis_client=redis_client,
+        cache=cache,
+    )
+    authentication_token = await authentication_token_repo.create(
+        user_id=uuid4(),
+        user_session_id=uuid4(),
+    )
+    authentication_token_hash = authentication_token_repo.hash_token(
+        authentication_token=authentication_token,
+    )
+    evalsha = redis_client.evalsha
+
+    async def evalsha_while_evicted(
+        sha: str,
+        numkeys: int,
+        *keys_and_args: str,
+    ) -> object:
+        result = await evalsha(sha, numkeys, *keys_and_args)  # type: ignore[arg-type,misc]
+        # the revocation of another process arrives during the lookup
+        cache.delete(authentication_token_hash)
+        return result
+
+    monkeypatch.setattr(redis_client, "evalsha", evalsha_while_evicted)
+
+    assert (
+        await authentication_token_repo.get_user_info(
+            authentication_token=authentication_token,
+        )
+        is not None
+    )
+    assert cache.get(authentication_token_hash) is None
+
+
+async def test_get_user_info_many_reports_failed_lookups_as_missing(
+    authentication_token_repo: AuthenticationTokenRepo,
+    redis_client: Redis,
+) -> None:
+    """Ensure a failed lookup doesn't fail the rest of the batch."""
+    user_id, user_session_id = uuid4(), uuid4()
+    authentication_token = await authentication_token_repo.create(
+        user_id=user_id,
+        user_session_id=user_session_id,
+    )
+    broken_authentication_token = authentication_token_repo.generate_token()
+    # a key of the wrong type makes the lookup script fail
+    await redis_client.set(
+        authentication_token_repo.generate_token_key(
+            authentication_token_hash=authentication_token_repo.hash_token(
+                authentication_token=broken_authentication_token,
+            ),
+        ),
+        "broken",
+    )
+
+    user_infos = await authentication_token_repo.get_user_info_many(
+        authentication_tokens=[broken_authentication_token, authentication_token],
+    )
+
+    assert user_infos == [None, (user_id, user_session_id)]
@@ -0,0 +1,149 @@
+import contextlib
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import UUID, uuid4
+
+import pytest
+from app import tasks
+from app.config import settings
+from app.lib.database.unit_of_work import UnitOfWork
+from app.repositories.email_verification_code import EmailVerificationCodeRepo
+from app.repositories.outgoing_verification_code import OutgoingVerificationCodeRepo
+from app.repositories.user import UserRepo
+from app.services.user import UserService
+from app.tasks import send_email_verification_request_email
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+from user_agents import parse
+
+pytestmark = [pytest.mark.anyio]
+
+VERIFICATION_CODE = "12345678"
+
+
+async def send_verification_email(
+    redis_client: Redis,
+    *,
+    verification_code_id: str,
+) -> None:
+    """Run the verification email task for the given verification code."""
+    await send_email_verification_request_email(
+        {"worker": MagicMock(), "redis_client": redis_client},
+        receiver="user@example.com",
+        verification_code_id=verification_code_id,
+        device="Sample Device",
+        browser_name="Chrome",
+        ip_address="127.0.0.1",
+        location="Chennai, India",
+    )
+
+
+async def test_send_verification_email_loads_verification_code(
+    redis_client: Redis,
+) -> None:
+    """Ensure the verification email is sent with the stored verification code."""
+    outgoing_verification_code_repo = OutgoingVerificationCodeRepo(
+        redis_client=redis_client,
+    )
+    verification_code_id = uuid4()
+    await outgoing_verification_code_repo.create(
+        verification_code_id=verification_code_id,
+        verification_code=VERIFICATION_CODE,
+    )
+
+    with patch.object(tasks, "send_template_email") as send_template_email:
+        await send_verification_email(
+            redis_client,
+            verification_code_id=str(verification_code_id),
+        )
+
+    send_template_email.assert_awaited_once()
+    [send_template_email_call] = send_template_email.await_args_list
+    assert (
+        send_template_email_call.kwargs["context"]["verification_code"]
+        == VERIFICATION_CODE
+    )
+    # the verification code is only kept until it has been sent
+    assert (
+        await outgoing_verification_code_repo.get(
+            verification_code_id=verification_code_id,
+        )
+        is None
+    )
+
+
+async def test_send_verification_email_skips_expired_verification_code(
+    redis_client: Redis,
+) -> None:
+    """Ensure no verification email is sent once the verification code expired."""
+    outgoing_verification_code_repo = OutgoingVerificationCodeRepo(
+        redis_client=redis_client,
+    )
+    verification_code_id = uuid4()
+    await outgoing_verification_code_repo.create(
+        verification_code_id=verification_code_id,
+        verification_code=VERIFICATION_CODE,
+    )
+    await outgoing_verification_code_repo.delete(
+        verification_code_id=verification_code_id,
+    )
+
+    with patch.object(tasks, "send_template_email") as send_template_email:
+        await send_verification_email(
+            redis_client,
+            verification_code_id=str(verification_code_id),
+        )
+
+    send_template_email.assert_not_awaited()
+
+
+@pytest.mark.parametrize("committed", [True, False])
+async def test_verification_code_stored_after_commit(
+    redis_client: Redis,
+    monkeypatch: pytest.MonkeyPatch,
+    *,
+    committed: bool,
+) -> None:
+    """Ensure verification codes are only stored once their email is committed."""
+    # leave the location to the email task
+    monkeypatch.setattr(settings, "geoip_enrichment_deferred", True)
+    session = AsyncMock(spec=AsyncSession)
+    user_repo = AsyncMock(spec=UserRepo)
+    user_repo.get_by_email.return_value = None
+    email_verification_code_repo = AsyncMock(spec=EmailVerificationCodeRepo)
+    email_verification_code_repo.create.return_value = (VERIFICATION_CODE, None)
+    outbox_message_repo = MagicMock()
+    if not committed:
+        # roll the use case back once the email has been queued
+        outbox_message_repo.create.side_effect = RuntimeError
+    task_buffer = MagicMock()
+    user_service = UserService(
+        unit_of_work=UnitOfWork(session=session),
+        user_repo=user_repo,
+        email_verification_code_repo=email_verification_code_repo,
+        authentication_token_repo=MagicMock(),
+        user_session_repo=MagicMock(),
+        outbox_message_repo=outbox_message_repo,
+        outgoing_verification_code_repo=OutgoingVerificationCodeRepo(
+            redis_client=redis_client,
+        ),
+        task_buffer=task_buffer,
+    )
+
+    with contextlib.suppress(RuntimeError):
+        await user_service.send_change_email_request(
+            user_id=uuid4(),
+            email="user@example.com",
+            current_password="password",
+            user_agent=parse("Mozilla/5.0"),
+            request_ip="127.0.0.1",
+        )
+
+    [outbox_message_create_call] = outbox_message_repo.create.call_args_list
+    verification_code_id = outbox_message_create_call.kwargs["task_kwargs"][
+        "verification_code_id"
+    ]
+    verification_code = await OutgoingVerificationCodeRepo(
+        redis_client=redis_client,
+    ).get(verification_code_id=UUID(verification_code_id))
+    assert verification_code == (VERIFICATION_CODE if committed else None)
+    assert task_buffer.push.call_count == int(committed)
@@ -0,0 +1,151 @@
+import json
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import UTC, datetime
+from typing import Any
+from uuid import uuid4
+
+import pytest
+from app.lib.database.paging import after_cursor
+from app.lib.enums import RegisterFlowStep
+from app.models.register_flow import RegisterFlow
+from app.models.user_session import UserSession
+from app.models.webauthn_credential import WebAuthnCredential
+from sqlalchemy import Connection, Executable, asc, desc, event, select, text
+from sqlalchemy.engine.interfaces import DBAPICursor
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.sql.elements import UnaryExpression
+from sqlalchemy.sql.functions import now
+
+pytestmark = [pytest.mark.anyio]
+
+INDEX_SCANS = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+
+@contextmanager
+def explaining(engine: AsyncEngine) -> Iterator[None]:
+    """Run statements as `EXPLAIN` statements on the given engine."""
+
+    def explain(
+        _conn: Connection,
+        _cursor: DBAPICursor,
+        statement: str,
+        parameters: object,
+        *_args: object,
+    ) -> tuple[str, object]:
+        return f"EXPLAIN (FORMAT JSON) {statement}", parameters
+
+    event.listen(engine.sync_engine, "before_cursor_execute", explain, retval=True)
+    try:
+        yield
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", explain)
+
+
+def iter_plan_nodes(plan: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    """Iterate over the given query plan node and its children."""
+    yield plan
+    for child_plan in plan.get("Plans", []):
+        yield from iter_plan_nodes(child_plan)
+
+
+async def get_query_plan(
+    session: AsyncSession,
+    engine: AsyncEngine,
+    statement: Executable,
+) -> dict[str, Any]:
+    """Get the query plan for the given statement, preferring index scans."""
+    # the test tables are tiny, so sequential scans would always win
+    await session.execute(text("SET LOCAL enable_seqscan = off"))
+    with explaining(engine):
+        result = await session.execute(statement)
+    query_plan = result.scalar_one()
+    if isinstance(query_plan, str):
+        query_plan = json.loads(query_plan)
+    return query_plan[0]["Plan"]
+
+
+async def test_register_flow_lookup_uses_index(
+    test_database_session: AsyncSession,
+    test_database_engine: AsyncEngine,
+) -> None:
+    """Ensure register flow lookups filter on step and expiry on the primary key scan."""
+    query_plan = await get_query_plan(
+        test_database_session,
+        test_database_engine,
+        select(RegisterFlow).where(
+            RegisterFlow.id == uuid4(),
+            RegisterFlow.current_step == RegisterFlowStep.EMAIL_VERIFICATION,
+            RegisterFlow.expires_at >= now(),
+        ),
+    )
+
+    scans = [
+        plan_node
+        for plan_node in iter_plan_nodes(query_plan)
+        if plan_node["Node Type"] in INDEX_SCANS
+    ]
+    assert scans
+    # the primary key matches at most one row, which the database
+    # checks for the step and expiry before returning it
+    assert scans[0]["Index Name"] == "register_flows_pkey"
+    assert "id" in scans[0]["Index Cond"]
+    assert "current_step" in scans[0]["Filter"]
+    assert "expires_at" in scans[0]["Filter"]
+
+
+async def test_webauthn_credential_lookup_uses_index(
+    test_database_session: AsyncSession,
+    test_database_engine: AsyncEngine,
+) -> None:
+    """Ensure WebAuthn credential lookups filter on credential ID and user ID in the index."""
+    query_plan = await get_query_plan(
+        test_database_session,
+        test_database_engine,
+        select(WebAuthnCredential).where(
+            WebAuthnCredential.credential_id == b"credential-id",
+            WebAuthnCredential.user_id == uuid4(),
+        ),
+    )
+
+    scans = [
+        plan_node
+        for plan_node in iter_plan_nodes(query_plan)
+        if plan_node["Node Type"] in INDEX_SCANS
+    ]
+    assert scans
+    assert scans[0]["Index Name"] == "webauthn_credentials_credential_id_user_id_idx"
+    assert "credential_id" in scans[0]["Index Cond"]
+    assert "user_id" in scans[0]["Index Cond"]
+
+
+async def test_user_session_page_after_cursor_uses_index_bound(
+    test_database_session: AsyncSession,
+    test_database_engine: AsyncEngine,
+) -> None:
+    """Ensure pages after a cursor seek into the paging index, instead of filtering."""
+    paginate_by: list[UnaryExpression[Any]] = [
+        desc(UserSession.created_at),
+        asc(UserSession.id),
+    ]
+    query_plan = await get_query_plan(
+        test_database_session,
+        test_database_engine,
+        select(UserSession)
+        .where(
+            UserSession.user_id == uuid4(),
+            after_cursor(paginate_by, [datetime.now(UTC), uuid4()]),
+        )
+        .order_by(*paginate_by)
+        .limit(10),
+    )
+
+    scans = [
+        plan_node
+        for plan_node in iter_plan_nodes(query_plan)
+        if plan_node["Node Type"] in INDEX_SCANS
+    ]
+    assert scans
+    assert scans[0]["Index Name"] == "user_sessions_user_id_created_at_id_idx"
+    assert "user_id" in scans[0]["Index Cond"]
+    assert "created_at" in scans[0]["Index Cond"]
@@ -0,0 +1,124 @@
+import pytest
+from app.lib.constants import REGISTER_FLOW_EXPIRES_IN
+from app.lib.enums import RegisterFlowStep
+from app.repositories.register_flow import RedisRegisterFlowRepo
+from redis.asyncio import Redis
+
+pytestmark = [pytest.mark.anyio]
+
+
+@pytest.fixture
+def register_flow_repo(redis_client: Redis) -> RedisRegisterFlowRepo:
+    """Get the redis register flow repo."""
+    return RedisRegisterFlowRepo(redis_client=redis_client)
+
+
+async def test_redis_register_flow_lifecycle(
+    register_flow_repo: RedisRegisterFlowRepo,
+    redis_client: Redis,
+) -> None:
+    """Ensure register flows can be created, advanced and deleted."""
+    verification_code, register_flow = await register_flow_repo.create(
+        email="user@example.com",
+        ip_address="127.0.0.1",
+        user_agent="Mozilla/5.0",
+    )
+    flow_key = register_flow_repo.generate_flow_key(flow_id=register_flow.id)
+
+    assert 0 < await redis_client.ttl(flow_key) <= REGISTER_FLOW_EXPIRES_IN
+
+    stored_register_flow = await register_flow_repo.get(
+        flow_id=register_flow.id,
+        step=RegisterFlowStep.EMAIL_VERIFICATION,
+    )
+    assert stored_register_flow is not None
+    assert stored_register_flow.email == "user@example.com"
+    assert stored_register_flow.expires_at == register_flow.expires_at
+    assert (
+        stored_register_flow.verification_code_hash
+        == register_flow_repo.hash_verification_code(
+            email_verification_code=verification_code,
+        )
+    )
+
+    await register_flow_repo.update(
+        register_flow=stored_register_flow,
+        current_step=RegisterFlowStep.WEBAUTHN_REGISTRATION,
+    )
+
+    assert (
+        await register_flow_repo.get(
+            flow_id=register_flow.id,
+            step=RegisterFlowStep.EMAIL_VERIFICATION,
+        )
+        is None
+    )
+    assert (
+        await register_flow_repo.get(
+            flow_id=register_flow.id,
+            step=RegisterFlowStep.WEBAUTHN_REGISTRATION,
+        )
+        is not None
+    )
+    # updates keep the original expiry
+    assert 0 < await redis_client.ttl(flow_key) <= REGISTER_FLOW_EXPIRES_IN
+
+    await register_flow_repo.delete(flow_id=register_flow.id)
+
+    assert await register_flow_repo.get(flow_id=register_flow.id) is None
+    assert not await redis_client.exists(
+        register_flow_repo.generate_email_key(email="user@example.com"),
+    )
+
+
+async def test_redis_register_flow_supersedes_previous(
+    register_flow_repo: RedisRegisterFlowRepo,
+    redis_client: Redis,
+) -> None:
+    """Ensure starting a register flow supersedes the previous one for the email."""
+    _, previous_register_flow = await register_flow_repo.create(
+        email="user@example.com",
+        ip_address="127.0.0.1",
+        user_agent="Mozilla/5.0",
+    )
+    _, register_flow = await register_flow_repo.create(
+        email="USER@example.com",
+        ip_address="127.0.0.1",
+        user_agent="Mozilla/5.0",
+    )
+
+    assert await register_flow_repo.get(flow_id=previous_register_flow.id) is None
+    assert await register_flow_repo.get(flow_id=register_flow.id) is not None
+
+    # deleting a superseded register flow keeps the current one indexed
+    await register_flow_repo.delete(flow_id=previous_register_flow.id)
+
+    assert (
+        await redis_client.get(
+            register_flow_repo.generate_email_key(email="user@example.com"),
+        )
+        == str(register_flow.id).encode()
+    )
+
+
+async def test_redis_register_flow_update_after_expiry(
+    register_flow_repo: RedisRegisterFlowRepo,
+    redis_client: Redis,
+) -> None:
+    """Ensure updating an expired register flow doesn't recreate it."""
+    _, register_flow = await register_flow_repo.create(
+        email="user@example.com",
+        ip_address="127.0.0.1",
+        user_agent="Mozilla/5.0",
+    )
+    await redis_client.delete(
+        register_flow_repo.generate_flow_key(flow_id=register_flow.id),
+    )
+
+    await register_flow_repo.recreate_verification_code(flow_id=register_flow.id)
+    await register_flow_repo.update(
+        register_flow=register_flow,
+        current_step=RegisterFlowStep.WEBAUTHN_REGISTRATION,
+    )
+
+    assert await register_flow_repo.get(flow_id=register_flow.id) is None
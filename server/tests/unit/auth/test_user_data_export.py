@@ -0,0 +1,85 @@
+import json
+from collections.abc import AsyncIterator, Sequence
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+from app.lib.user_data_export import export_user_data
+from app.models.user_session import UserSession
+from app.models.webauthn_credential import WebAuthnCredential
+from app.repositories.user_session import UserSessionRepo
+from app.repositories.webauthn_credential import WebAuthnCredentialRepo
+from sqlalchemy.ext.asyncio import AsyncSession
+
+pytestmark = [pytest.mark.anyio]
+
+
+async def iter_batches(
+    *batches: Sequence[object],
+) -> AsyncIterator[Sequence[object]]:
+    """Iterate over the given batches asynchronously."""
+    for batch in batches:
+        yield batch
+
+
+async def test_export_user_data() -> None:
+    """Ensure user data is exported as one NDJSON chunk per batch."""
+    session = AsyncMock(spec=AsyncSession)
+    session.__aenter__.return_value = session
+    user_id = uuid4()
+    user_sessions = [
+        UserSession(
+            id=uuid4(),
+            user_id=user_id,
+            ip_address="127.0.0.1",
+            location=None,
+            user_agent="Mozilla/5.0",
+            created_at=datetime.now(UTC),
+        )
+        for _ in range(3)
+    ]
+    webauthn_credential = WebAuthnCredential(
+        id=uuid4(),
+        user_id=user_id,
+        credential_id=b"credential",
+        public_key=b"public key",
+        sign_count=0,
+        device_type="single_device",
+        backed_up=False,
+        transports=None,
+        created_at=datetime.now(UTC),
+    )
+
+    with (
+        patch.object(
+            UserSessionRepo,
+            "stream_all",
+            return_value=iter_batches(user_sessions[:2], user_sessions[2:]),
+        ),
+        patch.object(
+            WebAuthnCredentialRepo,
+            "stream_all",
+            return_value=iter_batches([webauthn_credential]),
+        ),
+    ):
+        chunks = [
+            chunk
+            async for chunk in export_user_data(
+                session_factory=MagicMock(return_value=session),
+                user_id=user_id,
+            )
+        ]
+
+    assert len(chunks) == 3  # noqa: PLR2004
+    lines = [json.loads(line) for line in b"".join(chunks).splitlines()]
+    assert [line["type"] for line in lines] == [
+        "user_session",
+        "user_session",
+        "user_session",
+        "webauthn_credential",
+    ]
+    assert lines[0]["data"]["id"] == str(user_sessions[0].id)
+    assert lines[0]["data"]["userAgent"] == "Mozilla/5.0"
+    assert lines[3]["data"]["id"] == str(webauthn_credential.id)
+    session.__aexit__.assert_awaited_once()
@@ -0,0 +1,18 @@
+import os
+from uuid import uuid4
+
+import pytest
+from app.repositories.webauthn_challenge import WebAuthnChallengeRepo
+from redis.asyncio import Redis
+
+pytestmark = [pytest.mark.anyio]
+
+
+async def test_consume_webauthn_challenge(redis_client: Redis) -> None:
+    """Ensure WebAuthn challenges can only be consumed once."""
+    webauthn_challenge_repo = WebAuthnChallengeRepo(redis_client=redis_client)
+    user_id, challenge = uuid4(), os.urandom(64)
+    await webauthn_challenge_repo.create(user_id=user_id, challenge=challenge)
+
+    assert await webauthn_challenge_repo.consume(challenge=challenge) == user_id
+    assert await webauthn_challenge_repo.consume(challenge=challenge) is None
@@ -0,0 +1,70 @@
+import time
+
+from app.lib.cache import LRUCache
+
+FIRST_VALUE, SECOND_VALUE, THIRD_VALUE = 1, 2, 3
+
+
+def test_cache_hit_and_miss() -> None:
+    """Ensure cache hits and misses are counted."""
+    cache: LRUCache[str, int] = LRUCache(name="test", max_size=10)
+
+    assert cache.get("key") is None
+
+    cache.set("key", 1)
+
+    assert cache.get("key") == 1
+    assert cache.stats().hits == 1
+    assert cache.stats().misses == 1
+    assert cache.stats().hit_ratio == 0.5  # noqa: PLR2004
+
+
+def test_cache_evicts_least_recently_used() -> None:
+    """Ensure the least recently used entry is evicted when the cache is full."""
+    cache: LRUCache[str, int] = LRUCache(name="test", max_size=2)
+
+    cache.set("first", FIRST_VALUE)
+    cache.set("second", SECOND_VALUE)
+    # mark the first entry as recently used
+    cache.get("first")
+    cache.set("third", THIRD_VALUE)
+
+    assert cache.get("second") is None
+    assert cache.get("first") == FIRST_VALUE
+    assert cache.get("third") == THIRD_VALUE
+
+
+def test_cache_expires_entries() -> None:
+    """Ensure entries are expired after the TTL."""
+    cache: LRUCache[str, int] = LRUCache(name="test", max_size=10, ttl=0.01)
+
+    cache.set("key", 1)
+    time.sleep(0.02)
+
+    assert cache.get("key") is None
+    assert cache.stats().size == 0
+
+
+def test_cache_delete() -> None:
+    """Ensure entries can be evicted from the cache."""
+    cache: LRUCache[str, int] = LRUCache(name="test", max_size=10)
+
+    cache.set("key", 1)
+    cache.delete("key")
+
+    assert cache.get("key") is None
+
+
+def test_cache_set_skips_stale_generation() -> None:
+    """Ensure values looked up before an eviction aren't cached after it."""
+    cache: LRUCache[str, int] = LRUCache(name="test", max_size=10)
+
+    generation = cache.generation
+    cache.delete("key")
+    cache.set("key", FIRST_VALUE, generation=generation)
+
+    assert cache.get("key") is None
+
+    cache.set("key", FIRST_VALUE, generation=cache.generation)
+
+    assert cache.get("key") == FIRST_VALUE
@@ -0,0 +1,89 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+from app.dependencies.database_session import get_database_session
+from app.lib.database.engine import get_database_engine
+from app.lib.database.unit_of_work import UnitOfWork
+from app.repositories.user import UserRepo
+from app.repositories.webauthn_challenge import WebAuthnChallengeRepo
+from app.repositories.webauthn_credential import WebAuthnCredentialRepo
+from app.services import auth
+from app.services.auth import AuthService
+from app.services.user import UserService
+from sqlalchemy.ext.asyncio import AsyncSession
+
+pytestmark = [pytest.mark.anyio]
+
+
+async def test_session_without_statements_checks_out_no_connection() -> None:
+    """Ensure requests that never run a statement never check out a connection."""
+    database_sessions = get_database_session()
+    session = await anext(database_sessions)
+
+    async with UnitOfWork(session=session):
+        pass
+    await database_sessions.aclose()
+
+    # any checkout would have connected (and failed) here
+    pool = get_database_engine().pool
+    assert pool.checkedout() == 0  # type: ignore[attr-defined]
+    assert pool.checkedin() == 0  # type: ignore[attr-defined]
+
+
+async def test_read_only_use_case_releases_connection() -> None:
+    """Ensure read-only use cases end their transaction once their reads are done."""
+    session = AsyncMock(spec=AsyncSession)
+    user_repo = AsyncMock(spec=UserRepo)
+    user_service = UserService(
+        unit_of_work=UnitOfWork(session=session),
+        user_repo=user_repo,
+        email_verification_code_repo=MagicMock(),
+        authentication_token_repo=MagicMock(),
+        user_session_repo=MagicMock(),
+        outbox_message_repo=MagicMock(),
+        outgoing_verification_code_repo=MagicMock(),
+        task_buffer=MagicMock(),
+    )
+
+    await user_service.get_user_by_id(user_id=uuid4())
+
+    session.commit.assert_awaited_once()
+
+
+async def test_authentication_reads_release_connection_before_verification() -> None:
+    """Ensure the credential lookup commits before the signature is verified."""
+    session = AsyncMock(spec=AsyncSession)
+    auth_service = AuthService(
+        unit_of_work=UnitOfWork(session=session),
+        user_session_repo=MagicMock(),
+        webauthn_credential_repo=AsyncMock(spec=WebAuthnCredentialRepo),
+        webauthn_challenge_repo=AsyncMock(spec=WebAuthnChallengeRepo),
+        authentication_token_repo=MagicMock(),
+        access_token_repo=MagicMock(),
+        register_flow_repo=MagicMock(),
+        user_repo=MagicMock(),
+        email_verification_code_repo=MagicMock(),
+        outbox_message_repo=MagicMock(),
+        outgoing_verification_code_repo=MagicMock(),
+        task_buffer=MagicMock(),
+    )
+    credential = MagicMock()
+    credential.response.user_handle = uuid4().bytes
+
+    async def verify_in_executor(*_args: object, **_kwargs: object) -> None:
+        # the read transaction must already be over by the time we get here
+        session.commit.assert_awaited_once()
+        msg = "stop after verification"
+        raise RuntimeError(msg)
+
+    with (
+        patch.object(auth, "parse_client_data_json"),
+        patch.object(auth, "run_in_webauthn_executor", verify_in_executor),
+        pytest.raises(RuntimeError, match="stop after verification"),
+    ):
+        await auth_service.verify_authentication_response(
+            credential=credential,
+            request_ip="127.0.0.1",
+            user_agent=MagicMock(),
+        )
@@ -0,0 +1,37 @@
+import pytest
+from app.config import Settings, settings
+from app.lib.database.engine import get_database_engine
+from app.lib.database.session_factory import get_session_factory
+from pydantic import ValidationError
+
+
+def test_database_engine_is_shared() -> None:
+    """Ensure every session factory shares the one sized database engine."""
+    database_engine = get_database_engine()
+
+    assert get_database_engine() is database_engine
+    assert get_session_factory().kw["bind"] is database_engine
+    pool = database_engine.pool
+    assert pool.size() == settings.database_pool_size  # type: ignore[attr-defined]
+    assert pool.timeout() == settings.database_pool_timeout  # type: ignore[attr-defined]
+
+
+def test_database_connection_budget_exceeded() -> None:
+    """Ensure pools that would exceed the server's connections are rejected."""
+    with pytest.raises(ValidationError, match="per-process connection budget of 25"):
+        Settings(
+            database_pool_size=20,
+            database_max_overflow=10,
+            database_max_connections=100,
+            database_process_count=4,
+        )
+
+
+def test_database_connection_budget_fits() -> None:
+    """Ensure pools within the server's connections are accepted."""
+    Settings(
+        database_pool_size=20,
+        database_max_overflow=5,
+        database_max_connections=100,
+        database_process_count=4,
+    )
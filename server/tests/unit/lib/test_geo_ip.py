@@ -0,0 +1,92 @@
+import asyncio
+from collections.abc import Iterator
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+from app.lib import geo_ip
+from app.lib.geo_ip import (
+    GeoIPDatabase,
+    get_ip_location_cache,
+    resolve_ip_location,
+)
+from geoip2.database import Reader
+from geoip2.errors import AddressNotFoundError
+
+
+@pytest.fixture
+def geoip_reader() -> Iterator[MagicMock]:
+    """Get a GeoIP database reader that knows a single IP address."""
+    geoip_reader = MagicMock(spec=Reader)
+
+    def city(ip_address: str) -> MagicMock:
+        if ip_address != "203.0.113.7":
+            raise AddressNotFoundError(ip_address)
+        city = MagicMock()
+        city.city.name = "Chennai"
+        city.subdivisions.most_specific.name = "Tamil Nadu"
+        city.country.iso_code = "IN"
+        return city
+
+    geoip_reader.city.side_effect = city
+    get_ip_location_cache().clear()
+    with patch.object(geo_ip, "get_geoip_reader", return_value=geoip_reader):
+        yield geoip_reader
+    get_ip_location_cache().clear()
+
+
+def test_resolve_ip_location_caches_locations(geoip_reader: MagicMock) -> None:
+    """Ensure IP locations are only looked up once."""
+    hits = get_ip_location_cache().stats().hits
+
+    assert resolve_ip_location("203.0.113.7") == "Chennai, Tamil Nadu (IN)"
+    assert resolve_ip_location("203.0.113.7") == "Chennai, Tamil Nadu (IN)"
+
+    geoip_reader.city.assert_called_once_with("203.0.113.7")
+    assert get_ip_location_cache().stats().hits == hits + 1
+
+
+def test_resolve_ip_location_caches_unknown_locations(
+    geoip_reader: MagicMock,
+) -> None:
+    """Ensure unknown IP locations are cached too."""
+    assert resolve_ip_location("192.0.2.1") == "Unknown"
+    assert resolve_ip_location("192.0.2.1") == "Unknown"
+
+    geoip_reader.city.assert_called_once_with("192.0.2.1")
+
+
+@pytest.mark.anyio
+async def test_geoip_database_reloads_replaced_file(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Ensure a replaced database file is swapped in, and the old reader closed."""
+    monkeypatch.setattr(geo_ip, "GEOIP_READER_DRAIN_DELAY", 0)
+    readers: list[MagicMock] = []
+
+    def open_reader(*_args: object, **_kwargs: object) -> MagicMock:
+        readers.append(MagicMock(spec=Reader))
+        return readers[-1]
+
+    monkeypatch.setattr(geo_ip, "Reader", MagicMock(side_effect=open_reader))
+    database_path = tmp_path / "GeoLite2-City.mmdb"
+    database_path.write_bytes(b"old")
+    geoip_database = GeoIPDatabase(str(database_path))
+    get_ip_location_cache().set("203.0.113.7", "Chennai, Tamil Nadu (IN)")
+
+    assert not await geoip_database.reload_if_changed()
+
+    # database updates replace the file
+    updated_database_path = tmp_path / "GeoLite2-City.mmdb.tmp"
+    updated_database_path.write_bytes(b"new")
+    updated_database_path.replace(database_path)
+
+    assert await geoip_database.reload_if_changed()
+    previous_reader, reader = readers
+    assert geoip_database.reader is reader
+    assert get_ip_location_cache().get("203.0.113.7") is None
+
+    await asyncio.sleep(0.01)
+    previous_reader.close.assert_called_once()
+    reader.close.assert_not_called()
@@ -0,0 +1,111 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+from app.lib.outbox_relay import relay_outbox_messages
+from app.models.outbox_message import OutboxMessage
+from app.repositories.outbox_message import OutboxMessageRepo
+from asgi_correlation_id import correlation_id
+from saq import Queue
+from sqlalchemy.ext.asyncio import AsyncSession
+
+pytestmark = [pytest.mark.anyio]
+
+
+@pytest.fixture
+def session() -> AsyncMock:
+    """Get a database session that records commits and rollbacks."""
+    session = AsyncMock(spec=AsyncSession)
+    session.__aenter__.return_value = session
+    return session
+
+
+@pytest.fixture
+def queue() -> AsyncMock:
+    """Get a task queue that records the request ID of every enqueue."""
+    queue = AsyncMock(spec=Queue)
+    queue.request_ids = []
+
+    async def enqueue(*_args: object, **_kwargs: object) -> None:
+        queue.request_ids.append(correlation_id.get())
+
+    queue.enqueue.side_effect = enqueue
+    return queue
+
+
+async def test_relay_outbox_messages(session: AsyncMock, queue: AsyncMock) -> None:
+    """Ensure claimed outbox messages are enqueued, then deleted in one commit."""
+    outbox_messages = [
+        OutboxMessage(
+            id=uuid4(),
+            task_name="send_onboarding_email",
+            task_kwargs={"receiver": f"user{index}@example.com"},
+            request_id=f"request-{index}",
+        )
+        for index in range(3)
+    ]
+    with (
+        patch.object(
+            OutboxMessageRepo,
+            "claim_batch",
+            return_value=outbox_messages,
+        ),
+        patch.object(
+            OutboxMessageRepo,
+            "delete_all",
+        ) as delete_all,
+    ):
+        relayed_count = await relay_outbox_messages(
+            session_factory=MagicMock(return_value=session),
+            queue=queue,
+        )
+
+    assert relayed_count == len(outbox_messages)
+    for outbox_message in outbox_messages:
+        queue.enqueue.assert_any_await(
+            "send_onboarding_email",
+            key=str(outbox_message.id),
+            **outbox_message.task_kwargs,
+        )
+    # every task carries the request ID it was created with
+    assert sorted(queue.request_ids) == ["request-0", "request-1", "request-2"]
+    assert correlation_id.get() is None
+    delete_all.assert_awaited_once_with(
+        outbox_message_ids=[outbox_message.id for outbox_message in outbox_messages],
+    )
+    session.commit.assert_awaited_once()
+
+
+async def test_relay_outbox_messages_keeps_failed_batch(
+    session: AsyncMock,
+    queue: AsyncMock,
+) -> None:
+    """Ensure outbox messages aren't deleted when enqueueing fails."""
+    queue.enqueue.side_effect = ConnectionError("redis is down")
+    with (
+        patch.object(
+            OutboxMessageRepo,
+            "claim_batch",
+            return_value=[
+                OutboxMessage(
+                    id=uuid4(),
+                    task_name="send_onboarding_email",
+                    task_kwargs={},
+                    request_id=None,
+                ),
+            ],
+        ),
+        patch.object(
+            OutboxMessageRepo,
+            "delete_all",
+        ) as delete_all,
+        pytest.raises(ConnectionError),
+    ):
+        await relay_outbox_messages(
+            session_factory=MagicMock(return_value=session),
+            queue=queue,
+        )
+
+    delete_all.assert_not_awaited()
+    session.rollback.assert_awaited_once()
+    session.commit.assert_not_awaited()
@@ -0,0 +1,73 @@
+from datetime import UTC, datetime
+from uuid import UUID, uuid4
+
+import pytest
+from app.lib.database.paging import after_cursor, decode_cursor, encode_cursor
+from app.lib.errors import InvalidInputError
+from app.models.user_session import UserSession
+from sqlalchemy import asc, desc
+from sqlalchemy.dialects import postgresql
+
+
+def test_cursor_round_trip() -> None:
+    """Ensure cursors decode to the sort key values they were encoded from."""
+    values = (datetime(2026, 10, 17, 9, 30, 12, 345678, tzinfo=UTC), uuid4())
+
+    assert decode_cursor(encode_cursor(values), value_types=[datetime, UUID]) == values
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not-a-cursor",
+        "a.b.c",
+        "%%%.%%%",
+    ],
+)
+def test_decode_malformed_cursor(cursor: str) -> None:
+    """Ensure malformed cursors are rejected."""
+    with pytest.raises(InvalidInputError):
+        decode_cursor(cursor, value_types=[datetime, UUID])
+
+
+def test_decode_tampered_cursor() -> None:
+    """Ensure cursors with modified sort key values are rejected."""
+    payload, signature = encode_cursor(
+        (datetime(2026, 10, 17, tzinfo=UTC), uuid4()),
+    ).split(".")
+    tampered_payload, _ = encode_cursor(
+        (datetime(2025, 10, 17, tzinfo=UTC), uuid4()),
+    ).split(".")
+
+    with pytest.raises(InvalidInputError):
+        decode_cursor(f"{tampered_payload}.{signature}", value_types=[datetime, UUID])
+
+
+def test_decode_cursor_with_wrong_types() -> None:
+    """Ensure signed cursors for other sort keys are rejected."""
+    with pytest.raises(InvalidInputError):
+        decode_cursor(encode_cursor(["user@example.com"]), value_types=[datetime, UUID])
+
+
+def test_after_cursor_mixed_directions() -> None:
+    """Ensure the predicate respects the direction of each sort key."""
+    predicate = after_cursor(
+        [desc(UserSession.created_at), asc(UserSession.id)],
+        [datetime(2026, 10, 17, tzinfo=UTC), uuid4()],
+    )
+
+    assert str(predicate.compile(dialect=postgresql.dialect())) == (
+        "user_sessions.created_at <= %(created_at_1)s "
+        "AND (user_sessions.created_at < %(created_at_2)s "
+        "OR user_sessions.created_at = %(created_at_3)s "
+        "AND user_sessions.id > %(id_1)s::UUID)"
+    )
+
+
+def test_after_cursor_single_sort_key() -> None:
+    """Ensure a single sort key is compared directly."""
+    predicate = after_cursor([asc(UserSession.id)], [uuid4()])
+
+    assert str(predicate.compile(dialect=postgresql.dialect())) == (
+        "user_sessions.id > %(id_1)s::UUID"
+    )
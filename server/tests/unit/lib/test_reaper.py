@@ -0,0 +1,54 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from app.lib.database import reaper
+from app.lib.database.reaper import reap_expired_table
+from app.models.register_flow import RegisterFlow
+from sqlalchemy.ext.asyncio import AsyncSession
+
+pytestmark = [pytest.mark.anyio]
+
+
+@pytest.fixture
+def session() -> AsyncMock:
+    """Get a database session that records commits and rollbacks."""
+    session = AsyncMock(spec=AsyncSession)
+    session.__aenter__.return_value = session
+    return session
+
+
+async def test_reap_expired_table_in_batches(session: AsyncMock) -> None:
+    """Ensure expired rows are reaped in batches, until a batch comes up short."""
+    with patch.object(
+        reaper,
+        "reap_expired_batch",
+        side_effect=[10, 10, 3, 10],
+    ) as reap_expired_batch:
+        reaped_count = await reap_expired_table(
+            session_factory=MagicMock(return_value=session),
+            table=RegisterFlow.__table__,  # type: ignore[arg-type]
+            batch_size=10,
+        )
+
+    assert reaped_count == 23  # noqa: PLR2004
+    assert reap_expired_batch.await_count == 3  # noqa: PLR2004
+    # every batch is committed on its own
+    assert session.commit.await_count == 3  # noqa: PLR2004
+
+
+async def test_reap_expired_table_max_batches(session: AsyncMock) -> None:
+    """Ensure reaping stops after the maximum amount of batches."""
+    with patch.object(
+        reaper,
+        "reap_expired_batch",
+        return_value=10,
+    ) as reap_expired_batch:
+        reaped_count = await reap_expired_table(
+            session_factory=MagicMock(return_value=session),
+            table=RegisterFlow.__table__,  # type: ignore[arg-type]
+            batch_size=10,
+            max_batches=2,
+        )
+
+    assert reaped_count == 20  # noqa: PLR2004
+    assert reap_expired_batch.await_count == 2  # noqa: PLR2004
@@ -0,0 +1,59 @@
+import pytest
+from app.lib.database.routing import RoutingSession, read_only
+from app.models.user import User
+from sqlalchemy import Connection, Engine, create_engine, select, update
+
+pytestmark = [pytest.mark.anyio]
+
+
+@pytest.fixture
+def primary_engine() -> Engine:
+    """Get an engine standing in for the primary."""
+    return create_engine("sqlite://")
+
+
+@pytest.fixture
+def replica_engine() -> Engine:
+    """Get an engine standing in for the replica."""
+    return create_engine("sqlite://")
+
+
+@read_only
+async def get_read_only_bind(session: RoutingSession) -> Engine | Connection:
+    """Get the bind for a read, made by a read-only method."""
+    return session.get_bind(clause=select(User))
+
+
+async def test_read_only_methods_use_replica(
+    primary_engine: Engine,
+    replica_engine: Engine,
+) -> None:
+    """Ensure only reads made by read-only methods are routed to the replica."""
+    session = RoutingSession(
+        bind=primary_engine,
+        info={"replica_bind": replica_engine},
+    )
+
+    assert await get_read_only_bind(session) is replica_engine
+    assert session.get_bind(clause=select(User)) is primary_engine
+
+
+async def test_reads_after_writes_use_primary(
+    primary_engine: Engine,
+    replica_engine: Engine,
+) -> None:
+    """Ensure the session reads its own writes once it has written."""
+    session = RoutingSession(
+        bind=primary_engine,
+        info={"replica_bind": replica_engine},
+    )
+
+    assert session.get_bind(clause=update(User)) is primary_engine
+    assert await get_read_only_bind(session) is primary_engine
+
+
+async def test_read_only_methods_without_replica(primary_engine: Engine) -> None:
+    """Ensure read-only methods use the primary when no replica is configured."""
+    session = RoutingSession(bind=primary_engine)
+
+    assert await get_read_only_bind(session) is primary_engine
@@ -0,0 +1,122 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import UUID, uuid4
+
+import pytest
+from app.lib.constants import TASK_BUFFER_BATCH_SIZE
+from app.lib.outbox_relay import relay_outbox_messages
+from app.lib.task_buffer import TaskBuffer
+from app.models.outbox_message import OutboxMessage
+from app.repositories.outbox_message import OutboxMessageRepo
+from saq import Queue
+from sqlalchemy.ext.asyncio import AsyncSession
+
+pytestmark = [pytest.mark.anyio]
+
+
+@pytest.fixture
+def session() -> AsyncMock:
+    """Get a database session that records commits and rollbacks."""
+    session = AsyncMock(spec=AsyncSession)
+    session.__aenter__.return_value = session
+    return session
+
+
+def build_outbox_message() -> OutboxMessage:
+    """Build a committed outbox message."""
+    return OutboxMessage(
+        id=uuid4(),
+        task_name="send_onboarding_email",
+        task_kwargs={"receiver": "user@example.com"},
+        request_id=None,
+    )
+
+
+async def test_task_buffer_flushes_in_batches(session: AsyncMock) -> None:
+    """Ensure buffered outbox messages are enqueued in batches, by job key."""
+    queue = AsyncMock(spec=Queue)
+    task_buffer = TaskBuffer(
+        queue=queue,
+        session_factory=MagicMock(return_value=session),
+    )
+    outbox_messages = [
+        build_outbox_message() for _ in range(TASK_BUFFER_BATCH_SIZE + 1)
+    ]
+    for outbox_message in outbox_messages:
+        task_buffer.push(outbox_message)
+
+    assert queue.enqueue.await_count == 0
+
+    assert await task_buffer.flush() == TASK_BUFFER_BATCH_SIZE
+    assert len(task_buffer) == 1
+
+    await task_buffer.drain()
+
+    assert len(task_buffer) == 0
+    assert queue.enqueue.await_count == len(outbox_messages)
+    queue.enqueue.assert_any_await(
+        "send_onboarding_email",
+        key=str(outbox_messages[-1].id),
+        receiver="user@example.com",
+    )
+
+
+async def test_task_buffer_skips_failed_enqueues(session: AsyncMock) -> None:
+    """Ensure a failed enqueue doesn't fail the rest of the batch."""
+    queue = AsyncMock(spec=Queue)
+    queue.enqueue.side_effect = [ConnectionError("redis is down"), None]
+    task_buffer = TaskBuffer(
+        queue=queue,
+        session_factory=MagicMock(return_value=session),
+    )
+    failed_outbox_message, outbox_message = (
+        build_outbox_message(),
+        build_outbox_message(),
+    )
+    task_buffer.push(failed_outbox_message)
+    task_buffer.push(outbox_message)
+
+    with patch.object(OutboxMessageRepo, "delete_all") as delete_all:
+        assert await task_buffer.flush() == 2  # noqa: PLR2004
+
+    assert queue.enqueue.await_count == 2  # noqa: PLR2004
+    assert len(task_buffer) == 0
+    # the failed outbox message is left for the outbox relay
+    delete_all.assert_awaited_once_with(outbox_message_ids=[outbox_message.id])
+    session.commit.assert_awaited_once()
+
+
+async def test_flushed_outbox_messages_are_not_relayed(session: AsyncMock) -> None:
+    """Ensure outbox messages enqueued by the task buffer aren't relayed again."""
+    queue = AsyncMock(spec=Queue)
+    outbox = [build_outbox_message()]
+
+    async def delete_all(*, outbox_message_ids: list[UUID]) -> None:
+        outbox[:] = [
+            outbox_message
+            for outbox_message in outbox
+            if outbox_message.id not in outbox_message_ids
+        ]
+
+    with (
+        patch.object(
+            OutboxMessageRepo,
+            "claim_batch",
+            side_effect=lambda **_kwargs: list(outbox),
+        ),
+        patch.object(OutboxMessageRepo, "delete_all", side_effect=delete_all),
+    ):
+        task_buffer = TaskBuffer(
+            queue=queue,
+            session_factory=MagicMock(return_value=session),
+        )
+        task_buffer.push(outbox[0])
+        await task_buffer.flush()
+
+        # the relay runs once the grace period has passed
+        relayed_count = await relay_outbox_messages(
+            session_factory=MagicMock(return_value=session),
+            queue=queue,
+        )
+
+    assert relayed_count == 0
+    queue.enqueue.assert_awaited_once()
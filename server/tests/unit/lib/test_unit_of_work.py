@@ -0,0 +1,39 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from app.lib.database.unit_of_work import UnitOfWork
+from sqlalchemy.ext.asyncio import AsyncSession
+
+pytestmark = [pytest.mark.anyio]
+
+
+@pytest.fixture
+def session() -> AsyncMock:
+    """Get a database session that records commits and rollbacks."""
+    return AsyncMock(spec=AsyncSession)
+
+
+async def test_unit_of_work_commits(session: AsyncMock) -> None:
+    """Ensure the unit of work commits once, when the outermost unit exits."""
+    unit_of_work = UnitOfWork(session=session)
+
+    async with unit_of_work:
+        async with unit_of_work:
+            pass
+        session.commit.assert_not_awaited()
+
+    session.commit.assert_awaited_once()
+    session.rollback.assert_not_awaited()
+
+
+async def test_unit_of_work_rolls_back(session: AsyncMock) -> None:
+    """Ensure the unit of work rolls back when an exception is raised."""
+    unit_of_work = UnitOfWork(session=session)
+
+    msg = "failed"
+    with pytest.raises(ValueError, match=msg):
+        async with unit_of_work:
+            raise ValueError(msg)
+
+    session.rollback.assert_awaited_once()
+    session.commit.assert_not_awaited()
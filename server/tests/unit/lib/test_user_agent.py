@@ -0,0 +1,45 @@
+from collections.abc import Iterator
+from unittest.mock import MagicMock, patch
+
+import pytest
+import user_agents
+from app.lib.user_agent import get_user_agent_cache, parse_user_agent
+
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64; rv:130.0) Gecko/20100101 Firefox/130.0"
+
+
+@pytest.fixture(autouse=True)
+def _clear_user_agent_cache() -> Iterator[None]:
+    """Clear the user agent cache around each test."""
+    get_user_agent_cache().clear()
+    yield
+    get_user_agent_cache().clear()
+
+
+def test_parse_user_agent_caches_user_agents() -> None:
+    """Ensure user agents are only parsed once."""
+    hits = get_user_agent_cache().stats().hits
+
+    with patch.object(
+        user_agents,
+        "parse",
+        wraps=user_agents.parse,
+    ) as parse:
+        user_agent = parse_user_agent(USER_AGENT)
+        assert parse_user_agent(USER_AGENT) is user_agent
+
+    parse.assert_called_once_with(USER_AGENT)
+    assert get_user_agent_cache().stats().hits == hits + 1
+    assert user_agent.get_browser() == "Firefox 130.0"
+    assert user_agent.get_os() == "Linux"
+
+
+def test_parse_user_agent_keys_by_user_agent_string() -> None:
+    """Ensure distinct user agent strings are parsed separately."""
+    parse = MagicMock(wraps=user_agents.parse)
+
+    with patch.object(user_agents, "parse", parse):
+        parse_user_agent(USER_AGENT)
+        parse_user_agent("curl/8.9.1")
+
+    assert parse.call_count == 2  # noqa: PLR2004
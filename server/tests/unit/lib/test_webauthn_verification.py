@@ -0,0 +1,89 @@
+import os
+
+import pytest
+from app.config import settings
+from app.lib.webauthn_verification import (
+    get_public_key_cache,
+    verify_authentication_response,
+)
+from webauthn.authentication.verify_authentication_response import (
+    VerifiedAuthentication,
+)
+from webauthn.helpers.exceptions import InvalidAuthenticationResponse
+
+from tests.utils.authenticator import Authenticator
+
+
+@pytest.fixture
+def authenticator() -> Authenticator:
+    """Get a software authenticator."""
+    return Authenticator(
+        rp_id=settings.rp_id,
+        origin=settings.rp_expected_origin,
+    )
+
+
+def verify(
+    authenticator: Authenticator,
+    *,
+    credential_public_key: bytes,
+    expected_challenge: bytes | None = None,
+) -> VerifiedAuthentication:
+    """Verify a fresh assertion from the given authenticator."""
+    challenge = os.urandom(32)
+    return verify_authentication_response(
+        credential=authenticator.get_assertion(challenge=challenge),
+        expected_challenge=expected_challenge or challenge,
+        expected_rp_id=settings.rp_id,
+        expected_origin=settings.rp_expected_origin,
+        credential_public_key=credential_public_key,
+        credential_current_sign_count=0,
+        require_user_verification=True,
+    )
+
+
+def test_verify_authentication_response(authenticator: Authenticator) -> None:
+    """Ensure valid assertions are verified."""
+    verified_authentication = verify(
+        authenticator,
+        credential_public_key=authenticator.public_key,
+    )
+
+    assert verified_authentication.credential_id == authenticator.credential_id
+    assert verified_authentication.new_sign_count == authenticator.sign_count
+    assert verified_authentication.user_verified
+
+
+def test_verify_authentication_response_wrong_challenge(
+    authenticator: Authenticator,
+) -> None:
+    """Ensure assertions for another challenge are rejected."""
+    with pytest.raises(InvalidAuthenticationResponse):
+        verify(
+            authenticator,
+            credential_public_key=authenticator.public_key,
+            expected_challenge=os.urandom(32),
+        )
+
+
+def test_public_key_cached(authenticator: Authenticator) -> None:
+    """Ensure loaded public keys are reused for repeat verifications."""
+    public_key_cache = get_public_key_cache()
+
+    verify(authenticator, credential_public_key=authenticator.public_key)
+    hits = public_key_cache.hits
+    verify(authenticator, credential_public_key=authenticator.public_key)
+
+    assert public_key_cache.hits == hits + 1
+
+
+def test_public_key_changed(authenticator: Authenticator) -> None:
+    """Ensure cached public keys aren't used once the credential's public key changes."""
+    verify(authenticator, credential_public_key=authenticator.public_key)
+
+    other_authenticator = Authenticator(
+        rp_id=settings.rp_id,
+        origin=settings.rp_expected_origin,
+    )
+    with pytest.raises(InvalidAuthenticationResponse):
+        verify(authenticator, credential_public_key=other_authenticator.public_key)
@@ -0,0 +1,108 @@
+import ipaddress
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+from app import tasks
+from app.config import settings
+from app.lib import geo_ip
+from app.lib.geo_ip import get_ip_location_cache, resolve_ip_location_unless_deferred
+from app.repositories.user_session import UserSessionRepo
+from app.tasks import enrich_user_session_locations
+from sqlalchemy.ext.asyncio import AsyncSession
+
+pytestmark = [pytest.mark.anyio]
+
+
+@pytest.fixture
+def session() -> AsyncMock:
+    """Get a database session that records commits and rollbacks."""
+    session = AsyncMock(spec=AsyncSession)
+    session.__aenter__.return_value = session
+    return session
+
+
+def test_resolve_ip_location_deferred(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Ensure locations are left to the worker when GeoIP enrichment is deferred."""
+    monkeypatch.setattr(settings, "geoip_enrichment_deferred", True)
+
+    assert resolve_ip_location_unless_deferred("203.0.113.7") is None
+
+
+async def test_enrich_user_session_locations(session: AsyncMock) -> None:
+    """Ensure pending locations are resolved and updated in one statement per batch."""
+    ip_addresses = {uuid4(): "203.0.113.7", uuid4(): "192.0.2.1"}
+    with (
+        patch.object(
+            UserSessionRepo,
+            "claim_pending_locations",
+            return_value=ip_addresses,
+        ),
+        patch.object(
+            UserSessionRepo,
+            "update_locations",
+        ) as update_locations,
+        patch.object(
+            tasks,
+            "resolve_ip_location",
+            side_effect=lambda ip_address: f"Location of {ip_address}",
+        ),
+    ):
+        await enrich_user_session_locations(
+            {"worker": MagicMock(), "session_factory": MagicMock(return_value=session)},
+        )
+
+    update_locations.assert_awaited_once_with(
+        locations={
+            user_session_id: f"Location of {ip_address}"
+            for user_session_id, ip_address in ip_addresses.items()
+        },
+    )
+    session.commit.assert_awaited_once()
+
+
+async def test_enrich_user_session_locations_malformed_ip_address(
+    session: AsyncMock,
+) -> None:
+    """Ensure a malformed IP address is resolved as unknown, without failing its batch."""
+    user_session_id, malformed_user_session_id = uuid4(), uuid4()
+    geoip_city = MagicMock()
+    geoip_city.city.name = "Chennai"
+    geoip_city.subdivisions.most_specific.name = "Tamil Nadu"
+    geoip_city.country.iso_code = "IN"
+
+    def look_up_city(ip_address: str) -> MagicMock:
+        # like geoip2, fail on malformed IP addresses
+        ipaddress.ip_address(ip_address)
+        return geoip_city
+
+    geoip_reader = MagicMock()
+    geoip_reader.city.side_effect = look_up_city
+    get_ip_location_cache().clear()
+    with (
+        patch.object(
+            UserSessionRepo,
+            "claim_pending_locations",
+            return_value={
+                user_session_id: "203.0.113.7",
+                malformed_user_session_id: "not-an-ip-address",
+            },
+        ),
+        patch.object(
+            UserSessionRepo,
+            "update_locations",
+        ) as update_locations,
+        patch.object(geo_ip, "get_geoip_reader", return_value=geoip_reader),
+    ):
+        await enrich_user_session_locations(
+            {"worker": MagicMock(), "session_factory": MagicMock(return_value=session)},
+        )
+    get_ip_location_cache().clear()
+
+    update_locations.assert_awaited_once_with(
+        locations={
+            user_session_id: "Chennai, Tamil Nadu (IN)",
+            malformed_user_session_id: "Unknown",
+        },
+    )
+    session.commit.assert_awaited_once()
@@ -0,0 +1,74 @@
+import json
+import os
+from base64 import urlsafe_b64encode
+from hashlib import sha256
+
+import cbor2
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import ec
+from webauthn.helpers.structs import (
+    AuthenticationCredential,
+    AuthenticatorAssertionResponse,
+)
+
+
+class Authenticator:
+    """A software authenticator, holding a single ES256 credential."""
+
+    def __init__(self, *, rp_id: str, origin: str) -> None:
+        self.rp_id = rp_id
+        self.origin = origin
+        self.credential_id = os.urandom(32)
+        self.sign_count = 0
+        self._private_key = ec.generate_private_key(ec.SECP256R1())
+
+    @property
+    def public_key(self) -> bytes:
+        """Get the COSE encoded public key of the credential."""
+        public_numbers = self._private_key.public_key().public_numbers()
+        return cbor2.dumps(
+            {
+                1: 2,  # kty: EC2
+                3: -7,  # alg: ES256
+                -1: 1,  # crv: P-256
+                -2: public_numbers.x.to_bytes(32, "big"),
+                -3: public_numbers.y.to_bytes(32, "big"),
+            },
+        )
+
+    def get_assertion(
+        self,
+        *,
+        challenge: bytes,
+        user_handle: bytes | None = None,
+    ) -> AuthenticationCredential:
+        """Sign the given challenge, as a user verified assertion."""
+        self.sign_count += 1
+        client_data_json = json.dumps(
+            {
+                "type": "webauthn.get",
+                "challenge": urlsafe_b64encode(challenge).rstrip(b"=").decode(),
+                "origin": self.origin,
+                "crossOrigin": False,
+            },
+        ).encode()
+        authenticator_data = (
+            sha256(self.rp_id.encode()).digest()
+            # flags: user present, user verified
+            + bytes([0b101])
+            + self.sign_count.to_bytes(4, "big")
+        )
+        signature = self._private_key.sign(
+            authenticator_data + sha256(client_data_json).digest(),
+            ec.ECDSA(hashes.SHA256()),
+        )
+        return AuthenticationCredential(
+            id=urlsafe_b64encode(self.credential_id).rstrip(b"=").decode(),
+            raw_id=self.credential_id,
+            response=AuthenticatorAssertionResponse(
+                client_data_json=client_data_json,
+                authenticator_data=authenticator_data,
+                signature=signature,
+                user_handle=user_handle,
+            ),
+        )